@@ -0,0 +1,65 @@
+""" Callback event memory benchmark
+
+Compares the memory used by events built with the former per-call class factory against the slotted
+CallbackEvent.  Run from the repository root:
+
+    python -m benchmarks.event_memory_benchmark [event count]
+"""
+import sys
+import time
+import tracemalloc
+
+from src.typhoon_automator.events import CallbackEvent
+
+
+DEFAULT_EVENT_COUNT = 1_000_000
+
+
+def _callback(simulation):
+    pass
+
+
+def _create_legacy_event(
+        message: str,
+        callback):
+    """ Event factory as previously implemented by Utility.create_callback_event """
+    class _CallbackEvent(object):
+        pass
+
+    event = _CallbackEvent()
+    setattr(event, "message", message)
+    setattr(event, "invoke", callback)
+    return event
+
+
+def _build_legacy(count: int) -> list:
+    return [_create_legacy_event(f"Setpoint {index}", _callback) for index in range(count)]
+
+
+def _build_slotted(count: int) -> list:
+    return [CallbackEvent("Setpoint %d", _callback, (index,)) for index in range(count)]
+
+
+def _measure(build, count: int) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    events = build(count)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del events
+    return elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_EVENT_COUNT
+
+    print(f"{'events':>10} {'kind':>10} {'build':>10} {'peak memory':>14} {'per event':>12}")
+    for kind, build in (("legacy", _build_legacy), ("slotted", _build_slotted)):
+        elapsed, peak = _measure(build, count)
+        print(f"{count:>10} {kind:>10} {elapsed:>9.3f}s {peak / 2**20:>11.1f} MiB {peak / count:>10.1f} B")
+
+
+if __name__ == "__main__":
+    main()
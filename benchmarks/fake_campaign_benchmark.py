@@ -0,0 +1,79 @@
+""" Fake backend campaign benchmark
+
+Runs scenarios against the in-process fake HIL backend and reports dispatch throughput and HIL API call
+counts, so loop overhead can be measured without HIL hardware.  Run from the repository root:
+
+    python -m benchmarks.fake_campaign_benchmark [scenario count] [events per scenario] [speedup]
+"""
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from src import typhoon_automator
+
+
+SCHEMATIC = "./examples/rlc.tse"
+SCADA_NAME = "Sw_ctrl"
+DURATION = 1.0
+
+
+class _BenchmarkScenario(object):
+    def __init__(
+            self,
+            event_count: int):
+        self._event_count = event_count
+
+    def toggle(simulation: typhoon_automator.Simulation):
+        simulation.set_scada_value(name = SCADA_NAME, value = 1)
+
+    def set_up_scenario(
+            self,
+            simulation: typhoon_automator.Simulation):
+        simulation.set_data_logging_signals(["I_ind", "V_cap"])
+        simulation.set_scenario_duration(DURATION)
+
+        event = typhoon_automator.Utility.create_callback_event(
+            message = "Toggle",
+            callback = _BenchmarkScenario.toggle)
+        simulation.schedule_recurring_event(
+            start_time = 0.0,
+            period = DURATION / self._event_count,
+            event = event,
+            count = self._event_count)
+
+    def tear_down_scenario(
+            self,
+            simulation: typhoon_automator.Simulation):
+        pass
+
+
+def main():
+    scenario_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    event_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    speedup = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+
+    backend = typhoon_automator.FakeBackend(speedup = speedup)
+    automator = typhoon_automator.TyphoonAutomator(backend = backend)
+
+    with tempfile.TemporaryDirectory() as output_path:
+        automator.initialize(SCHEMATIC)
+        automator.set_data_logger_path(str(Path(output_path) / "data"))
+        automator.set_capture_path(str(Path(output_path) / "capture"))
+
+        for index in range(scenario_count):
+            automator.add_scenario(name = f"Benchmark {index}", scenario = _BenchmarkScenario(event_count))
+
+        start = time.perf_counter()
+        automator.run(use_vhil = True)
+        elapsed = time.perf_counter() - start
+
+    total_events = scenario_count * event_count
+    print(f"{scenario_count} scenarios, {total_events} events in {elapsed:.3f}s ({total_events / elapsed:.0f} events/s)")
+    for name, count in backend.call_counts.most_common():
+        print(f"{name:>28} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+""" EventSchedule micro-benchmark
+
+Measures the time to build and drain an event schedule for increasing numbers of events.  Run from
+the repository root:
+
+    python -m benchmarks.schedule_benchmark
+"""
+import random
+import time
+
+from src.typhoon_automator.schedule import EventSchedule
+
+
+EVENT_COUNTS = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+class _BenchmarkEvent(object):
+    message = "Benchmark event"
+
+    def invoke(simulation):
+        pass
+
+
+def _time_call(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def _add_individually(schedule: EventSchedule, times: list[float]):
+    event = _BenchmarkEvent()
+    for sim_time in times:
+        schedule.add_event(sim_time, event)
+
+
+def _add_bulk(schedule: EventSchedule, times: list[float]):
+    event = _BenchmarkEvent()
+    schedule.add_events((sim_time, event) for sim_time in times)
+
+
+def _drain(schedule: EventSchedule):
+    while schedule.has_next_event():
+        schedule.pop_next_event()
+
+
+def main():
+    random.seed(0)
+
+    print(f"{'events':>10} {'add_event':>12} {'add_events':>12} {'drain':>12} {'per event':>12}")
+    for count in EVENT_COUNTS:
+        times = [random.uniform(0.0, 3600.0) for _ in range(count)]
+
+        schedule = EventSchedule()
+        add_time = _time_call(_add_individually, schedule, times)
+
+        bulk_schedule = EventSchedule()
+        bulk_time = _time_call(_add_bulk, bulk_schedule, times)
+
+        drain_time = _time_call(_drain, schedule)
+
+        per_event = (add_time + drain_time) / count
+        print(f"{count:>10} {add_time:>11.4f}s {bulk_time:>11.4f}s {drain_time:>11.4f}s {per_event * 1e6:>10.3f}us")
+
+
+if __name__ == "__main__":
+    main()
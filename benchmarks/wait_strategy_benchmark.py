@@ -0,0 +1,70 @@
+""" Wait strategy benchmark
+
+Runs a dispatch loop against a wall-clock driven simulation time for each wait strategy and reports CPU
+usage and dispatch error.  Run from the repository root:
+
+    python -m benchmarks.wait_strategy_benchmark [duration] [rate]
+"""
+import random
+import sys
+import time
+
+from src.typhoon_automator.schedule import EventSchedule
+from src.typhoon_automator.wait import AdaptiveWait
+from src.typhoon_automator.wait import FixedIntervalWait
+from src.typhoon_automator.wait import SpinWait
+
+
+DEFAULT_DURATION = 5.0      # Simulation seconds per strategy
+DEFAULT_RATE = 1.0          # Simulation seconds per wall second
+EVENT_COUNT = 200
+
+
+class _BenchmarkEvent(object):
+    message = "Benchmark event"
+
+    def invoke(simulation):
+        pass
+
+
+def _run(strategy, duration: float, rate: float, times: list[float]) -> dict:
+    schedule = EventSchedule()
+    event = _BenchmarkEvent()
+    schedule.add_events((sim_time, event) for sim_time in times)
+
+    start = time.perf_counter()
+    strategy.start()
+
+    while True:
+        sim_time = (time.perf_counter() - start) * rate
+        sample_wall_time = time.perf_counter()
+        if sim_time >= duration:
+            break
+
+        for scheduled_time, _ in schedule.pop_due(sim_time):
+            strategy.record_dispatch(scheduled_time, sim_time)
+
+        next_time = schedule.get_next_event_time() if schedule.has_next_event() else duration
+        strategy.wait(sim_time, sample_wall_time, next_time)
+
+    strategy.stop()
+    return strategy.get_statistics()
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DURATION
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RATE
+
+    random.seed(0)
+    times = sorted(random.uniform(0.0, duration) for _ in range(EVENT_COUNT))
+
+    print(f"{'strategy':>10} {'cpu':>8} {'ticks':>10} {'mean error':>12} {'max error':>12}")
+    for strategy in (SpinWait(), FixedIntervalWait(0.001), AdaptiveWait()):
+        stats = _run(strategy, duration, rate, times)
+        print(
+            f"{stats['strategy']:>10} {stats['cpu_usage']:>7.1f}% {stats['ticks']:>10} "
+            f"{stats['dispatch_error_mean'] * 1e3:>10.3f}ms {stats['dispatch_error_max'] * 1e3:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,40 @@
 from .automator import TyphoonAutomator as TyphoonAutomator
 from .automator import Utility as Utility
-from .simulation import Simulation as Simulation
\ No newline at end of file
+from .backend import HilBackend as HilBackend
+from .backend import TyphoonBackend as TyphoonBackend
+from .capture import CaptureResult as CaptureResult
+from .catalog import RunCatalog as RunCatalog
+from .convert import OutputConverter as OutputConverter
+from .events import CallbackEvent as CallbackEvent
+from .events import ScadaWriteEvent as ScadaWriteEvent
+from .fake import FakeBackend as FakeBackend
+from .flush import FileSettleFlush as FileSettleFlush
+from .flush import FixedDelayFlush as FixedDelayFlush
+from .flush import FlushStrategy as FlushStrategy
+from .journal import CampaignJournal as CampaignJournal
+from .kpi import KpiDefinition as KpiDefinition
+from .kpi import KpiEngine as KpiEngine
+from .parallel import ParallelRunner as ParallelRunner
+from .parallel import WorkerSpec as WorkerSpec
+from .planner import ScenarioPlanner as ScenarioPlanner
+from .playback import ArrayProfile as ArrayProfile
+from .playback import CsvProfile as CsvProfile
+from .playback import ScadaProfile as ScadaProfile
+from .results import CsvResultsReader as CsvResultsReader
+from .results import NpzResultsReader as NpzResultsReader
+from .results import ParquetResultsReader as ParquetResultsReader
+from .results import ResultsReader as ResultsReader
+from .scenario_file import DeclarativeScenario as DeclarativeScenario
+from .scenario_file import ScenarioFile as ScenarioFile
+from .simulation import Simulation as Simulation
+from .sweep import CartesianSweep as CartesianSweep
+from .sweep import LatinHypercubeSweep as LatinHypercubeSweep
+from .sweep import ParameterSweep as ParameterSweep
+from .sweep import RandomSweep as RandomSweep
+from .sweep import SweepScenario as SweepScenario
+from .tse import SchematicInfo as SchematicInfo
+from .tse import read_schematic_info as read_schematic_info
+from .wait import AdaptiveWait as AdaptiveWait
+from .wait import FixedIntervalWait as FixedIntervalWait
+from .wait import SpinWait as SpinWait
+from .wait import WaitStrategy as WaitStrategy
@@ -2,11 +2,26 @@ import logging
 
 from datetime import datetime
 from typing import Any
-
+from typing import Iterable
+
+from .backend import HilBackend
+from .backend import TyphoonBackend
+from .catalog import RunCatalog
+from .compile_cache import CompileCache
+from .convert import FORMAT_AUTO
+from .convert import OutputConverter
+from .events import CallbackEvent
 from .hilsetup import HilSetupManager
+from .journal import CampaignJournal
+from .kpi import KpiEngine
 from .model import ModelManager
 from .orchestrator import Orchestrator
+from .planner import ScenarioPlanner
+from .results import ResultsReader
+from .result_cache import ResultCache
+from .scenario_file import ScenarioFile
 from .simulation import Simulation
+from .snapshot import SnapshotCache
 
 
 class TyphoonAutomator(object):
@@ -15,9 +30,19 @@ class TyphoonAutomator(object):
     Interface for automating Typhoon HIL simulations
     """
 
-    def __init__(self):
+    def __init__(
+            self,
+            backend: HilBackend = None):
+        """ Create a Typhoon HIL automator
+
+        :param HilBackend backend: HIL backend to use, the Typhoon HIL API if None
+        """
         self._logger: logging.Logger = None              # Logger for automation log output
 
+        self._backend: HilBackend = backend              # HIL backend
+        if self._backend is None:
+            self._backend = TyphoonBackend()
+
         self._hil_setup: HilSetupManager = None          # HIL setup manager
         self._model: ModelManager = None                 # Model manager
         self._orchestrator: Orchestrator = None          # Simulation orchestrator
@@ -34,6 +59,14 @@ class TyphoonAutomator(object):
         self._simulation = self._create_simulation()
         self._orchestrator = self._create_orchestrator()
 
+    def get_backend(self) -> HilBackend:
+        """ Get the HIL backend used by the automator
+
+        :return HIL backend
+        :rtype HilBackend
+        """
+        return self._backend
+
     def set_automation_logger(
             self,
             logger: logging.Logger):
@@ -63,7 +96,7 @@ class TyphoonAutomator(object):
         :param BaseException ex: Exception to log
         """
         if self._logger:
-            self._logger.exception(ex)
+            self._logger.exception(ex, exc_info = ex)
 
     def initialize(
             self,
@@ -88,6 +121,24 @@ class TyphoonAutomator(object):
 
         self.log("Automator initialized")
 
+    def set_compile_cache(
+            self,
+            path: str,
+            max_size: int = 4 << 30,
+            library_paths: list[str] = None):
+        """ Set the directory for cached compiled models
+
+        Must be called before initialize.  Schematics whose contents, libraries and toolchain version match a
+        cached compiled model are not compiled again.
+
+        :param str path: Path to directory for cached compiled models
+        :param int max_size: Maximum total size (in bytes) of cached compiled models
+        :param list[str] library_paths: Library files or directories referenced by the schematic
+        """
+        if not path:
+            raise ValueError('Compile cache path cannot be empty')
+        self._model.set_compile_cache(CompileCache(path, max_size, library_paths))
+
     def get_available_devices(
             self,
             serial_numbers: list[str] = None) -> list[str]:
@@ -150,6 +201,186 @@ class TyphoonAutomator(object):
             raise ValueError('Capture path cannot be empty')  
         self._capture_path = path
 
+    def set_capture_csv(
+            self,
+            mode: str):
+        """ Set how capture CSV files are written
+
+        Capture results are always available in memory from Simulation.get_capture_result
+
+        :param str mode: Simulation.CAPTURE_CSV_HIL to let the HIL API write the file, Simulation.CAPTURE_CSV_BACKGROUND
+        to write it in the background while the next scenario runs, or Simulation.CAPTURE_CSV_NONE for no file
+        """
+        self._simulation.set_capture_csv(mode)
+
+    def set_output_conversion(
+            self,
+            output_format: str = FORMAT_AUTO,
+            chunk_rows: int = 65536,
+            delete_csv: bool = False):
+        """ Convert data logging and capture files to a compressed columnar format
+
+        Files are converted on a background process while the next scenario runs.  Scripts using output conversion
+        must guard their entry point with 'if __name__ == "__main__":'.
+
+        :param str output_format: 'npz', 'parquet', or 'auto' for Parquet when pyarrow is installed and NPZ otherwise
+        :param int chunk_rows: Number of rows converted at a time
+        :param bool delete_csv: True to delete CSV files once they are converted
+        """
+        converter = self._orchestrator.get_output_converter()
+        if converter is not None:
+            converter.shutdown()
+
+        self._orchestrator.set_output_converter(OutputConverter(output_format, chunk_rows, delete_csv))
+
+    def set_snapshot_cache(
+            self,
+            path: str,
+            max_size: int = 1 << 30):
+        """ Set the directory for cached warm-up snapshots
+
+        Scenarios which declare a warm-up prefix with get_warm_up are started from a snapshot of the prefix when
+        one has been cached for the compiled model
+
+        :param str path: Path to directory for snapshot files
+        :param int max_size: Maximum total size (in bytes) of cached snapshots
+        """
+        if not path:
+            raise ValueError('Snapshot cache path cannot be empty')
+        self._orchestrator.set_snapshot_cache(SnapshotCache(path, max_size))
+
+    def set_result_cache(
+            self,
+            path: str):
+        """ Set the directory for cached scenario results
+
+        Declarative scenarios, and scenarios with a get_scenario_id method, which have been run successfully on the
+        same compiled model are not run again.  Their previous output files are linked into the output paths.
+
+        :param str path: Path to directory for cached result records
+        """
+        if not path:
+            raise ValueError('Result cache path cannot be empty')
+        self._orchestrator.set_result_cache(ResultCache(path))
+
+    def invalidate_results(self):
+        """ Remove all cached scenario results
+        """
+        cache = self._orchestrator.get_result_cache()
+        if cache is not None:
+            cache.invalidate()
+
+    def set_campaign_journal(
+            self,
+            filename: str):
+        """ Set the campaign journal file
+
+        Every scenario state change is appended to the journal, which allows an interrupted campaign to be resumed
+
+        :param str filename: Journal file
+        """
+        if not filename:
+            raise ValueError('Journal filename cannot be empty')
+        self._orchestrator.set_journal(CampaignJournal(filename))
+
+    def set_run_catalog(
+            self,
+            filename: str):
+        """ Set the run catalog database file
+
+        Every scenario run is recorded in the catalog as it finishes, with its run ID, model hash, scenario ID and
+        parameters, wall times, simulated duration, output filenames and status
+
+        :param str filename: SQLite database file
+        """
+        if not filename:
+            raise ValueError('Catalog filename cannot be empty')
+        self._orchestrator.set_run_catalog(RunCatalog(filename))
+
+    def get_run_catalog(self) -> RunCatalog:
+        """ Get the run catalog, for querying recorded runs
+
+        :return Run catalog, None if runs are not cataloged
+        :rtype RunCatalog
+        """
+        return self._orchestrator.get_run_catalog()
+
+    def set_kpi_extraction(
+            self,
+            enabled: bool = True,
+            processes: int = None):
+        """ Enable or disable KPI extraction
+
+        KPIs declared by scenarios (see DeclarativeScenario) are computed from each scenario's outputs on a pool of
+        background processes, written to a JSON file alongside the outputs and recorded in the run catalog
+
+        :param bool enabled: True to compute KPIs, false otherwise
+        :param int processes: Number of worker processes, None for the number of processors
+        """
+        engine = self._orchestrator.get_kpi_engine()
+        if engine is not None:
+            engine.shutdown()
+
+        self._orchestrator.set_kpi_engine(KpiEngine(processes) if enabled else None)
+
+    def get_scenario_kpis(
+            self,
+            name: str) -> dict:
+        """ Get the KPIs of the last run of a scenario
+
+        :param str name: Scenario name
+        :return Dictionary of KPI values by name
+        :rtype dict
+        """
+        return self._orchestrator.get_scenario_kpis(name)
+
+    def set_scenario_planning(
+            self,
+            enabled: bool = True,
+            window: int = ScenarioPlanner.DEFAULT_WINDOW):
+        """ Enable or disable scenario planning
+
+        Planned scenarios are run in an order that groups scenarios with the same data logging signals, capture
+        configuration, warm-up and initial SCADA values, so the setup is only changed when it differs
+
+        :param bool enabled: True to plan the scenario order, false to run scenarios in the order they were added
+        :param int window: Number of scenarios ordered together, None to read all scenarios and order them at once
+        """
+        self._orchestrator.set_planner(ScenarioPlanner(window) if enabled else None)
+
+    def set_data_logger_reuse(
+            self,
+            enabled: bool = True):
+        """ Enable or disable keeping the data logger added between scenarios
+
+        Scenarios with the same data logging signals then reuse the data logger, which writes to a staging file
+        that is moved to each scenario's data logging file.  This is not yet verified on HIL hardware or on
+        Windows, see Simulation.set_data_logger_reuse.
+
+        :param bool enabled: True to keep the data logger added, false to add it for each scenario
+        """
+        self._simulation.set_data_logger_reuse(enabled)
+
+    def set_scada_write_dedup(
+            self,
+            enabled: bool = True):
+        """ Enable or disable skipping SCADA input writes of the value the input already has
+
+        Writes are only tracked between simulation starts and only when made through the automator, see
+        ModelManager.set_scada_write_dedup
+
+        :param bool enabled: True to skip repeated writes, false to make every write
+        """
+        self._model.set_scada_write_dedup(enabled)
+
+    def get_failures(self) -> dict:
+        """ Get the scenarios which failed in the last run
+
+        :return Dictionary of error descriptions by scenario name
+        :rtype dict
+        """
+        return self._orchestrator.get_failures()
+
     def add_scenario(
             self,
             name: str,
@@ -167,24 +398,121 @@ class TyphoonAutomator(object):
           scenario = scenario)
 
     def clear_scenarios(self):
-        raise NotImplementedError()
+        """ Remove all scenarios from the automation
+        """
+        if self._orchestrator is None:
+          raise RuntimeError("Automation is not initialized")
+
+        self._orchestrator.clear_scenarios()
+
+    def get_scenario_outputs(
+            self,
+            name: str) -> dict:
+        """ Get the output filenames of the last run of a scenario
+
+        :param str name: Scenario name
+        :return Dictionary of 'data_log', 'capture', 'dispatch' and 'kpis' filenames
+        :rtype dict
+        """
+        return self._orchestrator.get_scenario_outputs(name)
+
+    def get_scenario_run_id(
+            self,
+            name: str) -> str:
+        """ Get the run ID of the last run of a scenario
+
+        :param str name: Scenario name
+        :return Run ID
+        :rtype str
+        """
+        return self._orchestrator.get_scenario_run_id(name)
+
+    def open_results(
+            self,
+            name: str,
+            output: str = "data_log",
+            prefer_converted: bool = True) -> ResultsReader:
+        """ Open an output of the last run of a scenario for reading
+
+        :param str name: Scenario name
+        :param str output: Output to open, 'data_log' or 'capture'
+        :param bool prefer_converted: True to read the converted output file when there is one
+        :return Output reader, which should be closed after use
+        :rtype ResultsReader
+        """
+        if self._orchestrator is None:
+          raise RuntimeError("Automation is not initialized")
+
+        if output not in ("data_log", "capture"):
+            raise ValueError(f"Invalid output type ({output})")
+
+        filename = self._orchestrator.get_scenario_outputs(name).get(output)
+        if filename is None:
+            raise ValueError(f"Scenario {name} has no {output} output")
+
+        return ResultsReader.open(filename, prefer_converted = prefer_converted)
+
+    def add_scenarios(
+            self,
+            scenarios: Iterable[tuple[str, Any]]):
+        """ Add an iterable of (name, scenario) tuples to be simulated
+
+        The iterable is consumed lazily while the scenarios run
+
+        :param scenarios: Iterable of (name, scenario) tuples
+        """
+        if self._orchestrator is None:
+          raise RuntimeError("Automation is not initialized")
+
+        self._orchestrator.add_scenarios(scenarios)
 
     def load_scenarios(
             self,
             filename: str):
-        raise NotImplementedError()
+        """ Add the scenarios of a scenario file to be simulated
+
+        The file is read incrementally while the scenarios run rather than loaded up front
+
+        :param str filename: Scenario file
+        """
+        if self._orchestrator is None:
+          raise RuntimeError("Automation is not initialized")
+
+        self.log(f"Loading scenarios from file {filename}")
+        self._orchestrator.add_scenarios(ScenarioFile(filename))
 
     def save_scenarios(
             self,
             filename: str):
-        raise NotImplementedError()
+        """ Save all scenarios to a scenario file
+
+        Scenarios must be declarative (have a to_dict method)
+
+        :param str filename: Scenario file
+        """
+        if self._orchestrator is None:
+          raise RuntimeError("Automation is not initialized")
+
+        count = ScenarioFile.write(filename, self._orchestrator.iterate_scenarios())
+        self.log(f"Saved {count} scenarios to file {filename}")
 
     def run(
             self,
-            use_vhil: bool = False):
+            use_vhil: bool = False,
+            force_reload: bool = False,
+            force_rerun: bool = False,
+            resume: bool = False,
+            continue_on_error: bool = False):
         """ Run all scenarios in the automation
 
-        :param bool use_vhil:
+        The compiled model is only loaded to the setup if it is not already loaded, otherwise it is reset to its
+        initial state
+
+        :param bool use_vhil: True if Virtual HIL should be used, false otherwise
+        :param bool force_reload: True to always load the compiled model to the setup
+        :param bool force_rerun: True to run scenarios even if they have cached results
+        :param bool resume: True to skip scenarios the campaign journal records as completed
+        :param bool continue_on_error: True to record failed scenarios and continue, false to stop at the first failure
         """
         if (self._orchestrator is None) or (self._model is None):
             raise RuntimeError("Automation is not initialized")
@@ -197,12 +525,18 @@ class TyphoonAutomator(object):
         if self._capture_path:
             self._orchestrator.set_capture_path(self._capture_path)
 
-        self._model.load_to_setup(use_vhil = use_vhil)
+        self._model.load_to_setup(
+            use_vhil = use_vhil,
+            setup_identity = self._hil_setup.get_setup_identity(),
+            force = force_reload)
     
         start_time = datetime.now()
         self.log(f"Starting scenario simulations at {start_time.strftime('%H:%M:%S, %m/%d/%Y')}")
     
-        self._orchestrator.run_all()
+        self._orchestrator.run_all(
+            force = force_rerun,
+            resume = resume,
+            continue_on_error = continue_on_error)
     
         stop_time = datetime.now()
         self.log(f"Ended scenario simulations at {stop_time.strftime('%H:%M:%S, %m/%d/%Y')}")
@@ -213,6 +547,21 @@ class TyphoonAutomator(object):
         """
         
         self.log(f"Shutting down automation")
+
+        # Finish output conversions
+        converter = self._orchestrator.get_output_converter()
+        if converter is not None:
+            converter.shutdown()
+
+        # Finish KPI computations
+        engine = self._orchestrator.get_kpi_engine()
+        if engine is not None:
+            engine.shutdown()
+
+        # Close run catalog
+        catalog = self._orchestrator.get_run_catalog()
+        if catalog is not None:
+            catalog.close()
   
         # Stop simulation if needed
         try:
@@ -236,11 +585,13 @@ class TyphoonAutomator(object):
 
     def _create_hilsetup(self) -> HilSetupManager:
         return HilSetupManager(
-            automator = self)
+            automator = self,
+            backend = self._backend)
 
     def _create_modelmanager(self) -> ModelManager:
          return ModelManager(
-            automator = self)
+            automator = self,
+            backend = self._backend)
 
     def _create_orchestrator(self) -> Orchestrator:
         if self._simulation is None:
@@ -256,7 +607,8 @@ class TyphoonAutomator(object):
 
         return Simulation(
             automator = self,
-            model = self._model)
+            model = self._model,
+            backend = self._backend)
 
 
 class Utility(object):
@@ -267,20 +619,19 @@ class Utility(object):
 
     def create_callback_event(
             message: str,
-            callback) -> Any:
+            callback,
+            message_args: tuple = ()) -> CallbackEvent:
         """ Create a generic callback event
 
         The function to be called should take a Simulation object as the only argument
 
-        :param str message: The message to be logged when the event is invoked
+        :param str message: The message to be logged when the event is invoked, may contain %-style format specifiers
         :param callback: Function to call when invoked
+        :param tuple message_args: Arguments for the message, formatted only when the event is logged
         :return An object with a 'message' string and an 'invoke(Simulation)' method
-        :rtype Any
+        :rtype CallbackEvent
         """
-        class _CallbackEvent(object):
-            pass
-        
-        event = _CallbackEvent()
-        setattr(event, "message", message)
-        setattr(event, "invoke", callback)
-        return event
+        return CallbackEvent(
+            message = message,
+            callback = callback,
+            message_args = message_args)
@@ -0,0 +1,76 @@
+from typing import Any
+
+
+class HilBackend(object):
+    """ HIL backend interface
+
+    Provides the Typhoon API objects used by the automator.  The HIL object must provide the functions of the
+    typhoon.api.hil module used by the automator, the schematic object those of SchematicAPI and the device
+    manager object those of DeviceManagerAPI.
+    """
+
+    NAME: str = "base"
+
+    def get_hil(self) -> Any:
+        """ Get the HIL API
+
+        :return Object providing the typhoon.api.hil functions
+        """
+        raise NotImplementedError()
+
+    def create_schematic_api(self) -> Any:
+        """ Create a schematic editor API
+
+        :return Object providing the SchematicAPI methods
+        """
+        raise NotImplementedError()
+
+    def create_device_manager_api(self) -> Any:
+        """ Create a device manager API
+
+        :return Object providing the DeviceManagerAPI methods
+        """
+        raise NotImplementedError()
+
+    def get_toolchain_version(self) -> str:
+        """ Get the version of the HIL toolchain
+
+        :return Version string
+        :rtype str
+        """
+        raise NotImplementedError()
+
+
+class TyphoonBackend(HilBackend):
+    """ Typhoon HIL API backend
+
+    Uses the Typhoon HIL API modules, which require a Typhoon HIL Control Center installation
+    """
+
+    NAME: str = "typhoon"
+
+    def __init__(self):
+        import typhoon.api.hil as hil
+
+        self._hil = hil
+
+    def get_hil(self) -> Any:
+        return self._hil
+
+    def create_schematic_api(self) -> Any:
+        import typhoon.api.schematic_editor as schematic_editor
+
+        return schematic_editor.SchematicAPI()
+
+    def create_device_manager_api(self) -> Any:
+        import typhoon.api.device_manager as device_manager
+
+        return device_manager.DeviceManagerAPI()
+
+    def get_toolchain_version(self) -> str:
+        from importlib import metadata
+
+        try:
+            return metadata.version("Typhoon-HIL-API")
+        except metadata.PackageNotFoundError:
+            return "unknown"
@@ -0,0 +1,112 @@
+import csv
+
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CaptureResult(object):
+    """ Result of a signal capture
+
+    Holds the captured samples in memory as NumPy arrays: the simulation time of each sample and one array of
+    samples per channel
+    """
+
+    def __init__(
+            self,
+            time: Any,
+            channels: dict[str, Any],
+            decimation: int,
+            timestep: float):
+        """ Create a capture result
+
+        :param time: Array of sample simulation times
+        :param dict channels: Dictionary of sample arrays by channel name
+        :param int decimation: Capture decimation
+        :param float timestep: Model timestep
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for capture results")
+
+        self.time = np.asarray(time, dtype = np.float64)
+        self.channels: dict[str, Any] = {name: np.asarray(samples) for name, samples in channels.items()}
+        self.decimation = decimation
+        self.timestep = timestep
+
+        for name, samples in self.channels.items():
+            if len(samples) != len(self.time):
+                raise ValueError(f"Capture channel {name} has {len(samples)} samples, expected {len(self.time)}")
+
+    def from_buffer(
+            buffer: list,
+            decimation: int,
+            timestep: float,
+            time_offset: float = 0.0):
+        """ Create a capture result from a HIL capture buffer
+
+        The buffer holds a single (signal names, data matrix, time vector) entry once the capture is complete
+
+        :param list buffer: Capture data buffer passed to start_capture
+        :param int decimation: Capture decimation
+        :param float timestep: Model timestep
+        :param float time_offset: Offset added to the captured times
+        :return Capture result, None if the buffer is empty
+        :rtype CaptureResult
+        """
+        if not buffer:
+            return None
+
+        signals, data, times = buffer[0]
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data.reshape(1, -1)
+
+        time = np.asarray(times, dtype = np.float64)
+        if time_offset:
+            time = time + time_offset
+
+        return CaptureResult(
+            time = time,
+            channels = {name: data[index] for index, name in enumerate(signals)},
+            decimation = decimation,
+            timestep = timestep)
+
+    def get_channel_names(self) -> list[str]:
+        """ Get the names of the captured channels
+
+        :rtype list[str]
+        """
+        return list(self.channels.keys())
+
+    def get_sample_period(self) -> float:
+        """ Get the simulation time between samples
+
+        :return Sample period (in seconds)
+        :rtype float
+        """
+        return self.decimation * self.timestep
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def write_csv(
+            self,
+            filename: str,
+            chunk_size: int = 65536):
+        """ Write the capture to a CSV file with a time column followed by a column per channel
+
+        :param str filename: CSV file
+        :param int chunk_size: Number of rows converted to text at a time
+        """
+        names = self.get_channel_names()
+        columns = [self.time] + [self.channels[name] for name in names]
+
+        with open(filename, "w", newline = "") as capture_file:
+            writer = csv.writer(capture_file)
+            writer.writerow(["Time"] + names)
+            for start in range(0, len(self.time), chunk_size):
+                rows = np.column_stack([column[start:start + chunk_size] for column in columns])
+                writer.writerows(rows.tolist())
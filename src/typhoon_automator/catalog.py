@@ -0,0 +1,273 @@
+import json
+import sqlite3
+import uuid
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+
+class RunCatalog(object):
+    """ Run catalog
+
+    SQLite database with a row per scenario run, written as each scenario finishes.  Each run records the model hash,
+    scenario name, ID and parameters, start and stop wall time, simulated duration, output filenames, status and
+    KPIs.  Runs are indexed by model hash and scenario ID, scenario name, start time, status and KPI name, so runs
+    can be found without searching output directories.
+
+    Every run has a unique run ID, which is also part of its output filenames.
+    """
+
+    COMPLETED: str = "completed"    # Scenario was simulated
+    CACHED: str = "cached"          # Scenario result was reused from the result cache
+    FAILED: str = "failed"          # Scenario run failed
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            campaign_id TEXT,
+            scenario_name TEXT NOT NULL,
+            scenario_id TEXT,
+            model_hash TEXT,
+            parameters TEXT,
+            status TEXT NOT NULL,
+            start_time REAL,
+            stop_time REAL,
+            sim_duration REAL,
+            outputs TEXT,
+            error TEXT);
+        CREATE INDEX IF NOT EXISTS runs_model_scenario ON runs (model_hash, scenario_id, start_time);
+        CREATE INDEX IF NOT EXISTS runs_name ON runs (scenario_name, start_time);
+        CREATE INDEX IF NOT EXISTS runs_start ON runs (start_time);
+        CREATE INDEX IF NOT EXISTS runs_status ON runs (status, start_time);
+        CREATE INDEX IF NOT EXISTS runs_campaign ON runs (campaign_id);
+        CREATE TABLE IF NOT EXISTS kpis (
+            run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            value REAL,
+            PRIMARY KEY (run_id, name));
+        CREATE INDEX IF NOT EXISTS kpis_name ON kpis (name, value);
+        """
+
+    def __init__(
+            self,
+            filename: str):
+        """ Create a run catalog
+
+        :param str filename: Database file, created if it does not exist
+        """
+        if not filename:
+            raise ValueError("Catalog filename cannot be empty")
+
+        self._filename = filename
+        Path(filename).parent.mkdir(parents = True, exist_ok = True)
+
+        self._connection: sqlite3.Connection = None
+
+    def get_filename(self) -> str:
+        """ Get the catalog filename
+
+        :rtype str
+        """
+        return self._filename
+
+    def new_run_id() -> str:
+        """ Create a unique run ID
+
+        :return Run ID of 32 hex digits
+        :rtype str
+        """
+        return uuid.uuid4().hex
+
+    def open(self):
+        """ Open the catalog, creating its tables if needed """
+        if self._connection is not None:
+            return
+
+        self._connection = sqlite3.connect(self._filename)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(RunCatalog._SCHEMA)
+        self._connection.commit()
+
+    def close(self):
+        """ Close the catalog """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def record_run(
+            self,
+            run_id: str,
+            scenario_name: str,
+            status: str,
+            campaign_id: str = None,
+            scenario_id: str = None,
+            model_hash: str = None,
+            parameters: dict = None,
+            start_time: datetime = None,
+            stop_time: datetime = None,
+            sim_duration: float = None,
+            outputs: dict = None,
+            kpis: dict[str, float] = None,
+            error: str = None):
+        """ Record a scenario run, replacing any earlier record of the same run ID
+
+        :param str run_id: Run ID
+        :param str scenario_name: Scenario name
+        :param str status: COMPLETED, CACHED or FAILED
+        :param str campaign_id: ID of the campaign the run is part of
+        :param str scenario_id: Stable scenario ID
+        :param str model_hash: Hash of the compiled model
+        :param dict parameters: Scenario parameters, must be JSON serializable
+        :param datetime start_time: Wall time the run started
+        :param datetime stop_time: Wall time the run stopped
+        :param float sim_duration: Simulated duration (in seconds)
+        :param dict outputs: Output filenames by output type
+        :param dict kpis: KPI values by KPI name
+        :param str error: Error description of a failed run
+        """
+        if not run_id:
+            raise ValueError("Run ID cannot be empty")
+
+        self.open()
+        with self._connection:
+            self._connection.execute("DELETE FROM kpis WHERE run_id = ?", (run_id,))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO runs (run_id, campaign_id, scenario_name, scenario_id, model_hash, parameters, "
+                "status, start_time, stop_time, sim_duration, outputs, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    campaign_id,
+                    scenario_name,
+                    scenario_id,
+                    model_hash,
+                    None if parameters is None else json.dumps(parameters, sort_keys = True, default = repr),
+                    status,
+                    RunCatalog._to_timestamp(start_time),
+                    RunCatalog._to_timestamp(stop_time),
+                    sim_duration,
+                    None if outputs is None else json.dumps(outputs),
+                    error))
+
+            if kpis:
+                self._insert_kpis(run_id, kpis)
+
+    def set_kpis(
+            self,
+            run_id: str,
+            kpis: dict[str, float]):
+        """ Add or replace KPI values of a recorded run
+
+        :param str run_id: Run ID
+        :param dict kpis: KPI values by KPI name
+        """
+        self.open()
+        with self._connection:
+            self._insert_kpis(run_id, kpis)
+
+    def get_run(
+            self,
+            run_id: str) -> dict:
+        """ Get a recorded run
+
+        :param str run_id: Run ID
+        :return Run dictionary, None if the run is not recorded
+        :rtype dict
+        """
+        runs = self._query("SELECT * FROM runs WHERE run_id = ?", (run_id,))
+        return runs[0] if runs else None
+
+    def find_runs(
+            self,
+            scenario_name: str = None,
+            scenario_id: str = None,
+            model_hash: str = None,
+            campaign_id: str = None,
+            status: str = None,
+            since: datetime = None,
+            until: datetime = None,
+            limit: int = None) -> list[dict]:
+        """ Find recorded runs, most recent first
+
+        Criteria which are None are not applied
+
+        :param str scenario_name: Scenario name
+        :param str scenario_id: Stable scenario ID
+        :param str model_hash: Hash of the compiled model
+        :param str campaign_id: Campaign ID
+        :param str status: Run status
+        :param datetime since: Earliest start wall time
+        :param datetime until: Latest start wall time
+        :param int limit: Maximum number of runs returned, None for all
+        :return List of run dictionaries with the columns of the run and a 'kpis' dictionary
+        :rtype list[dict]
+        """
+        criteria = [
+            ("scenario_name = ?", scenario_name),
+            ("scenario_id = ?", scenario_id),
+            ("model_hash = ?", model_hash),
+            ("campaign_id = ?", campaign_id),
+            ("status = ?", status),
+            ("start_time >= ?", RunCatalog._to_timestamp(since)),
+            ("start_time <= ?", RunCatalog._to_timestamp(until))]
+
+        clauses = [clause for clause, value in criteria if value is not None]
+        values = [value for _, value in criteria if value is not None]
+
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY start_time DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(int(limit))
+
+        return self._query(sql, values)
+
+    def _query(
+            self,
+            sql: str,
+            values: Any) -> list[dict]:
+        """ Query runs and attach their KPIs """
+        self.open()
+        runs = [RunCatalog._to_run(row) for row in self._connection.execute(sql, values)]
+
+        for run in runs:
+            rows = self._connection.execute("SELECT name, value FROM kpis WHERE run_id = ?", (run["run_id"],))
+            run["kpis"] = {row["name"]: row["value"] for row in rows}
+
+        return runs
+
+    def _insert_kpis(
+            self,
+            run_id: str,
+            kpis: dict[str, float]):
+        """ Insert or replace KPI values, within the caller's transaction """
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO kpis (run_id, name, value) VALUES (?, ?, ?)",
+            [(run_id, name, None if value is None else float(value)) for name, value in kpis.items()])
+
+    def _to_run(row: sqlite3.Row) -> dict:
+        """ Convert a runs row to a run dictionary """
+        run = dict(row)
+        for key in ("parameters", "outputs"):
+            if run[key] is not None:
+                run[key] = json.loads(run[key])
+
+        for key in ("start_time", "stop_time"):
+            if run[key] is not None:
+                run[key] = datetime.fromtimestamp(run[key])
+
+        return run
+
+    def _to_timestamp(value: datetime) -> float:
+        """ Convert a wall time to a POSIX timestamp """
+        if value is None:
+            return None
+
+        if isinstance(value, datetime):
+            return value.timestamp()
+
+        return float(value)
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from pathlib import Path
+
+
+class CompileCache(object):
+    """ Compiled model cache
+
+    Stores compiled model artifacts keyed by a hash of the schematic contents, the referenced library files
+    and the toolchain version, so an unchanged schematic does not need to be compiled again, even from a
+    different directory or machine sharing the cache.  The least recently used entries are evicted when the
+    cache exceeds its size limit.
+    """
+
+    LIBRARY_PATTERNS: tuple[str] = ("*.tlib",)     # Library files included in the key of library directories
+    _USED_MARKER: str = ".used"                     # File touched each time an entry is used
+    _NAME_FILE: str = ".compiled"                   # File holding the compiled model file name of an entry
+
+    def __init__(
+            self,
+            directory: str,
+            max_size: int = 4 << 30,
+            library_paths: list[str] = None):
+        """ Create a compile cache
+
+        :param str directory: Cache directory, created if it does not exist
+        :param int max_size: Maximum total size (in bytes) of cached artifacts
+        :param list[str] library_paths: Library files or directories of library files referenced by schematics
+        """
+        if not directory:
+            raise ValueError("Compile cache directory cannot be empty")
+
+        if max_size <= 0:
+            raise ValueError(f"Invalid compile cache size ({max_size})")
+
+        self._directory = Path(directory)
+        self._directory.mkdir(parents = True, exist_ok = True)
+        self._max_size = max_size
+        self._library_paths = list(library_paths) if library_paths else []
+
+    def get_key(
+            self,
+            schematic_filename: str,
+            toolchain_version: str) -> str:
+        """ Get the cache key of a schematic
+
+        :param str schematic_filename: Schematic file
+        :param str toolchain_version: Version of the compiler toolchain
+        :return Cache key
+        :rtype str
+        """
+        digest = hashlib.sha256()
+        digest.update(f"toolchain\0{toolchain_version}\0".encode("utf-8"))
+
+        CompileCache._update_file(digest, "schematic", Path(schematic_filename))
+        for library in self._get_library_files():
+            CompileCache._update_file(digest, library.name, library)
+
+        return digest.hexdigest()
+
+    def lookup(
+            self,
+            key: str) -> str:
+        """ Look up a compiled model, marking it as recently used
+
+        :param str key: Cache key
+        :return Cached compiled model filename, None if not cached
+        :rtype str
+        """
+        entry = self._directory / key
+        try:
+            compiled_name = (entry / CompileCache._NAME_FILE).read_text().strip()
+        except FileNotFoundError:
+            return None
+
+        compiled_filename = entry / compiled_name
+        if not compiled_filename.exists():
+            return None
+
+        (entry / CompileCache._USED_MARKER).touch()
+        return str(compiled_filename)
+
+    def store(
+            self,
+            key: str,
+            compiled_filename: str) -> str:
+        """ Store a compiled model and evict entries over the size limit
+
+        The directory containing the compiled model file is copied into the cache
+
+        :param str key: Cache key
+        :param str compiled_filename: Compiled model file
+        :return Cached compiled model filename
+        :rtype str
+        """
+        source = Path(compiled_filename)
+        if not source.exists():
+            raise FileNotFoundError(f"Compiled model file not found: {compiled_filename}")
+
+        entry = self._directory / key
+        if not entry.exists():
+            # Copy to a temporary directory first so incomplete entries are never visible
+            staging = Path(tempfile.mkdtemp(prefix = ".staging-", dir = self._directory))
+            try:
+                shutil.copytree(source.parent, staging, dirs_exist_ok = True)
+                (staging / CompileCache._NAME_FILE).write_text(source.name)
+                (staging / CompileCache._USED_MARKER).touch()
+                os.replace(staging, entry)
+            except OSError:
+                shutil.rmtree(staging, ignore_errors = True)
+                if not entry.exists():
+                    raise
+
+        self.evict(keep = key)
+        return str(entry / source.name)
+
+    def evict(
+            self,
+            keep: str = None):
+        """ Remove the least recently used entries until the cache is within its size limit
+
+        :param str keep: Key of an entry which must not be evicted
+        """
+        entries = []
+        total_size = 0
+        for entry in self._directory.iterdir():
+            if (not entry.is_dir()) or entry.name.startswith("."):
+                continue
+
+            size = CompileCache._get_directory_size(entry)
+            marker = entry / CompileCache._USED_MARKER
+            last_used = marker.stat().st_mtime_ns if marker.exists() else 0
+            entries.append((last_used, entry.name, size))
+            total_size += size
+
+        entries.sort()
+        for _, name, size in entries:
+            if total_size <= self._max_size:
+                break
+
+            if name == keep:
+                continue
+
+            shutil.rmtree(self._directory / name, ignore_errors = True)
+            total_size -= size
+
+    def _get_library_files(self) -> list[Path]:
+        """ Get the library files included in the cache key, in a stable order """
+        files = []
+        for library_path in self._library_paths:
+            path = Path(library_path)
+            if path.is_dir():
+                for pattern in CompileCache.LIBRARY_PATTERNS:
+                    files.extend(path.rglob(pattern))
+            elif path.exists():
+                files.append(path)
+            else:
+                raise FileNotFoundError(f"Library path not found: {library_path}")
+
+        return sorted(set(files))
+
+    def _update_file(
+            digest,
+            label: str,
+            path: Path):
+        """ Add a labelled file's contents to a digest """
+        digest.update(f"{label}\0{path.stat().st_size}\0".encode("utf-8"))
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+
+    def _get_directory_size(path: Path) -> int:
+        """ Get the total size of the files in a directory tree """
+        return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
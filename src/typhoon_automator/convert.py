@@ -0,0 +1,330 @@
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import zipfile
+
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+FORMAT_AUTO: str = "auto"           # Parquet if pyarrow is installed, otherwise NPZ
+FORMAT_NPZ: str = "npz"             # Chunked, compressed NumPy archive
+FORMAT_PARQUET: str = "parquet"     # Parquet file with a row group per chunk
+
+SIDECAR_SUFFIX: str = ".json"
+
+_UNIT_PATTERN = re.compile(r"^(.*?)\s*[\[(]([^\])]*)[\])]\s*$")
+
+
+class OutputConverter(object):
+    """ Output file converter
+
+    Converts data logging and capture CSV files to a compressed columnar format on a background process, so
+    conversion of one scenario's outputs overlaps the simulation of the next without competing for the interpreter.
+    Each converted file has a JSON sidecar with the signal names, units, row count, simulation time range and
+    chunk layout.
+    """
+
+    def __init__(
+            self,
+            output_format: str = FORMAT_AUTO,
+            chunk_rows: int = 65536,
+            delete_csv: bool = False):
+        """ Create an output converter
+
+        :param str output_format: FORMAT_NPZ, FORMAT_PARQUET or FORMAT_AUTO
+        :param int chunk_rows: Number of rows converted at a time, which bounds the memory used
+        :param bool delete_csv: True to delete CSV files once they are converted
+        """
+        if output_format == FORMAT_AUTO:
+            output_format = FORMAT_PARQUET if (pyarrow is not None) else FORMAT_NPZ
+
+        if output_format == FORMAT_PARQUET:
+            if pyarrow is None:
+                raise RuntimeError("pyarrow is required for Parquet output")
+        elif output_format == FORMAT_NPZ:
+            if np is None:
+                raise RuntimeError("NumPy is required for NPZ output")
+        else:
+            raise ValueError(f"Invalid output format ({output_format})")
+
+        if chunk_rows < 1:
+            raise ValueError(f"Invalid chunk size ({chunk_rows})")
+
+        self._format = output_format
+        self._chunk_rows = chunk_rows
+        self._delete_csv = delete_csv
+
+        self._executor: ProcessPoolExecutor = None
+        self._pending: list[tuple[str, Future]] = []
+
+    def get_format(self) -> str:
+        """ Get the output format
+
+        :rtype str
+        """
+        return self._format
+
+    def get_output_filename(
+            self,
+            filename: str) -> str:
+        """ Get the name of the converted file for a CSV file
+
+        :param str filename: CSV file
+        :return Converted filename
+        :rtype str
+        """
+        return str(Path(filename).with_suffix(f".{self._format}"))
+
+    def submit(
+            self,
+            filename: str) -> Future:
+        """ Convert a CSV file in the background
+
+        :param str filename: CSV file
+        :return Future of the converted filename
+        :rtype Future
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers = 1,
+                mp_context = multiprocessing.get_context("spawn"))
+
+        future = self._executor.submit(
+            convert_csv,
+            filename,
+            self.get_output_filename(filename),
+            self._format,
+            self._chunk_rows,
+            self._delete_csv)
+
+        self._pending.append((filename, future))
+        return future
+
+    def wait(self) -> dict[str, BaseException]:
+        """ Wait for all submitted conversions to complete
+
+        :return Dictionary of the exceptions of failed conversions by CSV filename
+        :rtype dict
+        """
+        pending = self._pending
+        self._pending = []
+
+        errors = {}
+        for filename, future in pending:
+            try:
+                future.result()
+            except BaseException as ex:
+                errors[filename] = ex
+
+        return errors
+
+    def shutdown(self):
+        """ Wait for all conversions and stop the background process """
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def convert_csv(
+        filename: str,
+        output_filename: str,
+        output_format: str = FORMAT_NPZ,
+        chunk_rows: int = 65536,
+        delete_csv: bool = False) -> str:
+    """ Convert a CSV file with a time column followed by signal columns to a columnar format
+
+    The first row must be a header.  Header names may carry a unit in brackets, e.g. 'V_cap [V]'.
+
+    :param str filename: CSV file
+    :param str output_filename: Converted file
+    :param str output_format: FORMAT_NPZ or FORMAT_PARQUET
+    :param int chunk_rows: Number of rows converted at a time
+    :param bool delete_csv: True to delete the CSV file once it is converted
+    :return Converted filename
+    :rtype str
+    """
+    with open(filename, encoding = "utf-8") as csv_file:
+        names, units = parse_header(csv_file.readline())
+
+    temp_filename = f"{output_filename}.tmp"
+    try:
+        if output_format == FORMAT_PARQUET:
+            chunks = _write_parquet(filename, temp_filename, names, chunk_rows)
+        elif output_format == FORMAT_NPZ:
+            chunks = _write_npz(filename, temp_filename, names, chunk_rows)
+        else:
+            raise ValueError(f"Invalid output format ({output_format})")
+
+        os.replace(temp_filename, output_filename)
+    except BaseException:
+        Path(temp_filename).unlink(missing_ok = True)
+        raise
+
+    rows = sum(chunk["rows"] for chunk in chunks)
+    time_range = None
+    if chunks:
+        time_range = [chunks[0]["time_range"][0], chunks[-1]["time_range"][1]]
+
+    sidecar = {
+        "source": Path(filename).name,
+        "file": Path(output_filename).name,
+        "format": output_format,
+        "time": names[0],
+        "signals": names[1:],
+        "units": units,
+        "rows": rows,
+        "time_range": time_range,
+        "chunks": chunks}
+
+    sidecar_filename = get_sidecar_filename(output_filename)
+    with open(f"{sidecar_filename}.tmp", "w", encoding = "utf-8") as sidecar_file:
+        json.dump(sidecar, sidecar_file, indent = 2)
+    os.replace(f"{sidecar_filename}.tmp", sidecar_filename)
+
+    if delete_csv:
+        Path(filename).unlink()
+
+    return output_filename
+
+
+def get_sidecar_filename(filename: str) -> str:
+    """ Get the name of the sidecar of a converted file
+
+    :param str filename: Converted file
+    :return Sidecar filename
+    :rtype str
+    """
+    return str(Path(filename).with_suffix(SIDECAR_SUFFIX))
+
+
+def get_npz_entry_name(
+        column: int,
+        chunk: int) -> str:
+    """ Get the archive entry name of a column chunk of an NPZ file
+
+    :param int column: Column index, the time column is 0
+    :param int chunk: Chunk index
+    :return Entry name, without the '.npy' extension
+    :rtype str
+    """
+    return f"c{column:04d}_{chunk:06d}"
+
+
+def _write_npz(
+        filename: str,
+        output_filename: str,
+        names: list[str],
+        chunk_rows: int) -> list[dict]:
+    """ Write a CSV file to an NPZ archive with an entry per column chunk """
+    chunks = []
+    with open(filename, encoding = "utf-8") as csv_file, \
+            zipfile.ZipFile(output_filename, "w", compression = zipfile.ZIP_DEFLATED, allowZip64 = True) as archive:
+        csv_file.readline()
+
+        while True:
+            lines = list(itertools.islice(csv_file, chunk_rows))
+            if not lines:
+                break
+
+            data = np.loadtxt(lines, delimiter = ",", dtype = np.float64, ndmin = 2)
+            if data.shape[1] != len(names):
+                raise ValueError(f"Expected {len(names)} columns, found {data.shape[1]} ({filename})")
+
+            chunk = len(chunks)
+            for column in range(len(names)):
+                with archive.open(f"{get_npz_entry_name(column, chunk)}.npy", "w", force_zip64 = True) as entry:
+                    np.lib.format.write_array(entry, np.ascontiguousarray(data[:, column]))
+
+            chunks.append({"rows": int(data.shape[0]), "time_range": [float(data[0, 0]), float(data[-1, 0])]})
+
+    return chunks
+
+
+def _write_parquet(
+        filename: str,
+        output_filename: str,
+        names: list[str],
+        chunk_rows: int) -> list[dict]:
+    """ Write a CSV file to a Parquet file with a row group per chunk """
+    read_options = pyarrow.csv.ReadOptions(column_names = names, skip_rows = 1, block_size = 1 << 22)
+    convert_options = pyarrow.csv.ConvertOptions(
+        column_types = {name: pyarrow.float64() for name in names})
+
+    chunks = []
+    writer = None
+    try:
+        reader = pyarrow.csv.open_csv(filename, read_options = read_options, convert_options = convert_options)
+        for batch in reader:
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(output_filename, batch.schema, compression = "zstd")
+
+            for start in range(0, batch.num_rows, chunk_rows):
+                rows = batch.slice(start, chunk_rows)
+                writer.write_batch(rows, row_group_size = chunk_rows)
+
+                time = rows.column(0)
+                chunks.append({
+                    "rows": rows.num_rows,
+                    "time_range": [time[0].as_py(), time[rows.num_rows - 1].as_py()]})
+
+        if writer is None:
+            schema = pyarrow.schema([(name, pyarrow.float64()) for name in names])
+            writer = pyarrow.parquet.ParquetWriter(output_filename, schema, compression = "zstd")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return chunks
+
+
+def parse_header(header: str) -> tuple[list[str], dict[str, str]]:
+    """ Parse the header row of an output CSV file
+
+    Header names may be quoted, and quoted names may contain commas
+
+    :param str header: Header row
+    :return List of column names, and dictionary of units by column name for columns with a unit
+    :rtype tuple[list[str], dict[str, str]]
+    """
+    names = []
+    units = {}
+    for row in csv.reader([header.strip()], skipinitialspace = True):
+        for column in row:
+            name, unit = split_unit(column.strip())
+            names.append(name)
+            if unit:
+                units[name] = unit
+
+    return (names, units)
+
+
+def split_unit(column: str) -> tuple[str, str]:
+    """ Split a CSV header name into the signal name and unit
+
+    :param str column: Header name, e.g. 'V_cap [V]'
+    :return (name, unit) tuple, the unit is None if the header has none
+    :rtype tuple[str, str]
+    """
+    match = _UNIT_PATTERN.match(column)
+    if match and match.group(1):
+        return (match.group(1), match.group(2).strip())
+
+    return (column, None)
@@ -0,0 +1,88 @@
+from typing import Any
+from typing import Callable
+
+
+class CallbackEvent(object):
+    """ Generic callback event
+
+    Calls a function with the Simulation object as the only argument when invoked.  The log message may be
+    given as a format string with arguments, in which case it is only formatted when the event is logged.
+    """
+
+    __slots__ = ("invoke", "_message", "_message_args")
+
+    def __init__(
+            self,
+            message: str,
+            callback: Callable[[Any], Any],
+            message_args: tuple = ()):
+        """ Create a callback event
+
+        :param str message: The message to be logged when the event is invoked, may contain %-style format specifiers
+        :param callback: Function to call when invoked
+        :param tuple message_args: Arguments for the message format specifiers
+        """
+        if not callable(callback):
+            raise ValueError("Event callback is not callable")
+
+        self.invoke = callback
+        self._message = message
+        self._message_args = message_args
+
+    @property
+    def message(self) -> str:
+        """ Log message of the event
+
+        :rtype str
+        """
+        if self._message_args:
+            return self._message % self._message_args
+
+        return self._message
+
+    def __repr__(self) -> str:
+        return f"CallbackEvent({self._message!r}, {self.invoke!r})"
+
+
+class ScadaWriteEvent(object):
+    """ SCADA input write event
+
+    Sets a SCADA input to a value when invoked
+    """
+
+    __slots__ = ("scada_name", "value")
+
+    def __init__(
+            self,
+            scada_name: str,
+            value: Any):
+        """ Create a SCADA input write event
+
+        :param str scada_name: Name of the SCADA input
+        :param value: Value to write
+        """
+        if not scada_name:
+            raise ValueError("SCADA input name cannot be empty")
+
+        self.scada_name = scada_name
+        self.value = value
+
+    @property
+    def message(self) -> str:
+        """ Log message of the event
+
+        :rtype str
+        """
+        return f"Setting {self.scada_name} to {self.value}"
+
+    def invoke(
+            self,
+            simulation):
+        """ Write the value to the SCADA input
+
+        :param Simulation simulation: Simulation to write to
+        """
+        simulation.set_scada_value(name = self.scada_name, value = self.value)
+
+    def __repr__(self) -> str:
+        return f"ScadaWriteEvent({self.scada_name!r}, {self.value!r})"
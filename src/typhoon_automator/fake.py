@@ -0,0 +1,472 @@
+import csv
+import json
+import math
+import time
+
+from collections import Counter
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from .backend import HilBackend
+from .tse import read_schematic_info
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class FakeBackend(HilBackend):
+    """ In-process fake HIL backend
+
+    Simulates the Typhoon HIL API without hardware or a license.  Simulation time advances at a multiple of
+    wall time, data loggers and captures write synthetic CSV files, and every API call is recorded.
+    """
+
+    NAME: str = "fake"
+    TOOLCHAIN_VERSION: str = "fake-1.0"
+
+    def __init__(
+            self,
+            speedup: float = 10.0,
+            devices: list[dict] = None,
+            logger_sample_rate: float = 1000.0,
+            max_recorded_calls: int = 100000):
+        """ Create a fake backend
+
+        :param float speedup: Simulation seconds per wall second
+        :param list[dict] devices: Device descriptors returned by the fake device manager
+        :param float logger_sample_rate: Sample rate (in Hz) of the synthetic data logger output
+        :param int max_recorded_calls: Number of most recent calls kept with their arguments
+        """
+        if speedup <= 0.0:
+            raise ValueError(f"Invalid speedup ({speedup})")
+
+        if logger_sample_rate <= 0.0:
+            raise ValueError(f"Invalid logger sample rate ({logger_sample_rate})")
+
+        self.speedup = speedup
+        self.devices = list(devices) if devices else []
+        self.logger_sample_rate = logger_sample_rate
+
+        self.calls = deque(maxlen = max_recorded_calls)     # Most recent (name, arguments) calls
+        self.call_counts = Counter()                        # Number of calls by name
+
+        self._hil = FakeHil(self)
+
+    def record_call(
+            self,
+            function: str,
+            /,
+            **kwargs):
+        """ Record an API call
+
+        :param str function: Name of the API function
+        :param kwargs: Arguments of the call
+        """
+        self.calls.append((function, kwargs))
+        self.call_counts[function] += 1
+
+    def get_hil(self) -> Any:
+        return self._hil
+
+    def create_schematic_api(self) -> Any:
+        return FakeSchematicAPI(self)
+
+    def create_device_manager_api(self) -> Any:
+        return FakeDeviceManagerAPI(self)
+
+    def get_toolchain_version(self) -> str:
+        return FakeBackend.TOOLCHAIN_VERSION
+
+
+class FakeHil(object):
+    """ Fake typhoon.api.hil module """
+
+    DEFAULT_TIMESTEP: float = 1e-6
+
+    def __init__(
+            self,
+            backend: FakeBackend):
+        self._backend = backend
+
+        self._model_file: str = None
+        self._timestep = FakeHil.DEFAULT_TIMESTEP
+
+        self._running = False
+        self._start_wall_time = 0.0
+        self._sim_time_base = 0.0           # Simulation time when the simulation was (re)started or stopped
+        self._restore_time = 0.0            # Simulation time to start from, set by load_model_state
+
+        self._scada_values = {}
+        self._data_loggers = {}
+        self._capture: dict = None
+
+    def load_model(
+            self,
+            file: str,
+            offlineMode: bool = False,
+            vhil_device: bool = False) -> bool:
+        self._backend.record_call("load_model", file = file, offlineMode = offlineMode, vhil_device = vhil_device)
+
+        try:
+            with open(file) as model_file:
+                model = json.load(model_file)
+        except (OSError, ValueError):
+            return False
+
+        self._model_file = file
+        self._timestep = float(model.get("timestep", FakeHil.DEFAULT_TIMESTEP))
+        self._running = False
+        self._sim_time_base = 0.0
+        self._restore_time = 0.0
+        self._scada_values = {}
+        return True
+
+    def start_simulation(self) -> bool:
+        self._backend.record_call("start_simulation")
+
+        if self._model_file is None:
+            return False
+
+        self._sim_time_base = self._restore_time
+        self._restore_time = 0.0
+        self._start_wall_time = time.perf_counter()
+        self._running = True
+
+        for logger in self._data_loggers.values():
+            if logger["running"]:
+                logger["start_time"] = self._sim_time_base
+        return True
+
+    def stop_simulation(self) -> bool:
+        self._backend.record_call("stop_simulation")
+
+        if not self._running:
+            return False
+
+        self._sim_time_base = self._get_time()
+        self._running = False
+
+        # Flush data loggers and finish any capture which completed before the stop
+        for logger in self._data_loggers.values():
+            if logger["running"] and not logger["flushed"]:
+                self._write_data_log(logger, self._sim_time_base)
+        self._update_capture()
+        return True
+
+    def is_simulation_running(self) -> bool:
+        self._backend.record_call("is_simulation_running")
+        return self._running
+
+    def get_sim_time(self) -> float:
+        self._backend.record_call("get_sim_time")
+        return self._get_time()
+
+    def get_sim_step(self) -> int:
+        self._backend.record_call("get_sim_step")
+        return int(round(self._get_time() / self._timestep))
+
+    def set_scada_input_value(
+            self,
+            scadaInputName: str,
+            value: Any) -> bool:
+        self._backend.record_call("set_scada_input_value", scadaInputName = scadaInputName, value = value)
+        self._scada_values[scadaInputName] = value
+        return True
+
+    def save_model_state(
+            self,
+            filename: str) -> bool:
+        self._backend.record_call("save_model_state", filename = filename)
+
+        state = {
+            "model": self._model_file,
+            "sim_time": self._get_time(),
+            "scada": self._scada_values}
+
+        with open(filename, "w") as state_file:
+            json.dump(state, state_file)
+        return True
+
+    def load_model_state(
+            self,
+            filename: str) -> bool:
+        self._backend.record_call("load_model_state", filename = filename)
+
+        try:
+            with open(filename) as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return False
+
+        self._restore_time = float(state["sim_time"])
+        self._scada_values = dict(state["scada"])
+        return True
+
+    def add_data_logger(
+            self,
+            name: str,
+            signals: list[str],
+            data_file: str,
+            use_suffix: bool = True) -> bool:
+        self._backend.record_call("add_data_logger", name = name, signals = signals, data_file = data_file, use_suffix = use_suffix)
+
+        if name in self._data_loggers:
+            return False
+
+        self._data_loggers[name] = {
+            "signals": list(signals),
+            "data_file": data_file,
+            "running": False,
+            "flushed": False,
+            "start_time": 0.0}
+        return True
+
+    def start_data_logger(
+            self,
+            name: str) -> bool:
+        self._backend.record_call("start_data_logger", name = name)
+
+        logger = self._data_loggers.get(name)
+        if logger is None:
+            return False
+
+        logger["running"] = True
+        logger["flushed"] = False
+        logger["start_time"] = self._get_time()
+        return True
+
+    def stop_data_logger(
+            self,
+            name: str) -> bool:
+        self._backend.record_call("stop_data_logger", name = name)
+
+        logger = self._data_loggers.get(name)
+        if (logger is None) or (not logger["running"]):
+            return False
+
+        if not logger["flushed"]:
+            self._write_data_log(logger, self._get_time())
+        logger["running"] = False
+        return True
+
+    def remove_data_logger(
+            self,
+            name: str) -> bool:
+        self._backend.record_call("remove_data_logger", name = name)
+        return self._data_loggers.pop(name, None) is not None
+
+    def get_data_logger_status(
+            self,
+            name: str) -> str:
+        self._backend.record_call("get_data_logger_status", name = name)
+
+        logger = self._data_loggers.get(name)
+        if (logger is None) or logger["flushed"] or (not logger["running"]):
+            return "idle"
+        return "running"
+
+    def start_capture(
+            self,
+            cpSettings: list,
+            trSettings: list,
+            chSettings: list,
+            dataBuffer: list = None,
+            fileName: str = "",
+            executeAt: float = None,
+            timeout: float = None) -> bool:
+        self._backend.record_call(
+            "start_capture",
+            cpSettings = cpSettings,
+            trSettings = trSettings,
+            chSettings = chSettings,
+            fileName = fileName,
+            executeAt = executeAt,
+            timeout = timeout)
+
+        if self._capture is not None:
+            return False
+
+        decimation, _, num_samples, _ = cpSettings
+        start_time = executeAt if executeAt is not None else self._get_time()
+
+        self._capture = {
+            "decimation": int(decimation),
+            "num_samples": int(num_samples),
+            "signals": list(chSettings[0]),
+            "buffer": dataBuffer,
+            "file_name": fileName,
+            "start_time": start_time,
+            "stop_time": start_time + (num_samples * decimation * self._timestep)}
+        return True
+
+    def stop_capture(self) -> bool:
+        self._backend.record_call("stop_capture")
+
+        if self._capture is None:
+            return False
+
+        self._capture = None
+        return True
+
+    def capture_in_progress(self) -> bool:
+        self._backend.record_call("capture_in_progress")
+        self._update_capture()
+        return self._capture is not None
+
+    def _get_time(self) -> float:
+        """ Get the current simulation time, quantized to the model timestep """
+        sim_time = self._sim_time_base
+        if self._running:
+            sim_time += (time.perf_counter() - self._start_wall_time) * self._backend.speedup
+
+        return math.floor(sim_time / self._timestep) * self._timestep
+
+    def _signal_value(
+            self,
+            index: int,
+            sim_time: float) -> float:
+        """ Get the synthetic value of a signal """
+        offset = sum(float(value) for value in self._scada_values.values())
+        return offset + math.sin(2.0 * math.pi * 50.0 * sim_time + index)
+
+    def _write_data_log(
+            self,
+            logger: dict,
+            stop_time: float):
+        """ Write the synthetic data log of a logger from its start time to a stop time """
+        period = 1.0 / self._backend.logger_sample_rate
+        signals = logger["signals"]
+        start_time = logger["start_time"]
+        num_samples = int((stop_time - start_time) / period) + 1
+
+        with open(logger["data_file"], "w", newline = "") as data_file:
+            writer = csv.writer(data_file)
+            writer.writerow(["Time"] + signals)
+            for sample in range(num_samples):
+                sim_time = start_time + sample * period
+                writer.writerow([sim_time] + [self._signal_value(index, sim_time) for index in range(len(signals))])
+
+        logger["flushed"] = True
+
+    def _update_capture(self):
+        """ Complete the pending capture if the simulation has passed its stop time """
+        capture = self._capture
+        if (capture is None) or (self._get_time() < capture["stop_time"]):
+            return
+
+        period = capture["decimation"] * self._timestep
+        times = [capture["start_time"] + sample * period for sample in range(capture["num_samples"])]
+        signals = capture["signals"]
+        data = [[self._signal_value(index, sim_time) for sim_time in times] for index in range(len(signals))]
+
+        if capture["buffer"] is not None:
+            if np is not None:
+                capture["buffer"].append((signals, np.array(data), np.array(times)))
+            else:
+                capture["buffer"].append((signals, data, times))
+
+        if capture["file_name"]:
+            with open(capture["file_name"], "w", newline = "") as capture_file:
+                writer = csv.writer(capture_file)
+                writer.writerow(["Time"] + signals)
+                for sample, sim_time in enumerate(times):
+                    writer.writerow([sim_time] + [channel[sample] for channel in data])
+
+        self._capture = None
+
+
+class FakeSchematicAPI(object):
+    """ Fake SchematicAPI
+
+    Reads the configuration block of a schematic and "compiles" it to a small JSON model file
+    """
+
+    def __init__(
+            self,
+            backend: FakeBackend):
+        self._backend = backend
+        self._filename: str = None
+        self._properties = {}
+
+    def load(
+            self,
+            filename: str,
+            debug: bool = False) -> bool:
+        self._backend.record_call("load", filename = filename, debug = debug)
+
+        try:
+            self._properties = read_schematic_info(filename, header_only = True).configuration
+        except OSError:
+            return False
+
+        self._filename = filename
+        return True
+
+    def get_model_property_value(
+            self,
+            prop_code_name: str) -> Any:
+        self._backend.record_call("get_model_property_value", prop_code_name = prop_code_name)
+        return self._properties[prop_code_name]
+
+    def compile(
+            self,
+            conditional_compile: bool = False) -> bool:
+        self._backend.record_call("compile", conditional_compile = conditional_compile)
+
+        if self._filename is None:
+            return False
+
+        compiled_path = Path(self.get_compiled_model_file(self._filename))
+        compiled_path.parent.mkdir(parents = True, exist_ok = True)
+
+        with open(compiled_path, "w") as compiled_file:
+            json.dump({
+                "schematic": self._filename,
+                "timestep": float(self._properties.get("simulation_time_step", FakeHil.DEFAULT_TIMESTEP)),
+                "toolchain": FakeBackend.TOOLCHAIN_VERSION}, compiled_file)
+        return True
+
+    def get_compiled_model_file(
+            self,
+            sch_path: str) -> str:
+        path = Path(sch_path)
+        return str(path.parent / f"{path.stem} Target files" / f"{path.stem}.cpd")
+
+
+class FakeDeviceManagerAPI(object):
+    """ Fake DeviceManagerAPI """
+
+    def __init__(
+            self,
+            backend: FakeBackend):
+        self._backend = backend
+        self._setup_serials: list[str] = []
+        self._connected = False
+
+    def get_available_devices(self) -> list[dict]:
+        self._backend.record_call("get_available_devices")
+        return [dict(device) for device in self._backend.devices]
+
+    def add_devices_to_setup(
+            self,
+            devices: list[str]) -> bool:
+        self._backend.record_call("add_devices_to_setup", devices = devices)
+        self._setup_serials = list(devices)
+        return True
+
+    def connect_setup(self) -> bool:
+        self._backend.record_call("connect_setup")
+        self._connected = len(self._setup_serials) > 0
+        return self._connected
+
+    def disconnect_setup(self) -> bool:
+        self._backend.record_call("disconnect_setup")
+        self._connected = False
+        return True
+
+    def is_setup_connected(self) -> bool:
+        self._backend.record_call("is_setup_connected")
+        return self._connected
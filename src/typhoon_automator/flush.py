@@ -0,0 +1,140 @@
+import logging
+import os
+import time
+
+
+class FlushStrategy(object):
+    """ Data logger flush strategy
+
+    Waits for the data logger to finish writing its output file after the simulation has stopped, or before it
+    is stopped for strategies which set BEFORE_STOP
+    """
+
+    NAME: str = "base"
+    BEFORE_STOP: bool = False       # True to wait while the simulation is still running
+
+    def wait_for_flush(
+            self,
+            simulation) -> tuple[float, bool]:
+        """ Wait for the data logger to flush
+
+        Strategies log a warning through the simulation when the flush does not complete
+
+        :param Simulation simulation: Simulation whose data logger is flushing
+        :return Wall time (in seconds) spent waiting, and false if the wait timed out before the flush completed
+        :rtype tuple[float, bool]
+        """
+        raise NotImplementedError()
+
+
+class FixedDelayFlush(FlushStrategy):
+    """ Fixed delay flush strategy
+
+    Always waits a fixed wall time before the simulation is stopped, as the original automator did
+    """
+
+    NAME: str = "fixed"
+    BEFORE_STOP: bool = True
+
+    def __init__(
+            self,
+            delay: float = 3.0):
+        if delay < 0.0:
+            raise ValueError(f"Invalid flush delay ({delay})")
+
+        self._delay = delay
+
+    def wait_for_flush(
+            self,
+            simulation) -> tuple[float, bool]:
+        time.sleep(self._delay)
+        return (self._delay, True)
+
+
+class FileSettleFlush(FlushStrategy):
+    """ File settle flush strategy
+
+    Waits until the size and modification time of the data logging file have not changed for a settle time.
+    Waiting is bounded by a timeout, and stops early if the file has not appeared after a number of polls.
+    """
+
+    NAME: str = "settle"
+
+    def __init__(
+            self,
+            settle_time: float = 0.25,
+            poll_interval: float = 0.05,
+            timeout: float = 3.0,
+            missing_polls: int = 10):
+        """ Create a file settle flush strategy
+
+        :param float settle_time: Wall time the file must remain unchanged to be considered flushed
+        :param float poll_interval: Wall time between checks of the file
+        :param float timeout: Maximum wall time to wait
+        :param int missing_polls: Number of polls after which a file which does not exist is considered a failure
+        """
+        if settle_time < 0.0:
+            raise ValueError(f"Invalid settle time ({settle_time})")
+
+        if poll_interval <= 0.0:
+            raise ValueError(f"Invalid poll interval ({poll_interval})")
+
+        if timeout < 0.0:
+            raise ValueError(f"Invalid flush timeout ({timeout})")
+
+        if missing_polls < 1:
+            raise ValueError(f"Invalid number of missing file polls ({missing_polls})")
+
+        self._settle_time = settle_time
+        self._poll_interval = poll_interval
+        self._timeout = timeout
+        self._missing_polls = missing_polls
+
+    def wait_for_flush(
+            self,
+            simulation) -> tuple[float, bool]:
+        filename = simulation.get_data_logger_file()
+        start_time = time.perf_counter()
+
+        last_state = None
+        settled_since = start_time
+        polls = 0
+        while True:
+            now = time.perf_counter()
+            if (now - start_time) >= self._timeout:
+                simulation.log(
+                    f"Data logging file {filename} did not settle within {self._timeout} seconds",
+                    level = logging.WARNING)
+                return (now - start_time, False)
+
+            state = FileSettleFlush._get_file_state(filename)
+            polls += 1
+
+            if state is None:
+                if polls >= self._missing_polls:
+                    simulation.log(
+                        f"Data logging file {filename} was not created after {polls} polls",
+                        level = logging.WARNING)
+                    return (time.perf_counter() - start_time, False)
+            elif state != last_state:
+                last_state = state
+                settled_since = now
+            elif (now - settled_since) >= self._settle_time:
+                break
+
+            time.sleep(self._poll_interval)
+
+        return (time.perf_counter() - start_time, True)
+
+    def _get_file_state(filename: str) -> tuple:
+        """ Get the (size, modification time) of a file
+
+        :return File state, None if the file does not exist
+        :rtype tuple
+        """
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+
+        return (stat.st_size, stat.st_mtime_ns)
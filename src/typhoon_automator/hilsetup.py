@@ -1,6 +1,7 @@
-import typhoon.api.device_manager as device_manager
 import logging
 
+from .backend import HilBackend
+
 
 class HilSetupManager(object):
     """ HIL setup managemer
@@ -10,16 +11,23 @@ class HilSetupManager(object):
 
     def __init__(
             self,
-            automator):
+            automator,
+            backend: HilBackend):
         from .automator import TyphoonAutomator
 
         if automator is None:
             raise ValueError("Automator cannot be none")
+
+        if backend is None:
+            raise ValueError("Backend cannot be none")
             
         self._automator: TyphoonAutomator = automator
 
         # Typhoon API for HIL device management
-        self._device_manager = device_manager.DeviceManagerAPI()
+        self._device_manager = backend.create_device_manager_api()
+
+        self._setup_devices: tuple = ()     # Serial numbers of the connected devices
+        self._connection_count = 0          # Number of times the setup was connected or disconnected
 
     def get_available_devices(
             self,
@@ -111,6 +119,9 @@ class HilSetupManager(object):
             if not self._device_manager.connect_setup():
                 raise RuntimeError("Failed to connect setup")
 
+            self._setup_devices = tuple(sorted(serial_numbers))
+            self._connection_count += 1
+
             # Return list of connected devices
             return setup_devices
 
@@ -124,6 +135,8 @@ class HilSetupManager(object):
         """ Disconnect the HIL setup """
         if self.is_connected():
             self._automator.log("Disconnecting setup")
+            self._setup_devices = ()
+            self._connection_count += 1
             if not self._device_manager.disconnect_setup():
                 self._automator.log("Failed to disconnect setup", logging.ERROR)
         else:
@@ -136,3 +149,14 @@ class HilSetupManager(object):
         :rtype bool
         """
         return self._device_manager.is_setup_connected()
+
+    def get_setup_identity(self) -> tuple:
+        """ Get the identity of the HIL setup
+
+        The identity changes whenever the setup is connected or disconnected, since a model loaded to the setup
+        does not survive either
+
+        :returns Tuple of the connection count and the serial numbers of the connected devices
+        :rtype tuple
+        """
+        return (self._connection_count, self._setup_devices)
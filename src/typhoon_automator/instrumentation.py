@@ -0,0 +1,156 @@
+import csv
+import math
+
+from array import array
+
+
+class DispatchRecorder(object):
+    """ Event dispatch recorder
+
+    Records the scheduled time, dispatch simulation time and step, callback wall duration and schedule depth
+    of every invoked event.  Records are kept in preallocated column arrays which are only grown (doubled)
+    when full.
+    """
+
+    FIELDS: tuple[str] = ("scheduled_time", "sim_time", "sim_step", "callback_duration", "queue_depth")
+
+    def __init__(
+            self,
+            capacity: int = 65536):
+        """ Create a dispatch recorder
+
+        :param int capacity: Number of records to preallocate
+        """
+        if capacity < 1:
+            raise ValueError(f"Invalid recorder capacity ({capacity})")
+
+        self._capacity = capacity
+        self._count = 0
+        self._columns = {field: array("d", bytes(8 * capacity)) for field in DispatchRecorder.FIELDS}
+
+    def reset(self):
+        """ Discard all records, keeping the allocated buffers """
+        self._count = 0
+
+    def get_record_count(self) -> int:
+        """ Get the number of records
+
+        :return Number of records
+        :rtype int
+        """
+        return self._count
+
+    def record(
+            self,
+            scheduled_time: float,
+            sim_time: float,
+            sim_step: int,
+            callback_duration: float,
+            queue_depth: int):
+        """ Record the dispatch of an event
+
+        :param float scheduled_time: Simulation time the event was scheduled for
+        :param float sim_time: Simulation time at which the event was invoked
+        :param int sim_step: Simulation step at which the event was invoked
+        :param float callback_duration: Wall time (in seconds) spent invoking the event
+        :param int queue_depth: Number of events in the schedule when the event was invoked
+        """
+        if self._count >= self._capacity:
+            self._grow()
+
+        index = self._count
+        columns = self._columns
+        columns["scheduled_time"][index] = scheduled_time
+        columns["sim_time"][index] = sim_time
+        columns["sim_step"][index] = sim_step
+        columns["callback_duration"][index] = callback_duration
+        columns["queue_depth"][index] = queue_depth
+        self._count = index + 1
+
+    def get_column(
+            self,
+            field: str) -> array:
+        """ Get a copy of the recorded values of a field
+
+        :param str field: Field name, one of FIELDS
+        :return Recorded values
+        :rtype array
+        """
+        if field not in self._columns:
+            raise KeyError(f"Unknown dispatch record field {field}")
+
+        return self._columns[field][:self._count]
+
+    def get_summary(self) -> dict:
+        """ Get a summary of the recorded dispatches
+
+        Lateness is the simulation time between the scheduled time and the time the event was invoked
+
+        :return Dictionary of record count and lateness and callback duration percentiles
+        :rtype dict
+        """
+        scheduled = self._columns["scheduled_time"]
+        actual = self._columns["sim_time"]
+        lateness = sorted(actual[i] - scheduled[i] for i in range(self._count))
+        duration = sorted(self.get_column("callback_duration"))
+
+        return {
+            "count": self._count,
+            "lateness_p50": DispatchRecorder._percentile(lateness, 50.0),
+            "lateness_p99": DispatchRecorder._percentile(lateness, 99.0),
+            "lateness_max": lateness[-1] if lateness else 0.0,
+            "callback_p50": DispatchRecorder._percentile(duration, 50.0),
+            "callback_p99": DispatchRecorder._percentile(duration, 99.0),
+            "callback_max": duration[-1] if duration else 0.0,
+        }
+
+    def write(
+            self,
+            filename: str):
+        """ Write the records to a file
+
+        Files with a '.csv' extension are written as CSV with a header row.  Otherwise the records are written
+        as raw native-endian float64 values, one record of len(FIELDS) values after another.
+
+        :param str filename: Output filename
+        """
+        if not filename:
+            raise ValueError("Filename cannot be empty")
+
+        columns = [self._columns[field] for field in DispatchRecorder.FIELDS]
+
+        if filename.lower().endswith(".csv"):
+            with open(filename, "w", newline = "") as file:
+                writer = csv.writer(file)
+                writer.writerow(DispatchRecorder.FIELDS)
+                for index in range(self._count):
+                    writer.writerow([
+                        columns[0][index],
+                        columns[1][index],
+                        int(columns[2][index]),
+                        columns[3][index],
+                        int(columns[4][index])])
+        else:
+            records = array("d", bytes(8 * len(columns) * self._count))
+            for offset, column in enumerate(columns):
+                records[offset::len(columns)] = column[:self._count]
+
+            with open(filename, "wb") as file:
+                records.tofile(file)
+
+    def _grow(self):
+        """ Double the capacity of the record buffers """
+        for column in self._columns.values():
+            column.extend(array("d", bytes(8 * self._capacity)))
+
+        self._capacity *= 2
+
+    def _percentile(
+            values: list[float],
+            percent: float) -> float:
+        """ Get a percentile of sorted values by the nearest-rank method """
+        if not values:
+            return 0.0
+
+        rank = max(1, math.ceil(percent / 100.0 * len(values)))
+        return values[rank - 1]
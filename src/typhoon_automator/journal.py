@@ -0,0 +1,135 @@
+import json
+import os
+
+from datetime import datetime
+from pathlib import Path
+
+
+class CampaignJournal(object):
+    """ Campaign journal
+
+    Append-only record of scenario state changes.  Each record is a JSON line which is flushed and synced to disk
+    before the journal returns, so the journal survives a crash of the process or machine at any point.  A torn
+    last line left by a crash is ignored when the journal is replayed.
+
+    A campaign record starts a new campaign, replaying the journal returns the scenario states since the last one.
+    """
+
+    CAMPAIGN: str = "campaign"      # Start of a new campaign
+    STARTED: str = "started"        # Scenario run started
+    COMPLETED: str = "completed"    # Scenario run completed successfully
+    FAILED: str = "failed"          # Scenario run failed
+
+    def __init__(
+            self,
+            filename: str):
+        """ Create a campaign journal
+
+        :param str filename: Journal file, created if it does not exist
+        """
+        if not filename:
+            raise ValueError("Journal filename cannot be empty")
+
+        self._filename = filename
+        Path(filename).parent.mkdir(parents = True, exist_ok = True)
+
+        self._file = None
+
+    def get_filename(self) -> str:
+        """ Get the journal filename
+
+        :rtype str
+        """
+        return self._filename
+
+    def open(self):
+        """ Open the journal for appending records """
+        if self._file is not None:
+            return
+
+        # Terminate a torn last record so it does not swallow the next one
+        torn = False
+        try:
+            with open(self._filename, "rb") as journal_file:
+                journal_file.seek(0, os.SEEK_END)
+                if journal_file.tell() > 0:
+                    journal_file.seek(-1, os.SEEK_END)
+                    torn = (journal_file.read(1) != b"\n")
+        except FileNotFoundError:
+            pass
+
+        self._file = open(self._filename, "a", encoding = "utf-8")
+        if torn:
+            self._file.write("\n")
+
+    def close(self):
+        """ Close the journal """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def start_campaign(self):
+        """ Record the start of a new campaign, scenario states of earlier campaigns are no longer replayed """
+        self._append({"state": CampaignJournal.CAMPAIGN})
+
+    def record(
+            self,
+            name: str,
+            state: str,
+            **fields):
+        """ Record a scenario state change
+
+        :param str name: Scenario name
+        :param str state: New scenario state
+        :param fields: Additional JSON-serializable record fields
+        """
+        record = {"state": state, "scenario": name}
+        record.update(fields)
+        self._append(record)
+
+    def replay(self) -> dict[str, dict]:
+        """ Replay the journal
+
+        :return Last record of each scenario of the current campaign, by scenario name
+        :rtype dict[str, dict]
+        """
+        states = {}
+        try:
+            journal_file = open(self._filename, encoding = "utf-8")
+        except FileNotFoundError:
+            return states
+
+        with journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write of the last record
+                    continue
+
+                if record.get("state") == CampaignJournal.CAMPAIGN:
+                    states = {}
+                elif "scenario" in record:
+                    states[record["scenario"]] = record
+
+        return states
+
+    def get_completed(self) -> dict[str, dict]:
+        """ Get the scenarios of the current campaign which completed successfully
+
+        :return Last record of each completed scenario, by scenario name
+        :rtype dict[str, dict]
+        """
+        return {name: record for name, record in self.replay().items() if record["state"] == CampaignJournal.COMPLETED}
+
+    def _append(
+            self,
+            record: dict):
+        """ Append a record and sync it to disk """
+        if self._file is None:
+            raise RuntimeError("Journal is not open")
+
+        record["time"] = datetime.now().isoformat()
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
@@ -0,0 +1,493 @@
+import json
+import math
+import multiprocessing
+import os
+import threading
+
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .results import ResultsReader
+
+
+METRIC_RMS: str = "rms"                         # Root mean square
+METRIC_PEAK: str = "peak"                       # Largest absolute value
+METRIC_OVERSHOOT: str = "overshoot"             # Overshoot past the final value, in percent of the step
+METRIC_SETTLING_TIME: str = "settling_time"     # Time from the window start until the signal stays in the band
+METRIC_THD: str = "thd"                         # Total harmonic distortion, in percent of the fundamental
+
+KPI_OUTPUTS: tuple[str, ...] = ("data_log", "capture")
+
+
+class KpiDefinition(object):
+    """ KPI definition
+
+    A KPI is a metric of a signal over a simulation time window.  The window is given relative to an event, which
+    is either a simulation time or the name of an event time of the scenario (see get_event_times of
+    DeclarativeScenario), so windows follow the events they measure.
+
+    Metric options are:
+        overshoot, settling_time: 'target' final value (default: mean of the last 'final_fraction' of the window,
+        0.05), 'tolerance' band as a fraction of the step (settling_time only, default 0.02)
+        thd: 'fundamental' frequency in Hz (required) and number of 'harmonics' (default 40)
+    """
+
+    def __init__(
+            self,
+            signal: str,
+            metric: str,
+            start: float = 0.0,
+            stop: float = None,
+            event: Any = None,
+            name: str = None,
+            output: str = None,
+            options: dict = None):
+        """ Create a KPI definition
+
+        :param str signal: Signal name
+        :param str metric: METRIC_RMS, METRIC_PEAK, METRIC_OVERSHOOT, METRIC_SETTLING_TIME or METRIC_THD
+        :param float start: Window start relative to the event (in seconds)
+        :param float stop: Window stop relative to the event (in seconds), None for the end of the output
+        :param event: Event simulation time, or event name, None for the scenario start
+        :param str name: KPI name, None for '<signal>_<metric>'
+        :param str output: Output to read the signal from, 'data_log' or 'capture', None to use the output with
+        the signal, preferring the data log
+        :param dict options: Metric options
+        """
+        if not signal:
+            raise ValueError("KPI signal cannot be empty")
+
+        if metric not in _METRICS:
+            raise ValueError(f"Invalid KPI metric ({metric})")
+
+        if (stop is not None) and (stop <= start):
+            raise ValueError(f"Invalid KPI window ({start}, {stop})")
+
+        if (output is not None) and (output not in KPI_OUTPUTS):
+            raise ValueError(f"Invalid KPI output ({output})")
+
+        options = dict(options or {})
+        if (metric == METRIC_THD) and (not options.get("fundamental")):
+            raise ValueError("THD requires the 'fundamental' frequency option")
+
+        self.signal = signal
+        self.metric = metric
+        self.start = float(start)
+        self.stop = None if stop is None else float(stop)
+        self.event = event
+        self.name = name or f"{signal}_{metric}"
+        self.output = output
+        self.options = options
+
+    def get_window(
+            self,
+            event_times: dict[str, float] = None) -> tuple[float, float]:
+        """ Get the simulation time window of the KPI
+
+        :param dict event_times: Event simulation times by event name
+        :return (start, stop) simulation times, stop is None for the end of the output
+        :rtype tuple[float, float]
+        :raises ValueError: The event is not in the event times
+        """
+        event_time = 0.0
+        if isinstance(self.event, str):
+            if (event_times is None) or (self.event not in event_times):
+                raise ValueError(f"KPI {self.name} refers to unknown event {self.event}")
+            event_time = float(event_times[self.event])
+        elif self.event is not None:
+            event_time = float(self.event)
+
+        stop = None if self.stop is None else event_time + self.stop
+        return (event_time + self.start, stop)
+
+    def to_dict(self) -> dict:
+        """ Convert the definition to a dictionary of JSON types
+
+        :return KPI definition dictionary
+        :rtype dict
+        """
+        data = {"name": self.name, "signal": self.signal, "metric": self.metric, "start": self.start}
+        if self.stop is not None:
+            data["stop"] = self.stop
+        if self.event is not None:
+            data["event"] = self.event
+        if self.output is not None:
+            data["output"] = self.output
+        if self.options:
+            data["options"] = dict(self.options)
+
+        return data
+
+    def from_dict(data: dict):
+        """ Create a definition from a dictionary
+
+        :param dict data: KPI definition dictionary, as returned by to_dict
+        :return KPI definition
+        :rtype KpiDefinition
+        :raises ValueError: The dictionary does not describe a valid KPI
+        """
+        try:
+            return KpiDefinition(
+                signal = data["signal"],
+                metric = data["metric"],
+                start = data.get("start", 0.0),
+                stop = data.get("stop"),
+                event = data.get("event"),
+                name = data.get("name"),
+                output = data.get("output"),
+                options = data.get("options"))
+
+        except (KeyError, TypeError) as ex:
+            raise ValueError(f"Invalid KPI definition ({ex!r})") from ex
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, KpiDefinition):
+            return NotImplemented
+
+        return self.to_dict() == other.to_dict()
+
+
+class KpiEngine(object):
+    """ KPI engine
+
+    Computes the KPIs of finished scenarios on a pool of background processes, so KPIs of several scenarios are
+    computed in parallel while later scenarios run.  Each scenario's KPIs are written to a JSON file alongside its
+    other outputs.
+    """
+
+    def __init__(
+            self,
+            processes: int = None):
+        """ Create a KPI engine
+
+        :param int processes: Number of worker processes, None for the number of processors
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for KPIs")
+
+        if (processes is not None) and (processes < 1):
+            raise ValueError(f"Invalid number of KPI processes ({processes})")
+
+        self._processes = processes
+        self._executor: ProcessPoolExecutor = None
+        self._pending: list[tuple[str, str, Future]] = []
+
+    def submit(
+            self,
+            name: str,
+            run_id: str,
+            outputs: dict,
+            definitions: list[KpiDefinition],
+            event_times: dict[str, float] = None,
+            kpi_filename: str = None,
+            wait_for: list[Future] = None) -> Future:
+        """ Compute the KPIs of a scenario run in the background
+
+        :param str name: Scenario name
+        :param str run_id: Run ID
+        :param dict outputs: Output filenames of the run, by output type
+        :param list definitions: KPI definitions
+        :param dict event_times: Event simulation times by event name
+        :param str kpi_filename: File the KPIs are written to, None to not write them
+        :param list[Future] wait_for: Background writes of the outputs, the computation starts once they complete
+        :return Future of the dictionary of KPI values by name
+        :rtype Future
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers = self._processes,
+                mp_context = multiprocessing.get_context("spawn"))
+
+        arguments = (
+            outputs,
+            [definition.to_dict() for definition in definitions],
+            event_times,
+            kpi_filename)
+
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self._pending.append((name, run_id, future))
+
+        writes = [write for write in (wait_for or []) if not write.done()]
+        remaining = [len(writes)]
+        lock = threading.Lock()
+
+        def on_write_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    return
+            self._start(future, arguments, wait_for)
+
+        if not writes:
+            self._start(future, arguments, wait_for)
+        for write in writes:
+            write.add_done_callback(on_write_done)
+
+        return future
+
+    def _start(
+            self,
+            future: Future,
+            arguments: tuple,
+            wait_for: list[Future]):
+        """ Start a KPI computation once the writes of its outputs have completed
+
+        :param Future future: Future of the computation, completed with the result of the worker process
+        :param tuple arguments: Arguments of compute_kpis
+        :param list[Future] wait_for: Background writes of the outputs
+        """
+        try:
+            for write in (wait_for or []):
+                write.result()
+
+            computation = self._executor.submit(compute_kpis, *arguments)
+        except BaseException as ex:
+            future.set_exception(ex)
+            return
+
+        def on_computed(computation: Future):
+            try:
+                future.set_result(computation.result())
+            except BaseException as ex:
+                future.set_exception(ex)
+
+        computation.add_done_callback(on_computed)
+
+    def collect(
+            self,
+            wait: bool = False) -> list[tuple[str, str, Any]]:
+        """ Collect the results of finished KPI computations
+
+        :param bool wait: True to wait for all submitted computations, false to only collect finished ones
+        :return List of (scenario name, run ID, result) tuples in submission order, the result is the dictionary of
+        KPI values or the exception of a failed computation
+        :rtype list[tuple]
+        """
+        results = []
+        pending = []
+        for name, run_id, future in self._pending:
+            if (not wait) and (not future.done()):
+                pending.append((name, run_id, future))
+                continue
+
+            try:
+                results.append((name, run_id, future.result()))
+            except BaseException as ex:
+                results.append((name, run_id, ex))
+
+        self._pending = pending
+        return results
+
+    def shutdown(self):
+        """ Wait for all computations and stop the worker processes """
+        self.collect(wait = True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def compute_kpis(
+        outputs: dict,
+        definitions: list[dict],
+        event_times: dict[str, float] = None,
+        kpi_filename: str = None) -> dict[str, float]:
+    """ Compute KPIs from the outputs of a scenario run
+
+    Each output is read once, limited to the signals and time span of its KPIs.  KPIs which are not defined for
+    their window, such as the settling time of a signal which does not settle, are None.
+
+    :param dict outputs: Output filenames by output type
+    :param list[dict] definitions: KPI definition dictionaries
+    :param dict event_times: Event simulation times by event name
+    :param str kpi_filename: File the KPIs are written to, None to not write them
+    :return Dictionary of KPI values by name
+    :rtype dict
+    """
+    definitions = [KpiDefinition.from_dict(definition) for definition in definitions]
+
+    readers = {}
+    try:
+        for output in KPI_OUTPUTS:
+            filename = outputs.get(output)
+            if filename:
+                reader = _open_output(filename)
+                if reader is not None:
+                    readers[output] = reader
+
+        # Group KPIs by output and find the span to read
+        groups: dict[str, list[tuple[KpiDefinition, float, float]]] = {}
+        for definition in definitions:
+            output = _find_output(definition, readers)
+            start, stop = definition.get_window(event_times)
+            groups.setdefault(output, []).append((definition, start, stop))
+
+        kpis = {}
+        for output, group in groups.items():
+            signals = list(dict.fromkeys(definition.signal for definition, _, _ in group))
+            span_start = min(start for _, start, _ in group)
+            span_stop = None if any(stop is None for _, _, stop in group) else max(stop for _, _, stop in group)
+
+            time, channels = readers[output].read(signals, span_start, span_stop)
+            for definition, start, stop in group:
+                first = np.searchsorted(time, start, side = "left")
+                last = len(time) if stop is None else np.searchsorted(time, stop, side = "right")
+                kpis[definition.name] = _compute_metric(
+                    definition,
+                    start,
+                    time[first:last],
+                    channels[definition.signal][first:last])
+
+    finally:
+        for reader in readers.values():
+            reader.close()
+
+    if kpi_filename:
+        data = {
+            "kpis": kpis,
+            "definitions": [definition.to_dict() for definition in definitions],
+            "event_times": event_times or {}}
+
+        with open(f"{kpi_filename}.tmp", "w", encoding = "utf-8") as kpi_file:
+            json.dump(data, kpi_file, indent = 2)
+        os.replace(f"{kpi_filename}.tmp", kpi_filename)
+
+    return kpis
+
+
+def _open_output(filename: str) -> ResultsReader:
+    """ Open an output, None if the run did not produce it """
+    try:
+        return ResultsReader.open(filename)
+    except FileNotFoundError:
+        pass
+
+    # The CSV file may have been deleted by its conversion since it was found, which leaves the converted file
+    converted = ResultsReader._find_converted(Path(filename))
+    if converted is None:
+        return None
+
+    try:
+        return ResultsReader.open(str(converted))
+    except FileNotFoundError:
+        return None
+
+
+def _find_output(
+        definition: KpiDefinition,
+        readers: dict[str, ResultsReader]) -> str:
+    """ Find the output with the signal of a KPI
+
+    :raises ValueError: No output has the signal
+    """
+    outputs = KPI_OUTPUTS if definition.output is None else (definition.output,)
+    for output in outputs:
+        reader = readers.get(output)
+        if (reader is not None) and (definition.signal in reader.get_signal_names()):
+            return output
+
+    raise ValueError(f"KPI {definition.name}: signal {definition.signal} not found in the outputs")
+
+
+def _compute_metric(
+        definition: KpiDefinition,
+        start: float,
+        time: Any,
+        samples: Any) -> float:
+    """ Compute the metric of a KPI over its window, None if the window is empty or the metric is undefined """
+    if len(samples) == 0:
+        return None
+
+    value = _METRICS[definition.metric](time, samples.astype(np.float64), start, definition.options)
+    if (value is None) or (not math.isfinite(value)):
+        return None
+
+    return float(value)
+
+
+def _rms(time, samples, start, options) -> float:
+    return np.sqrt(np.mean(np.square(samples)))
+
+
+def _peak(time, samples, start, options) -> float:
+    return np.max(np.abs(samples))
+
+
+def _get_step(samples, options) -> tuple[float, float]:
+    """ Get the initial and final value of a step response """
+    final = options.get("target")
+    if final is None:
+        count = max(1, int(len(samples) * options.get("final_fraction", 0.05)))
+        final = np.mean(samples[-count:])
+
+    return (samples[0], float(final))
+
+
+def _overshoot(time, samples, start, options) -> float:
+    initial, final = _get_step(samples, options)
+    step = final - initial
+    if step == 0.0:
+        return None
+
+    excess = np.max((samples - final) * np.sign(step))
+    return max(0.0, excess) / abs(step) * 100.0
+
+
+def _settling_time(time, samples, start, options) -> float:
+    initial, final = _get_step(samples, options)
+    step = abs(final - initial) or abs(final)
+    band = options.get("tolerance", 0.02) * step
+
+    outside = np.flatnonzero(np.abs(samples - final) > band)
+    if len(outside) == 0:
+        return max(0.0, time[0] - start)
+
+    last = outside[-1]
+    if last == len(samples) - 1:
+        return None
+
+    return time[last + 1] - start
+
+
+def _thd(time, samples, start, options) -> float:
+    if len(samples) < 4:
+        return None
+
+    sample_period = (time[-1] - time[0]) / (len(time) - 1)
+    if sample_period <= 0.0:
+        return None
+
+    fundamental = float(options["fundamental"])
+    harmonics = int(options.get("harmonics", 40))
+
+    # Hann windowed spectrum, with each harmonic's amplitude taken from the peak around its bin
+    spectrum = np.abs(np.fft.rfft((samples - np.mean(samples)) * np.hanning(len(samples))))
+    resolution = 1.0 / (len(samples) * sample_period)
+
+    orders = np.arange(1, harmonics + 1)
+    bins = np.rint(orders * fundamental / resolution).astype(np.int64)
+    bins = bins[bins < len(spectrum) - 1]
+    if (len(bins) == 0) or (bins[0] < 1):
+        return None
+
+    neighbours = np.clip(bins[:, None] + np.arange(-2, 3)[None, :], 0, len(spectrum) - 1)
+    amplitudes = spectrum[neighbours].max(axis = 1)
+    if amplitudes[0] == 0.0:
+        return None
+
+    return np.sqrt(np.sum(np.square(amplitudes[1:]))) / amplitudes[0] * 100.0
+
+
+_METRICS = {
+    METRIC_RMS: _rms,
+    METRIC_PEAK: _peak,
+    METRIC_OVERSHOOT: _overshoot,
+    METRIC_SETTLING_TIME: _settling_time,
+    METRIC_THD: _thd}
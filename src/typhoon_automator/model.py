@@ -1,12 +1,17 @@
-import typhoon.api.hil as hil
-import typhoon.api.schematic_editor as schematic_editor
+import hashlib
 import logging
+import tempfile
 
 from pathlib import Path
 from typing import Any
 
 import math
 
+from .backend import HilBackend
+from .compile_cache import CompileCache
+from .tse import SchematicInfo
+from .tse import read_schematic_info
+
 
 class ModelManager(object):
     """ Model manager
@@ -18,21 +23,43 @@ class ModelManager(object):
 
     def __init__(
             self,
-            automator):
+            automator,
+            backend: HilBackend):
         from .automator import TyphoonAutomator
 
         if automator is None:
             raise ValueError("Automator cannot be none")
+
+        if backend is None:
+            raise ValueError("Backend cannot be none")
             
         self._automator: TyphoonAutomator = automator
 
-        self._schematic = schematic_editor.SchematicAPI()   # Schematic editor API
+        self._backend = backend                             # HIL backend
+        self._hil = backend.get_hil()                       # HIL API
+        self._schematic = None                              # Schematic editor API, created when compiling
 
         self._schematic_filename: str = None    # Filename of schematic
+        self._schematic_debug: bool = False     # Debug flag for loading the schematic into the editor
+        self._schematic_info: SchematicInfo = None  # Information read from the schematic file
+        self._schematic_loaded: bool = False    # True if the schematic is loaded in the editor
         self._compiled_filename: str = None     # Filename of compiled model
 
         self._model_timestep: float = 0.0       # Simulation timestep
 
+        self._compile_cache: CompileCache = None    # Cache of compiled models
+
+        self._compiled_hash: str = None         # Hash of compiled model file
+        self._compiled_hash_key: tuple = None   # (filename, size, mtime) the hash was computed for
+
+        self._loaded_setup_key: tuple = None    # (model hash, use_vhil, setup identity) of the loaded model
+        self._initial_state_filename: str = None    # Saved state of the loaded model before it was started
+        self._state_directory: tempfile.TemporaryDirectory = None   # Private directory for the initial state
+
+        self._scada_values: dict[str, Any] = {}     # Last value written to each SCADA input of the loaded model
+        self._scada_write_counts = [0, 0]           # Number of SCADA writes made and skipped
+        self._scada_write_dedup: bool = False       # True to skip writes of the value an input already has
+
     def load_schematic(
             self,
             filename: str,
@@ -45,31 +72,56 @@ class ModelManager(object):
         if not filepath.exists():
             raise FileNotFoundError(f"Schematic file not found: {filename}")
 
-        # Load schematic
+        # Read schematic header, the schematic is only loaded into the editor if it must be compiled
         self._automator.log(f"Loading schematic from file {filename}")
-        if not self._schematic.load(
-                filename=filename,
-                debug=debug):
-            raise RuntimeError(f"Failed to load schematic ({filename})")
+        self._schematic_filename = filename
+        self._schematic_debug = debug
+        self._schematic_loaded = False
+        try:
+            self._schematic_info = read_schematic_info(filename, header_only = True)
+        except (ValueError, IndexError, UnicodeDecodeError) as ex:
+            # Let the schematic editor read schematics the header scan cannot parse
+            self._automator.log("Failed to read schematic header, using the schematic editor", level = logging.WARNING)
+            self._automator.log_exception(ex)
+            self._schematic_info = SchematicInfo()
 
         # Get model timestep
         timestep = 0.0
         try:
-            timestep = float(self._schematic.get_model_property_value("simulation_time_step"))
-        except:
-            self._automator.log(
-                "Failed to read model timestep from schematic",
-                logging.ERROR)
-            raise
+            timestep = float(self._schematic_info.get_property("simulation_time_step"))
+        except (KeyError, ValueError):
+            # Timestep is not a literal value, let the schematic editor evaluate it
+            try:
+                timestep = float(self._get_schematic().get_model_property_value("simulation_time_step"))
+            except:
+                self._automator.log(
+                    "Failed to read model timestep from schematic",
+                    logging.ERROR)
+                raise
 
         if (timestep <= 0.0) or (timestep > ModelManager.MAX_TIMESTEP):
             raise ValueError(f"Invalid model timestep ({timestep})")
 
         self._automator.log(f"Model timestep is {timestep}")
 
-        self._schematic_filename = filename
         self._model_timestep = timestep
 
+    def get_schematic_info(self) -> SchematicInfo:
+        """ Get the information read from the schematic file
+
+        The full schematic is read on first use, including component and signal names
+
+        :returns Schematic information
+        :rtype SchematicInfo
+        """
+        if not self._schematic_filename:
+            raise RuntimeError("No schematic specified")
+
+        if not self._schematic_info.components:
+            self._schematic_info = read_schematic_info(self._schematic_filename)
+
+        return self._schematic_info
+
     def compile(
             self,
             conditional: bool = True):
@@ -81,25 +133,85 @@ class ModelManager(object):
         if not self._schematic_filename:
             raise RuntimeError("No schematic specified, cannot compile")
 
+        # Use cached compiled model if the schematic has been compiled before
+        cache_key = None
+        if self._compile_cache is not None:
+            cache_key = self._compile_cache.get_key(
+                self._schematic_filename,
+                self._backend.get_toolchain_version())
+
+            filename = self._compile_cache.lookup(cache_key)
+            if filename is not None:
+                self._compiled_filename = filename
+                self._automator.log(f"Using cached compiled model {self._compiled_filename}")
+                return
+
         # Compile schematic
         self._automator.log(f"Compiling, conditional compile is {conditional}")
-        if not self._schematic.compile(conditional):
+        schematic = self._get_schematic()
+        if not schematic.compile(conditional):
             raise RuntimeError("Failed to compile")
 
         # Get compiled model filename
-        filename = self._schematic.get_compiled_model_file(self._schematic_filename)
+        filename = schematic.get_compiled_model_file(self._schematic_filename)
         if not filename:
             raise RuntimeError("Failed to get compiled model filename")
 
+        # Store compiled model in cache
+        if cache_key is not None:
+            try:
+                filename = self._compile_cache.store(cache_key, filename)
+            except BaseException as ex:
+                self._automator.log("Failed to store compiled model in cache", level = logging.ERROR)
+                self._automator.log_exception(ex)
+
         self._compiled_filename = filename
         self._automator.log(f"Compiled model filename is {self._compiled_filename}")
 
+    def _get_schematic(self) -> Any:
+        """ Get the schematic editor API with the schematic loaded
+
+        The API is created and the schematic loaded on first use
+
+        :returns Schematic editor API
+        """
+        if self._schematic is None:
+            self._schematic = self._backend.create_schematic_api()
+
+        if not self._schematic_loaded:
+            if not self._schematic.load(
+                    filename=self._schematic_filename,
+                    debug=self._schematic_debug):
+                raise RuntimeError(f"Failed to load schematic ({self._schematic_filename})")
+
+            self._schematic_loaded = True
+
+        return self._schematic
+
+    def set_compile_cache(
+            self,
+            cache: CompileCache):
+        """ Set the cache of compiled models
+
+        :param CompileCache cache: Compile cache, None to always compile
+        """
+        self._compile_cache = cache
+
     def load_to_setup(
             self,
-            use_vhil: bool = False):
+            use_vhil: bool = False,
+            setup_identity: tuple = None,
+            force: bool = False) -> bool:
         """ Load the compiled model to the HIL setup
+
+        The load is skipped if the same compiled model is already loaded to the same setup.  The model is
+        then reset to the state it was in after it was loaded, if that state could be saved.
         
         :param bool use_vhil: True if Virtual HIL should be used, false otherwise
+        :param tuple setup_identity: Identity of the connected HIL setup, from HilSetupManager.get_setup_identity
+        :param bool force: True to always load the model
+        :returns True if the model was loaded, false if the loaded model was reused
+        :rtype bool
         """
         if not self._compiled_filename:
             raise RuntimeError("No compiled model filename, cannot load")
@@ -109,13 +221,86 @@ class ModelManager(object):
         if not filepath.exists():
             raise FileNotFoundError(f"Compiled model file not found: {self._compiled_filename}")
 
+        # Reuse loaded model if nothing changed
+        setup_key = (self.get_compiled_model_hash(), use_vhil, setup_identity)
+        if (not force) and (setup_key == self._loaded_setup_key):
+            if self._initial_state_filename is None:
+                self._automator.log("Compiled model already loaded to setup")
+                return False
+
+            try:
+                self.reset_to_initial_state()
+                return False
+            except (RuntimeError, FileNotFoundError) as ex:
+                self._automator.log("Failed to reset model to initial state, reloading", level = logging.WARNING)
+                self._automator.log_exception(ex)
+
         # Load model to HIL setup
-        if not hil.load_model(
+        self._loaded_setup_key = None
+        self._initial_state_filename = None
+        self.clear_scada_values()
+        if not self._hil.load_model(
                 file=self._compiled_filename,
                 offlineMode=False,
                 vhil_device=use_vhil):
             raise RuntimeError(f"Failed to load compiled model to setup ({self._compiled_filename})")
 
+        self._loaded_setup_key = setup_key
+
+        # Save initial state so the model can be reset without loading it again.  The state is kept out of the
+        # compiled model's directory, which may be a compile cache entry shared with other automators.
+        if self._state_directory is None:
+            self._state_directory = tempfile.TemporaryDirectory(prefix = "TyphoonAutomator-")
+        filename = str(Path(self._state_directory.name) / f"{filepath.stem}_initial.state")
+        try:
+            if self._hil.save_model_state(filename):
+                self._initial_state_filename = filename
+        except BaseException as ex:
+            self._automator.log("Failed to save initial model state", level = logging.WARNING)
+            self._automator.log_exception(ex)
+
+        return True
+
+    def reset_to_initial_state(self):
+        """ Reset the loaded model to the state it was in after it was loaded
+
+        :raises RuntimeError: No model is loaded or its initial state is not available
+        """
+        if (self._loaded_setup_key is None) or (self._initial_state_filename is None):
+            raise RuntimeError("No initial model state available, cannot reset")
+
+        self._automator.log("Resetting model to initial state")
+        self.load_model_state(self._initial_state_filename)
+
+    def invalidate_loaded_model(self):
+        """ Forget the model loaded to the setup so that it is loaded again on the next load_to_setup """
+        self._loaded_setup_key = None
+        self._initial_state_filename = None
+
+    def get_compiled_model_hash(self) -> str:
+        """ Get the SHA-256 hash of the compiled model file
+
+        The hash is cached until the compiled model file changes
+
+        :returns Hex digest of the compiled model file
+        :rtype str
+        """
+        if not self._compiled_filename:
+            raise RuntimeError("No compiled model filename, cannot hash")
+
+        stat = Path(self._compiled_filename).stat()
+        hash_key = (self._compiled_filename, stat.st_size, stat.st_mtime_ns)
+        if hash_key != self._compiled_hash_key:
+            digest = hashlib.sha256()
+            with open(self._compiled_filename, "rb") as compiled_file:
+                for chunk in iter(lambda: compiled_file.read(1 << 20), b""):
+                    digest.update(chunk)
+
+            self._compiled_hash = digest.hexdigest()
+            self._compiled_hash_key = hash_key
+
+        return self._compiled_hash
+
     def simtime_to_simstep(
             self,
             time: float) -> int:
@@ -166,7 +351,7 @@ class ModelManager(object):
 
         # Save model state
         self._automator.log(f"Saving model state to {filename}")
-        if not hil.save_model_state(filename):
+        if not self._hil.save_model_state(filename):
             raise RuntimeError("Failed to save model state")
 
     def load_model_state(
@@ -184,18 +369,59 @@ class ModelManager(object):
         if not filepath.exists():
             raise FileNotFoundError(f"Saved model file does not exist ({filename})")
 
-        # Load model state
+        # Load model state, which also restores SCADA input values
         self._automator.log(f"Loading model state from {filename}")
-        if not hil.load_model_state(filename):
+        self.clear_scada_values()
+        if not self._hil.load_model_state(filename):
             raise RuntimeError("Failed to load model state")
 
     def set_scada_value(
             self,
             name: str,
             value: Any):
-        if not hil.set_scada_input_value(scadaInputName = name, value = value):
+        """ Set a SCADA input value
+
+        With SCADA write deduplication enabled, the write is skipped if the input already has the value
+
+        :param str name: SCADA input name
+        :param value: Value to write
+        """
+        if self._scada_write_dedup and (name in self._scada_values) and (self._scada_values[name] == value):
+            self._scada_write_counts[1] += 1
+            return
+
+        self._scada_values.pop(name, None)
+        if not self._hil.set_scada_input_value(scadaInputName = name, value = value):
             raise RuntimeError(f"Failed to set SCADA input {name} to value {value}")
 
+        self._scada_values[name] = value
+        self._scada_write_counts[0] += 1
+
+    def set_scada_write_dedup(
+            self,
+            enabled: bool):
+        """ Enable or disable skipping SCADA input writes of the value the input already has
+
+        Only writes made through the model manager are tracked.  Writes made directly through the HIL API, or from
+        the HIL panel, are not seen, so a later write of the tracked value would be skipped wrongly.
+
+        :param bool enabled: True to skip repeated writes, false to make every write
+        """
+        self._scada_write_dedup = enabled
+        self.clear_scada_values()
+
+    def clear_scada_values(self):
+        """ Forget the SCADA input values written to the loaded model """
+        self._scada_values = {}
+
+    def get_scada_write_counts(self) -> tuple[int, int]:
+        """ Get the number of SCADA input writes made and skipped because the input already had the value
+
+        :returns (written, skipped) tuple
+        :rtype tuple[int, int]
+        """
+        return tuple(self._scada_write_counts)
+
     def set_model_variable(
             self,
             name: str,
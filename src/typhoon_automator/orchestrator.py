@@ -1,10 +1,21 @@
+import hashlib
+import json
 import logging
 
 from typing import Any
+from typing import Iterable
+from typing import Iterator
 from pathlib import Path
 from datetime import datetime
 
+from .catalog import RunCatalog
+from .convert import OutputConverter
+from .journal import CampaignJournal
+from .kpi import KpiEngine
+from .planner import ScenarioPlanner
+from .result_cache import ResultCache
 from .simulation import Simulation
+from .snapshot import SnapshotCache
 
 
 # TODO: Class diagram documentation for this is incomplete
@@ -30,10 +41,32 @@ class Orchestrator(object):
         self._simulation = simulation
 
         self._scenarios = {}
+        self._scenario_sources: list[Iterable[tuple[str, Any]]] = []
+        self._dispatch_summaries = {}       # Dispatch summary of each scenario run, by scenario name
+        self._outputs = {}                  # Output filenames of each scenario run, by scenario name
+        self._run_ids = {}                  # Run ID of each scenario run, by scenario name
         
         self._data_logging_path: str = None
         self._capture_path: str = None
 
+        self._snapshot_cache: SnapshotCache = None
+        self._warm_start_stats = {"hits": 0, "misses": 0, "sim_time_saved": 0.0}
+
+        self._result_cache: ResultCache = None
+        self._result_cache_stats = {"hits": 0, "misses": 0}
+
+        self._journal: CampaignJournal = None
+        self._failures = {}                 # Error of each scenario which failed in the last run_all, by name
+
+        self._planner: ScenarioPlanner = None
+        self._converter: OutputConverter = None
+
+        self._catalog: RunCatalog = None
+        self._campaign_id: str = None
+
+        self._kpi_engine: KpiEngine = None
+        self._kpis = {}                     # KPI values of each scenario run, by scenario name
+
     def add_scenario(
             self,
             name: str,
@@ -47,6 +80,56 @@ class Orchestrator(object):
         if name in self._scenarios:
             raise ValueError(f"Scenario name {name} already exists")
 
+        Orchestrator._check_scenario(scenario)
+
+        self._scenarios[name] = scenario
+
+    def add_scenarios(
+            self,
+            scenarios: Iterable[tuple[str, Any]]):
+        """ Add an iterable of (name, scenario) tuples to be run
+
+        The iterable is consumed lazily each time the scenarios are run, so it should be re-iterable (such as a
+        ScenarioFile) if the scenarios are to be run more than once
+
+        :param scenarios: Iterable of (name, scenario) tuples
+        """
+        if scenarios is None:
+            raise ValueError("Scenarios cannot be None")
+
+        self._scenario_sources.append(scenarios)
+
+    def iterate_scenarios(self) -> Iterator[tuple[str, Any]]:
+        """ Iterate over the scenarios added individually and from iterables
+
+        :return Iterator of (name, scenario) tuples
+        :raises ValueError: A scenario name is repeated or a scenario is invalid
+        """
+        yield from self._scenarios.items()
+
+        names = set(self._scenarios.keys())
+        for source in self._scenario_sources:
+            for name, scenario in source:
+                if not name:
+                    raise ValueError("Name cannot be empty")
+
+                if name in names:
+                    raise ValueError(f"Scenario name {name} already exists")
+
+                Orchestrator._check_scenario(scenario)
+
+                names.add(name)
+                yield (name, scenario)
+
+    def _check_scenario(scenario: Any):
+        """ Check that an object satisfies the scenario contract
+
+        :param scenario: Scenario to check
+        :raises ValueError: The scenario is invalid
+        """
+        if scenario is None:
+            raise ValueError("Scenario cannot be None")
+
         if not hasattr(scenario, "set_up_scenario"):
             raise ValueError("Scenario does not have a set_up_scenario method")
         if not callable(scenario.set_up_scenario):
@@ -57,42 +140,671 @@ class Orchestrator(object):
         if not callable(scenario.tear_down_scenario):
             raise ValueError("Scenario tear_down_scenario attribute is not callable")
 
-        self._scenarios[name] = scenario
+    def clear_scenarios(self):
+        """ Remove all scenarios """
+        self._scenarios = {}
+        self._scenario_sources = []
 
     def run_scenario(
             self,
-            name: str):
+            name: str,
+            force: bool = False):
         if not name:
             raise ValueError("Scenario name cannot be empty")
 
         if not (name in self._scenarios):
             raise KeyError(f"Scenario {name} does not exist")
 
-        data_log_filename = f"{datetime.now().strftime('%m%d%H%M%S')}-Data_{name}.csv"
-        data_log_filename = str(Path(self._data_logging_path) / data_log_filename)
+        self._run_scenario(name, self._scenarios[name], force)
+
+    def _run_scenario(
+            self,
+            name: str,
+            scenario: Any,
+            force: bool = False):
+        """ Run a scenario
+
+        :param str name: Scenario name
+        :param scenario: Scenario to run
+        :param bool force: True to run the scenario even if it has a cached result
+        :return True if the scenario was simulated, false if a cached result was used
+        :rtype bool
+        """
+        self._run_ids[name], self._outputs[name] = self._create_run(name)
+        data_log_filename = self._outputs[name]["data_log"]
+        capture_filename = self._outputs[name]["capture"]
+        dispatch_filename = self._outputs[name]["dispatch"]
+
+        # Skip scenario if it has a cached result
+        result_key = self._get_result_key(scenario)
+        if (result_key is not None) and (not force):
+            cached_outputs = self._result_cache.lookup(result_key)
+            if cached_outputs is not None:
+                self._automator.log(f"*** Using cached result of scenario: {name} ***")
+                ResultCache.link_outputs(cached_outputs, self._outputs[name])
+                self._result_cache_stats["hits"] += 1
 
-        capture_filename = f"{datetime.now().strftime('%m%d%H%M%S')}-Capture_{name}.csv"
-        capture_filename = str(Path(self._capture_path) / capture_filename)
+                # Convert outputs which were only cached as CSV files
+                if self._converter is not None:
+                    for filename in (data_log_filename, capture_filename):
+                        converted_filename = self._converter.get_output_filename(filename)
+                        if Path(filename).exists() and (not Path(converted_filename).exists()):
+                            self._converter.submit(filename)
+                return False
 
+        snapshot = None
         try:
             self._automator.log(f"*** Running scenario: {name} ***")
 
-            scenario = self._scenarios[name]
-
             self._simulation.set_data_logging_filename(data_log_filename)
             self._simulation.set_capture_filename(capture_filename)
+            self._simulation.set_dispatch_log_filename(dispatch_filename)
+
+            snapshot = self._configure_warm_start(scenario)
 
             self._simulation.initialize(scenario)
             self._simulation.run()
             self._simulation.finalize(scenario)
 
+            if snapshot is not None:
+                self._snapshot_cache.commit(*snapshot)
+                snapshot = None
+
+            self._dispatch_summaries[name] = self._simulation.get_dispatch_summary()
+
+            if result_key is not None:
+                self._simulation.wait_for_output_writes()
+                converted = None
+                if self._converter is not None:
+                    converted = {
+                        "data_log": self._converter.get_output_filename(data_log_filename),
+                        "capture": self._converter.get_output_filename(capture_filename)}
+
+                self._result_cache.store(result_key, {
+                    "data_log": data_log_filename,
+                    "capture": capture_filename}, converted)
+                self._result_cache_stats["misses"] += 1
+
+            if self._converter is not None:
+                self._convert_outputs(data_log_filename, capture_filename)
+
         except BaseException as ex:
             self._automator.log(f"Failed to run scenario {name}")
+            if snapshot is not None:
+                self._snapshot_cache.discard(snapshot[1])
             raise
 
-    def run_all(self):
-        for name in self._scenarios.keys():
-            self.run_scenario(name)
+        return True
+
+    def _create_run(
+            self,
+            name: str) -> tuple[str, dict]:
+        """ Create the run ID and output filenames of a scenario run
+
+        Output filenames are prefixed with the start time and the first digits of the run ID.  A new run ID is
+        created in the unlikely case that an output file with the same name exists.
+
+        :param str name: Scenario name
+        :return Run ID and dictionary of 'data_log', 'capture', 'dispatch' and 'kpis' filenames
+        :rtype tuple[str, dict]
+        """
+        while True:
+            run_id = RunCatalog.new_run_id()
+            prefix = f"{datetime.now().strftime('%m%d%H%M%S')}-{run_id[:8]}"
+
+            outputs = {
+                "data_log": str(Path(self._data_logging_path) / f"{prefix}-Data_{name}.csv"),
+                "capture": str(Path(self._capture_path) / f"{prefix}-Capture_{name}.csv"),
+                "dispatch": str(Path(self._data_logging_path) / f"{prefix}-Dispatch_{name}.csv"),
+                "kpis": str(Path(self._data_logging_path) / f"{prefix}-Kpi_{name}.json")}
+
+            if not any(Path(filename).exists() for filename in outputs.values()):
+                return (run_id, outputs)
+
+    def run_all(
+            self,
+            force: bool = False,
+            resume: bool = False,
+            continue_on_error: bool = False):
+        """ Run all scenarios
+
+        If a journal is set, each scenario state change is recorded in it.  When resuming, scenarios which the
+        journal records as completed are not run again.
+
+        :param bool force: True to run scenarios even if they have cached results
+        :param bool resume: True to resume the campaign recorded in the journal
+        :param bool continue_on_error: True to record scenario failures and continue with the next scenario, false
+        to stop the campaign at the first failure
+        """
+        completed = {}
+        if resume:
+            if self._journal is None:
+                raise RuntimeError("No campaign journal, cannot resume")
+
+            completed = self._journal.get_completed()
+            self._automator.log(f"Resuming campaign, {len(completed)} scenarios already completed")
+
+        self._failures = {}
+        self._campaign_id = RunCatalog.new_run_id()
+        names = []
+
+        if self._journal is not None:
+            self._journal.open()
+            if not resume:
+                self._journal.start_campaign()
+
+        scenarios = self.iterate_scenarios()
+        if self._planner is not None:
+            scenarios = self._planner.plan(scenarios)
+
+        try:
+            for name, scenario in scenarios:
+                if name in completed:
+                    self._outputs[name] = completed[name].get("outputs", {})
+                    if completed[name].get("run_id"):
+                        self._run_ids[name] = completed[name]["run_id"]
+                    continue
+
+                self._run_journaled(name, scenario, force, continue_on_error)
+                names.append(name)
+        finally:
+            if self._journal is not None:
+                self._journal.close()
+
+            self._simulation.release_data_logger()
+            self._simulation.wait_for_output_writes()
+
+            if self._converter is not None:
+                for filename, ex in self._converter.wait().items():
+                    self._automator.log(f"Failed to convert {filename}", level = logging.ERROR)
+                    self._automator.log_exception(ex)
+
+            if self._kpi_engine is not None:
+                self._collect_kpis(wait = True)
+
+            if self._catalog is not None:
+                self._catalog.close()
+
+        self._log_dispatch_summaries(names)
+
+        if self._snapshot_cache is not None:
+            stats = self._warm_start_stats
+            self._automator.log(
+                f"Warm starts: {stats['hits']} restored, {stats['misses']} created, "
+                f"{stats['sim_time_saved']} seconds of sim time saved")
+
+        if self._result_cache is not None:
+            stats = self._result_cache_stats
+            self._automator.log(f"Results: {stats['hits']} reused from cache, {stats['misses']} simulated")
+
+        if self._planner is not None:
+            stats = self._planner.get_statistics()
+            self._automator.log(
+                f"Plan: {stats['planned']} of {stats['scenarios']} scenarios planned, "
+                f"{stats['changes_planned']} setup changes, {stats['changes_avoided']} avoided")
+
+        stats = self._simulation.get_reconfiguration_statistics()
+        self._automator.log(
+            f"Reconfiguration: data logger added {stats['data_logger_added']} times, reused {stats['data_logger_reused']} times, "
+            f"{stats['scada_writes_skipped']} of {stats['scada_writes'] + stats['scada_writes_skipped']} SCADA writes skipped")
+
+        if self._failures:
+            self._automator.log(f"{len(self._failures)} scenarios failed", level = logging.ERROR)
+
+    def _run_journaled(
+            self,
+            name: str,
+            scenario: Any,
+            force: bool,
+            continue_on_error: bool):
+        """ Run a scenario, recording its state changes in the journal and its result in the run catalog
+
+        :param str name: Scenario name
+        :param scenario: Scenario to run
+        :param bool force: True to run the scenario even if it has a cached result
+        :param bool continue_on_error: True to record a failure and return, false to raise it
+        """
+        if self._journal is not None:
+            self._journal.record(name, CampaignJournal.STARTED)
+
+        self._run_ids.pop(name, None)
+        start_time = datetime.now()
+        try:
+            simulated = self._run_scenario(name, scenario, force)
+
+        except Exception as ex:
+            self._failures[name] = repr(ex)
+            if self._journal is not None:
+                self._journal.record(name, CampaignJournal.FAILED, error = repr(ex))
+
+            self._catalog_run(name, scenario, RunCatalog.FAILED, start_time, error = repr(ex))
+
+            try:
+                self._simulation.abort()
+            except Exception as abort_ex:
+                self._automator.log("Failed to clean up after failed scenario", level = logging.ERROR)
+                self._automator.log_exception(abort_ex)
+
+            if not continue_on_error:
+                raise
+
+            self._automator.log_exception(ex)
+            return
+
+        if self._journal is not None:
+            self._journal.record(
+                name,
+                CampaignJournal.COMPLETED,
+                cached = not simulated,
+                run_id = self._run_ids[name],
+                outputs = self._outputs[name])
+
+        self._catalog_run(name, scenario, RunCatalog.COMPLETED if simulated else RunCatalog.CACHED, start_time)
+
+        if self._kpi_engine is not None:
+            self._submit_kpis(name, scenario)
+            self._collect_kpis(wait = False)
+
+    def _catalog_run(
+            self,
+            name: str,
+            scenario: Any,
+            status: str,
+            start_time: datetime,
+            error: str = None):
+        """ Record a finished scenario run in the run catalog
+
+        Scenario parameters are taken from the scenario's get_parameters method, or its to_dict method
+
+        :param str name: Scenario name
+        :param scenario: Scenario which was run
+        :param str status: Run status
+        :param datetime start_time: Wall time the run started
+        :param str error: Error description of a failed run
+        """
+        if (self._catalog is None) or (name not in self._run_ids):
+            return
+
+        try:
+            parameters = None
+            if hasattr(scenario, "get_parameters"):
+                parameters = scenario.get_parameters()
+            elif hasattr(scenario, "to_dict"):
+                parameters = scenario.to_dict()
+
+            sim_duration = None
+            if status == RunCatalog.COMPLETED:
+                sim_duration = self._simulation.get_scenario_duration()
+            elif (status == RunCatalog.CACHED) and hasattr(scenario, "get_duration"):
+                sim_duration = scenario.get_duration()
+
+            self._catalog.record_run(
+                run_id = self._run_ids[name],
+                scenario_name = name,
+                status = status,
+                campaign_id = self._campaign_id,
+                scenario_id = Orchestrator._get_scenario_id(scenario),
+                model_hash = self._simulation.get_model_hash(),
+                parameters = parameters,
+                start_time = start_time,
+                stop_time = datetime.now(),
+                sim_duration = sim_duration,
+                outputs = self._outputs[name],
+                error = error)
+
+        except Exception as ex:
+            self._automator.log(f"Failed to record scenario {name} in the run catalog", level = logging.ERROR)
+            self._automator.log_exception(ex)
+
+    def set_journal(
+            self,
+            journal: CampaignJournal):
+        """ Set the campaign journal
+
+        :param CampaignJournal journal: Campaign journal, None to run without a journal
+        """
+        self._journal = journal
+
+    def _submit_kpis(
+            self,
+            name: str,
+            scenario: Any):
+        """ Submit the KPIs a scenario declares with its get_kpis method for computation
+
+        :param str name: Scenario name
+        :param scenario: Scenario which was run
+        """
+        self._kpis.pop(name, None)
+        if not hasattr(scenario, "get_kpis"):
+            return
+
+        definitions = scenario.get_kpis()
+        if not definitions:
+            return
+
+        event_times = None
+        if hasattr(scenario, "get_event_times"):
+            event_times = scenario.get_event_times()
+
+        # Capture files may still be being written in the background, the computation waits for them
+        self._kpi_engine.submit(
+            name = name,
+            run_id = self._run_ids[name],
+            outputs = self._outputs[name],
+            definitions = definitions,
+            event_times = event_times,
+            kpi_filename = self._outputs[name].get("kpis"),
+            wait_for = self._simulation.get_output_writes())
+
+    def _collect_kpis(
+            self,
+            wait: bool):
+        """ Collect computed KPIs and record them in the run catalog
+
+        :param bool wait: True to wait for all submitted KPI computations
+        """
+        for name, run_id, result in self._kpi_engine.collect(wait):
+            if isinstance(result, BaseException):
+                self._automator.log(f"Failed to compute KPIs of scenario {name}", level = logging.ERROR)
+                self._automator.log_exception(result)
+                continue
+
+            self._kpis[name] = result
+            if self._catalog is None:
+                continue
+
+            try:
+                self._catalog.set_kpis(run_id, result)
+            except Exception as ex:
+                self._automator.log(f"Failed to record KPIs of scenario {name} in the run catalog", level = logging.ERROR)
+                self._automator.log_exception(ex)
+
+    def set_kpi_engine(
+            self,
+            engine: KpiEngine):
+        """ Set the KPI engine
+
+        KPIs which scenarios declare with a get_kpis method are computed by the engine from each scenario's outputs
+        while the next scenarios run
+
+        :param KpiEngine engine: KPI engine, None to not compute KPIs
+        """
+        self._kpi_engine = engine
+
+    def get_kpi_engine(self) -> KpiEngine:
+        """ Get the KPI engine
+
+        :return KPI engine, None if KPIs are not computed
+        :rtype KpiEngine
+        """
+        return self._kpi_engine
+
+    def get_scenario_kpis(
+            self,
+            name: str) -> dict:
+        """ Get the KPIs of the last run of a scenario
+
+        :param str name: Scenario name
+        :return Dictionary of KPI values by name
+        :rtype dict
+        :raises KeyError: The scenario has no computed KPIs
+        """
+        return self._kpis[name].copy()
+
+    def set_run_catalog(
+            self,
+            catalog: RunCatalog):
+        """ Set the run catalog
+
+        :param RunCatalog catalog: Run catalog, None to run without a catalog
+        """
+        self._catalog = catalog
+
+    def get_run_catalog(self) -> RunCatalog:
+        """ Get the run catalog
+
+        :return Run catalog, None if runs are not cataloged
+        :rtype RunCatalog
+        """
+        return self._catalog
+
+    def get_scenario_run_id(
+            self,
+            name: str) -> str:
+        """ Get the run ID of the last run of a scenario
+
+        :param str name: Scenario name
+        :return Run ID
+        :rtype str
+        :raises KeyError: The scenario has not been run
+        """
+        return self._run_ids[name]
+
+    def set_planner(
+            self,
+            planner: ScenarioPlanner):
+        """ Set the scenario planner
+
+        :param ScenarioPlanner planner: Planner which orders scenarios to minimize setup changes, None to run
+        scenarios in the order they were added
+        """
+        self._planner = planner
+
+    def set_output_converter(
+            self,
+            converter: OutputConverter):
+        """ Set the converter of output files
+
+        Data logging and capture files of each scenario are converted in the background while the next scenario runs
+
+        :param OutputConverter converter: Output converter, None to keep outputs as CSV files only
+        """
+        self._converter = converter
+
+    def get_output_converter(self) -> OutputConverter:
+        """ Get the converter of output files
+
+        :return Output converter, None if outputs are not converted
+        :rtype OutputConverter
+        """
+        return self._converter
+
+    def _convert_outputs(
+            self,
+            data_log_filename: str,
+            capture_filename: str):
+        """ Submit the output files of a scenario run for conversion
+
+        :param str data_log_filename: Data logging file
+        :param str capture_filename: Capture file
+        """
+        if Path(data_log_filename).exists():
+            self._converter.submit(data_log_filename)
+
+        # Capture files may still be being written in the background
+        if self._simulation.get_capture_result() is not None:
+            self._simulation.wait_for_output_writes()
+
+        if Path(capture_filename).exists():
+            self._converter.submit(capture_filename)
+
+    def get_planner(self) -> ScenarioPlanner:
+        """ Get the scenario planner
+
+        :return Scenario planner, None if scenarios are run in the order they were added
+        :rtype ScenarioPlanner
+        """
+        return self._planner
+
+    def get_failures(self) -> dict:
+        """ Get the scenarios which failed in the last run
+
+        :return Dictionary of error descriptions by scenario name
+        :rtype dict
+        """
+        return self._failures.copy()
+
+    def set_result_cache(
+            self,
+            cache: ResultCache):
+        """ Set the cache of scenario results
+
+        Scenarios with a get_scenario_id or to_dict method are skipped when the cache holds a result of the same
+        scenario ID and seed (from the optional get_seed method) for the compiled model.  The cached output files
+        are linked to the scenario's new output filenames instead.
+
+        :param ResultCache cache: Result cache, None to always run scenarios
+        """
+        self._result_cache = cache
+
+    def get_result_cache(self) -> ResultCache:
+        """ Get the cache of scenario results
+
+        :return Result cache, None if results are not cached
+        :rtype ResultCache
+        """
+        return self._result_cache
+
+    def get_result_cache_statistics(self) -> dict:
+        """ Get the result cache statistics of the campaign
+
+        :return Dictionary of result cache 'hits' and 'misses'
+        :rtype dict
+        """
+        return self._result_cache_stats.copy()
+
+    def _get_result_key(
+            self,
+            scenario: Any) -> str:
+        """ Get the result cache key of a scenario
+
+        :param scenario: Scenario to be run
+        :return Cache key, None if results are not cached or the scenario has no ID
+        :rtype str
+        """
+        if self._result_cache is None:
+            return None
+
+        scenario_id = Orchestrator._get_scenario_id(scenario)
+        if scenario_id is None:
+            return None
+
+        seed = None
+        if hasattr(scenario, "get_seed"):
+            seed = scenario.get_seed()
+
+        return ResultCache.get_key(self._simulation.get_model_hash(), scenario_id, seed)
+
+    def _get_scenario_id(scenario: Any) -> str:
+        """ Get the stable ID of a scenario
+
+        :param scenario: Scenario
+        :return Scenario ID, None if the scenario does not have a get_scenario_id or to_dict method
+        :rtype str
+        """
+        if hasattr(scenario, "get_scenario_id"):
+            return scenario.get_scenario_id()
+
+        if hasattr(scenario, "to_dict"):
+            encoded = json.dumps(scenario.to_dict(), sort_keys = True, default = repr)
+            return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+        return None
+
+    def set_snapshot_cache(
+            self,
+            cache: SnapshotCache):
+        """ Set the cache of warm-up snapshots
+
+        Scenarios with a get_warm_up method returning a (prefix ID, duration) tuple are started from a cached
+        snapshot of their warm-up period when one exists for the compiled model, otherwise the snapshot is
+        created during their run.
+
+        :param SnapshotCache cache: Snapshot cache, None to disable warm starts
+        """
+        self._snapshot_cache = cache
+
+    def get_warm_start_statistics(self) -> dict:
+        """ Get the warm start statistics of the campaign
+
+        :return Dictionary of snapshot 'hits', 'misses' and 'sim_time_saved'
+        :rtype dict
+        """
+        return self._warm_start_stats.copy()
+
+    def _configure_warm_start(
+            self,
+            scenario: Any) -> tuple[str, str]:
+        """ Configure the simulation to warm start a scenario from the snapshot cache
+
+        :param scenario: Scenario to be run
+        :return (key, staging filename) of a snapshot created by the run which must be committed to the cache, None
+        otherwise
+        :rtype tuple[str, str]
+        """
+        self._simulation.clear_warm_start()
+
+        warm_up = None
+        if (self._snapshot_cache is not None) and hasattr(scenario, "get_warm_up"):
+            warm_up = scenario.get_warm_up()
+
+        if not warm_up:
+            return None
+
+        prefix_id, duration = warm_up
+        key = SnapshotCache.get_key(self._simulation.get_model_hash(), prefix_id)
+
+        filename = self._snapshot_cache.lookup(key)
+        if filename is not None:
+            self._automator.log(f"Restoring warm-up snapshot {prefix_id}")
+            self._simulation.set_warm_start(filename, duration)
+            self._warm_start_stats["hits"] += 1
+            self._warm_start_stats["sim_time_saved"] += duration
+            return None
+
+        self._automator.log(f"Creating warm-up snapshot {prefix_id}")
+        staging_filename = self._snapshot_cache.create_staging_path(key)
+        self._simulation.set_warm_start(staging_filename, duration, create = True)
+        self._warm_start_stats["misses"] += 1
+        return (key, staging_filename)
+
+    def get_scenario_outputs(
+            self,
+            name: str) -> dict:
+        """ Get the output filenames of the last run of a scenario
+
+        Files are only present if the scenario produced the corresponding output
+
+        :param str name: Scenario name
+        :return Dictionary of 'data_log', 'capture', 'dispatch' and 'kpis' filenames
+        :rtype dict
+        :raises KeyError: The scenario has not been run
+        """
+        return self._outputs[name].copy()
+
+    def get_dispatch_summaries(self) -> dict:
+        """ Get the dispatch summaries of the scenarios which have been run
+
+        :return Dictionary of dispatch summaries by scenario name
+        :rtype dict
+        """
+        return self._dispatch_summaries.copy()
+
+    def _log_dispatch_summaries(
+            self,
+            names: list[str]):
+        """ Log the dispatch lateness of scenarios which have been run
+
+        :param list[str] names: Names of the scenarios
+        """
+        for name in names:
+            summary = self._dispatch_summaries.get(name)
+            if summary is None:
+                continue
+
+            self._automator.log(
+                f"Scenario {name}: {summary['count']} events, lateness p50 {summary['lateness_p50']:.6f} "
+                f"p99 {summary['lateness_p99']:.6f} max {summary['lateness_max']:.6f}")
 
     def set_data_logging_path(
             self,
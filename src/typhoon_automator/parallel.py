@@ -0,0 +1,459 @@
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import time
+import traceback
+
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Iterable
+
+from .backend import HilBackend
+
+
+class WorkerSpec(object):
+    """ Parallel worker specification
+
+    Describes the HIL device (or Virtual HIL instance) used by one worker process
+    """
+
+    def __init__(
+            self,
+            name: str,
+            device: dict = None,
+            use_vhil: bool = False):
+        """ Create a worker specification
+
+        :param str name: Worker name, also used as the name of the worker's output directory
+        :param dict device: Device descriptor (as returned by get_available_devices) to connect, None for no device
+        :param bool use_vhil: True if the worker should use Virtual HIL
+        """
+        if not name:
+            raise ValueError("Worker name cannot be empty")
+
+        if (device is None) and (not use_vhil):
+            raise ValueError(f"Worker {name} needs a device or Virtual HIL")
+
+        self.name = name
+        self.device = device
+        self.use_vhil = use_vhil
+
+
+class ParallelRunner(object):
+    """ Parallel scenario runner
+
+    Runs scenarios on a pool of worker processes.  Each worker has its own automator, HIL device or Virtual HIL
+    instance and output directories.  Scenarios are handed to whichever worker is free; results and log
+    records are sent back to the parent process.  Scenarios must be picklable.
+    """
+
+    def __init__(
+            self,
+            schematic: str,
+            workers: list[WorkerSpec],
+            output_path: str,
+            backend_factory: Callable[[], HilBackend] = None,
+            conditional_compile: bool = True):
+        """ Create a parallel runner
+
+        :param str schematic: Path to the Typhoon schematic to use
+        :param list[WorkerSpec] workers: Worker specifications, one process is started for each
+        :param str output_path: Root output directory, each worker writes to a subdirectory named after it
+        :param backend_factory: Picklable callable creating the HIL backend of each worker, Typhoon API if None
+        :param bool conditional_compile: True if the schematic should be compiled conditionally before starting workers
+        """
+        if not schematic:
+            raise ValueError("Schematic path cannot be empty")
+
+        if not workers:
+            raise ValueError("Worker list cannot be empty")
+
+        names = [worker.name for worker in workers]
+        if len(set(names)) != len(names):
+            raise ValueError("Worker names must be unique")
+
+        if not output_path:
+            raise ValueError("Output path cannot be empty")
+
+        self._schematic = schematic
+        self._workers = list(workers)
+        self._output_path = output_path
+        self._backend_factory = backend_factory
+        self._conditional_compile = conditional_compile
+
+        self._logger: logging.Logger = None
+        self._scenario_sources: list[Iterable[tuple[str, Any]]] = []
+        self._scenario_names = set()
+        self._pending: list[tuple[str, Any]] = []
+
+        self._results: list[dict] = []
+        self._summary: dict = None
+
+    def set_automation_logger(
+            self,
+            logger: logging.Logger):
+        """ Set the logging object which receives the log records of the runner and all workers
+
+        :param logging.Logger logger: Logging object to use for log output
+        """
+        self._logger = logger
+
+    def log(
+            self,
+            message: str,
+            level: int = logging.INFO):
+        if self._logger:
+            self._logger.log(level, message)
+
+    def add_scenario(
+            self,
+            name: str,
+            scenario: Any):
+        """ Add a scenario to be run
+
+        :param str name: Scenario name
+        :param scenario: Picklable scenario object
+        """
+        if not name:
+            raise ValueError("Name cannot be empty")
+
+        if scenario is None:
+            raise ValueError("Scenario cannot be None")
+
+        if name in self._scenario_names:
+            raise ValueError(f"Scenario name {name} already exists")
+
+        self._scenario_names.add(name)
+        self._pending.append((name, scenario))
+
+    def add_scenarios(
+            self,
+            scenarios: Iterable[tuple[str, Any]]):
+        """ Add an iterable of (name, scenario) tuples to be run
+
+        The iterable is consumed lazily while the campaign runs
+
+        :param scenarios: Iterable of (name, scenario) tuples
+        """
+        if scenarios is None:
+            raise ValueError("Scenarios cannot be None")
+
+        self._scenario_sources.append(scenarios)
+
+    def get_results(self) -> list[dict]:
+        """ Get the results of the last run
+
+        :return List of result dictionaries with 'name', 'worker', 'status', 'error', 'outputs' and 'wall_time'
+        :rtype list[dict]
+        """
+        return list(self._results)
+
+    def get_summary(self) -> dict:
+        """ Get the campaign summary of the last run
+
+        :return Dictionary of campaign totals and per-worker statistics
+        :rtype dict
+        """
+        return self._summary
+
+    def run(self) -> dict:
+        """ Run all scenarios on the worker pool
+
+        :return Campaign summary
+        :rtype dict
+        """
+        # Compile once in the parent so workers do not compile the same schematic concurrently
+        self._precompile()
+
+        context = multiprocessing.get_context("spawn")
+        task_queue = context.Queue(maxsize = 2 * len(self._workers))
+        result_queue = context.Queue()
+        log_queue = context.Queue()
+
+        listener = logging.handlers.QueueListener(log_queue, _ForwardHandler(self))
+        listener.start()
+
+        self._results = []
+        start_time = time.perf_counter()
+
+        processes = {}
+        for worker in self._workers:
+            process = context.Process(
+                target = _run_worker,
+                name = f"TyphoonAutomator-{worker.name}",
+                args = (
+                    worker,
+                    self._schematic,
+                    self._output_path,
+                    self._backend_factory,
+                    task_queue,
+                    result_queue,
+                    log_queue))
+            process.start()
+            processes[worker.name] = process
+
+        self.log(f"Started {len(processes)} workers")
+
+        worker_stats = {}
+        try:
+            worker_stats = self._dispatch(processes, task_queue, result_queue)
+        finally:
+            for process in processes.values():
+                process.join(timeout = 10.0)
+                if process.is_alive():
+                    process.terminate()
+
+            # Tasks and sentinels left for dead workers must not block the parent on exit
+            task_queue.cancel_join_thread()
+            listener.stop()
+
+        self._summary = self._summarize(worker_stats, time.perf_counter() - start_time)
+        self._log_summary()
+        return self._summary
+
+    def _precompile(self):
+        """ Compile the schematic in the parent process """
+        from .automator import TyphoonAutomator
+
+        self.log("Compiling schematic for workers")
+        backend = self._backend_factory() if self._backend_factory is not None else None
+        automator = TyphoonAutomator(backend = backend)
+        automator.set_automation_logger(self._logger)
+        try:
+            automator.initialize(self._schematic, conditional_compile = self._conditional_compile)
+        finally:
+            automator.shutdown()
+
+    def _iterate_scenarios(self) -> Iterable[tuple[str, Any]]:
+        """ Iterate over the scenarios added individually and from iterables """
+        yield from self._pending
+
+        for source in self._scenario_sources:
+            for name, scenario in source:
+                if name in self._scenario_names:
+                    raise ValueError(f"Scenario name {name} already exists")
+
+                self._scenario_names.add(name)
+                yield (name, scenario)
+
+    def _dispatch(
+            self,
+            processes: dict,
+            task_queue,
+            result_queue) -> dict:
+        """ Feed scenarios to the workers and collect their results until all workers are done
+
+        :return Dictionary of worker statistics by worker name
+        :rtype dict
+        """
+        tasks = self._iterate_scenarios()
+        task = None
+        exhausted = False
+        outstanding = 0
+        sentinels = 0
+        worker_stats = {}
+
+        while len(worker_stats) < len(processes):
+            # Keep the task queue filled, never blocking so that dead workers are still detected
+            try:
+                while (not exhausted) and (not task_queue.full()):
+                    if task is None:
+                        task = next(tasks, None)
+                        if task is None:
+                            exhausted = True
+                            break
+
+                    task_queue.put_nowait(task)
+                    task = None
+                    outstanding += 1
+
+                # One sentinel per worker, queued as space frees up
+                while exhausted and (sentinels < len(processes)) and (not task_queue.full()):
+                    task_queue.put_nowait(None)
+                    sentinels += 1
+            except queue.Full:
+                pass
+
+            try:
+                message = result_queue.get(timeout = 1.0)
+            except queue.Empty:
+                # Account for workers which exited without reporting
+                for name, process in processes.items():
+                    if (name not in worker_stats) and (not process.is_alive()):
+                        self.log(f"Worker {name} exited unexpectedly ({process.exitcode})", level = logging.ERROR)
+                        worker_stats[name] = {"error": f"Exited with code {process.exitcode}"}
+                continue
+
+            kind, worker_name, payload = message
+            if kind == "result":
+                outstanding -= 1
+                self._results.append(payload)
+            elif kind == "done":
+                worker_stats[worker_name] = payload
+
+        if outstanding > 0:
+            self.log(f"{outstanding} scenarios were not run, no workers remaining", level = logging.ERROR)
+
+        return worker_stats
+
+    def _summarize(
+            self,
+            worker_stats: dict,
+            wall_time: float) -> dict:
+        """ Build the campaign summary """
+        workers = {}
+        for worker in self._workers:
+            stats = dict(worker_stats.get(worker.name, {}))
+            results = [result for result in self._results if result["worker"] == worker.name]
+            busy_time = sum(result["wall_time"] for result in results)
+
+            stats["scenarios"] = len(results)
+            stats["failed"] = sum(1 for result in results if result["status"] != "completed")
+            stats["busy_time"] = busy_time
+            stats["utilization"] = (100.0 * busy_time / wall_time) if wall_time > 0.0 else 0.0
+            workers[worker.name] = stats
+
+        return {
+            "wall_time": wall_time,
+            "scenarios": len(self._results),
+            "completed": sum(1 for result in self._results if result["status"] == "completed"),
+            "failed": sum(1 for result in self._results if result["status"] != "completed"),
+            "workers": workers,
+        }
+
+    def _log_summary(self):
+        """ Log the campaign summary """
+        summary = self._summary
+        self.log(
+            f"Campaign finished in {summary['wall_time']:.1f} seconds: {summary['completed']} completed, "
+            f"{summary['failed']} failed")
+
+        for name, stats in summary["workers"].items():
+            message = (
+                f"Worker {name}: {stats['scenarios']} scenarios, {stats['failed']} failed, "
+                f"busy {stats['busy_time']:.1f} seconds ({stats['utilization']:.1f}%)")
+            if "error" in stats:
+                message += f", error: {stats['error']}"
+            self.log(message)
+
+
+class _ForwardHandler(logging.Handler):
+    """ Log handler forwarding worker log records to the runner's logger """
+
+    def __init__(
+            self,
+            runner: ParallelRunner):
+        super().__init__()
+        self._runner = runner
+
+    def emit(
+            self,
+            record: logging.LogRecord):
+        logger = self._runner._logger
+        if logger and logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+class _WorkerPrefixFilter(logging.Filter):
+    """ Log filter prefixing messages with the worker name """
+
+    def __init__(
+            self,
+            worker_name: str):
+        super().__init__()
+        self._prefix = f"[{worker_name}] "
+
+    def filter(
+            self,
+            record: logging.LogRecord) -> bool:
+        record.msg = self._prefix + record.getMessage()
+        record.args = None
+        return True
+
+
+def _run_worker(
+        worker: WorkerSpec,
+        schematic: str,
+        output_path: str,
+        backend_factory: Callable[[], HilBackend],
+        task_queue,
+        result_queue,
+        log_queue):
+    """ Worker process entry point
+
+    Sets up an automator for the worker's device and runs scenarios from the task queue until it receives None
+    """
+    from .automator import TyphoonAutomator
+
+    start_time = time.perf_counter()
+
+    logger = logging.getLogger(f"typhoon_automator.worker.{worker.name}")
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    logger.addFilter(_WorkerPrefixFilter(worker.name))
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+
+    stats = {}
+    automator = None
+    try:
+        # Set up the worker's automator, device and output directories
+        backend = backend_factory() if backend_factory is not None else None
+        automator = TyphoonAutomator(backend = backend)
+        automator.set_automation_logger(logger)
+
+        if worker.device is not None:
+            if not automator.connect_devices([worker.device]):
+                raise RuntimeError(f"Failed to connect device {worker.device}")
+
+        # The parent has already compiled the schematic, so compile conditionally
+        automator.initialize(schematic, conditional_compile = True)
+
+        worker_path = Path(output_path) / worker.name
+        automator.set_data_logger_path(str(worker_path / "data"))
+        automator.set_capture_path(str(worker_path / "capture"))
+
+        stats["init_time"] = time.perf_counter() - start_time
+
+        # Run scenarios until the sentinel is received
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            name, scenario = task
+            result = {"name": name, "worker": worker.name, "status": "completed", "error": None, "outputs": None}
+
+            scenario_start = time.perf_counter()
+            try:
+                automator.clear_scenarios()
+                automator.add_scenario(name = name, scenario = scenario)
+                automator.run(use_vhil = worker.use_vhil)
+            except Exception as ex:
+                logger.exception(ex)
+                result["status"] = "failed"
+                result["error"] = "".join(traceback.format_exception_only(type(ex), ex)).strip()
+
+            result["wall_time"] = time.perf_counter() - scenario_start
+            try:
+                result["outputs"] = automator.get_scenario_outputs(name)
+            except KeyError:
+                pass
+
+            result_queue.put(("result", worker.name, result))
+
+    except Exception as ex:
+        logger.critical("Worker failed")
+        logger.exception(ex)
+        stats["error"] = "".join(traceback.format_exception_only(type(ex), ex)).strip()
+
+    finally:
+        if automator is not None:
+            try:
+                automator.shutdown()
+            except Exception as ex:
+                logger.exception(ex)
+
+        stats["wall_time"] = time.perf_counter() - start_time
+        result_queue.put(("done", worker.name, stats))
@@ -0,0 +1,132 @@
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+
+
+class ScenarioPlanner(object):
+    """ Scenario planner
+
+    Orders scenarios so that scenarios sharing a setup run consecutively, which lets the simulation keep its data
+    logger and SCADA input values between them.  Scenarios describe their setup with an optional get_setup_key method
+    returning a tuple of setup components, such as the data logging signals, capture configuration, warm-up prefix and
+    initial SCADA values.  Scenarios are ordered by the components in turn, so the first component changes least.
+
+    Scenarios without a setup key keep their order and run after the planned scenarios of their window.
+    """
+
+    DEFAULT_WINDOW: int = 1000          # Scenarios read ahead by default, so scenario files and sweeps still stream
+
+    def __init__(
+            self,
+            window: int = DEFAULT_WINDOW):
+        """ Create a scenario planner
+
+        :param int window: Number of scenarios read ahead and ordered together, None to read all scenarios and
+        order them at once
+        """
+        if (window is not None) and (window < 1):
+            raise ValueError(f"Invalid planning window ({window})")
+
+        self._window = window
+        self._stats = {}
+        self._reset_statistics()
+
+    def get_setup_key(scenario: Any) -> tuple:
+        """ Get the setup key of a scenario
+
+        :param scenario: Scenario
+        :return Tuple of setup components, None if the scenario does not have a get_setup_key method
+        :rtype tuple
+        """
+        if not hasattr(scenario, "get_setup_key"):
+            return None
+
+        return tuple(scenario.get_setup_key())
+
+    def plan(
+            self,
+            scenarios: Iterable[tuple[str, Any]]) -> Iterator[tuple[str, Any]]:
+        """ Order scenarios to minimize setup changes
+
+        :param scenarios: Iterable of (name, scenario) tuples
+        :return Iterator of (name, scenario) tuples in planned order
+        """
+        self._reset_statistics()
+
+        original_key = None
+        planned_key = None
+
+        window = []
+        for name, scenario in scenarios:
+            key = ScenarioPlanner.get_setup_key(scenario)
+            if key is not None:
+                self._stats["changes_unplanned"] += ScenarioPlanner._count_changes(original_key, key)
+                original_key = key
+
+            window.append((key, name, scenario))
+            if (self._window is not None) and (len(window) >= self._window):
+                planned_key = yield from self._plan_window(window, planned_key)
+                window = []
+
+        if window:
+            yield from self._plan_window(window, planned_key)
+
+    def get_statistics(self) -> dict:
+        """ Get the statistics of the last plan
+
+        Setup changes are counted per setup component between consecutive scenarios with setup keys
+
+        :return Dictionary of 'scenarios', 'planned' (scenarios with setup keys), 'changes_unplanned',
+        'changes_planned' and 'changes_avoided'
+        :rtype dict
+        """
+        stats = self._stats.copy()
+        stats["changes_avoided"] = stats["changes_unplanned"] - stats["changes_planned"]
+        return stats
+
+    def _plan_window(
+            self,
+            window: list[tuple],
+            previous_key: tuple) -> Iterator[tuple[str, Any]]:
+        """ Order a window of scenarios
+
+        :param list window: List of (setup key, name, scenario) tuples
+        :param tuple previous_key: Setup key of the last planned scenario of the previous window
+        :return Iterator of (name, scenario) tuples, returns the setup key of the last planned scenario
+        """
+        keyed = [(ScenarioPlanner._get_sort_key(key), index) for index, (key, _, _) in enumerate(window) if key is not None]
+        keyed.sort()
+
+        order = [index for _, index in keyed]
+        order.extend(index for index, (key, _, _) in enumerate(window) if key is None)
+
+        for index in order:
+            key, name, scenario = window[index]
+            self._stats["scenarios"] += 1
+            if key is not None:
+                self._stats["planned"] += 1
+                self._stats["changes_planned"] += ScenarioPlanner._count_changes(previous_key, key)
+                previous_key = key
+
+            yield (name, scenario)
+
+        return previous_key
+
+    def _get_sort_key(key: tuple) -> tuple:
+        """ Get an orderable key from a setup key, whatever the types of its components """
+        return tuple(repr(component) for component in key)
+
+    def _count_changes(
+            previous_key: tuple,
+            key: tuple) -> int:
+        """ Count the setup components which differ between two setup keys """
+        if previous_key is None:
+            return 0
+
+        if len(previous_key) != len(key):
+            return max(len(previous_key), len(key))
+
+        return sum(1 for previous, current in zip(previous_key, key) if previous != current)
+
+    def _reset_statistics(self):
+        self._stats = {"scenarios": 0, "planned": 0, "changes_unplanned": 0, "changes_planned": 0}
@@ -0,0 +1,238 @@
+import csv
+
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ScadaProfile(object):
+    """ SCADA input profile
+
+    Base class for playing back a series of (time, value) samples to a SCADA input.  Profiles are polled once
+    per dispatch tick of the simulation loop; only the latest sample due at the polled time is written and any
+    earlier samples which were overtaken are skipped.
+    """
+
+    def __init__(
+            self,
+            scada_name: str,
+            time_offset: float = 0.0):
+        if not scada_name:
+            raise ValueError("SCADA input name cannot be empty")
+
+        self._scada_name = scada_name
+        self._time_offset = time_offset     # Simulation time of the first sample's time base
+
+    def get_scada_name(self) -> str:
+        """ Get the name of the SCADA input driven by the profile
+
+        :return SCADA input name
+        :rtype str
+        """
+        return self._scada_name
+
+    def update(
+            self,
+            sim_time: float) -> Any:
+        """ Advance the profile to a simulation time
+
+        :param float sim_time: Current simulation time
+        :return Latest value due at or before sim_time which has not been returned yet, None if no new value is due
+        """
+        raise NotImplementedError()
+
+    def get_next_time(self) -> float:
+        """ Get the simulation time of the next sample which has not been played back
+
+        :return Simulation time of the next sample, None if the profile is finished
+        :rtype float
+        """
+        raise NotImplementedError()
+
+    def reset(self):
+        """ Rewind the profile to its first sample """
+        raise NotImplementedError()
+
+    def close(self):
+        """ Release any resources held by the profile """
+        pass
+
+    def from_file(
+            scada_name: str,
+            filename: str,
+            time_offset: float = 0.0):
+        """ Create a profile from a file
+
+        Files with a '.npy' extension are memory-mapped and must contain an (N, 2) array of (time, value)
+        rows.  Any other file is read as CSV with time in the first column and value in the second.
+
+        :param str scada_name: Name of the SCADA input to drive
+        :param str filename: Profile file
+        :param float time_offset: Simulation time corresponding to a profile time of zero
+        :return Profile reading the file
+        :rtype ScadaProfile
+        """
+        if Path(filename).suffix.lower() == ".npy":
+            return ArrayProfile.from_npy(
+                scada_name = scada_name,
+                filename = filename,
+                time_offset = time_offset)
+
+        return CsvProfile(
+            scada_name = scada_name,
+            filename = filename,
+            time_offset = time_offset)
+
+
+class ArrayProfile(ScadaProfile):
+    """ SCADA input profile backed by NumPy arrays
+
+    Sample times must be sorted in ascending order.  Arrays may be memory-mapped, in which case only the pages
+    touched by the binary search on each tick are read.
+    """
+
+    def __init__(
+            self,
+            scada_name: str,
+            times,
+            values,
+            time_offset: float = 0.0):
+        super().__init__(scada_name, time_offset)
+
+        if np is None:
+            raise RuntimeError("NumPy is required for array profiles")
+
+        if len(times) != len(values):
+            raise ValueError(f"Profile time and value lengths differ ({len(times)}, {len(values)})")
+
+        self._times = times
+        self._values = values
+        self._index = 0                     # Index of the next sample to be played back
+
+    def from_npy(
+            scada_name: str,
+            filename: str,
+            time_offset: float = 0.0):
+        """ Create a profile from a memory-mapped '.npy' file of (time, value) rows
+
+        :param str scada_name: Name of the SCADA input to drive
+        :param str filename: Profile file
+        :param float time_offset: Simulation time corresponding to a profile time of zero
+        :return Profile reading the file
+        :rtype ArrayProfile
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for array profiles")
+
+        if not Path(filename).exists():
+            raise FileNotFoundError(f"Profile file not found: {filename}")
+
+        samples = np.load(filename, mmap_mode = "r")
+        if (samples.ndim != 2) or (samples.shape[1] != 2):
+            raise ValueError(f"Profile array must have shape (N, 2), not {samples.shape}")
+
+        return ArrayProfile(
+            scada_name = scada_name,
+            times = samples[:, 0],
+            values = samples[:, 1],
+            time_offset = time_offset)
+
+    def update(
+            self,
+            sim_time: float) -> Any:
+        index = int(np.searchsorted(self._times, sim_time - self._time_offset, side = "right"))
+        if index <= self._index:
+            return None
+
+        self._index = index
+        return float(self._values[index - 1])
+
+    def get_next_time(self) -> float:
+        if self._index >= len(self._times):
+            return None
+
+        return float(self._times[self._index]) + self._time_offset
+
+    def reset(self):
+        self._index = 0
+
+
+class CsvProfile(ScadaProfile):
+    """ SCADA input profile streamed from a CSV file
+
+    Rows are read one at a time as the simulation advances, so memory use does not depend on the file length.
+    A header row is skipped if present.
+    """
+
+    def __init__(
+            self,
+            scada_name: str,
+            filename: str,
+            time_offset: float = 0.0):
+        super().__init__(scada_name, time_offset)
+
+        if not Path(filename).exists():
+            raise FileNotFoundError(f"Profile file not found: {filename}")
+
+        self._filename = filename
+        self._file = None
+        self._reader = None
+        self._next_sample: tuple[float, float] = None   # Next (time, value) sample to be played back
+
+        self.reset()
+
+    def update(
+            self,
+            sim_time: float) -> Any:
+        profile_time = sim_time - self._time_offset
+
+        value = None
+        while (self._next_sample is not None) and (self._next_sample[0] <= profile_time):
+            value = self._next_sample[1]
+            self._next_sample = self._read_sample()
+
+        return value
+
+    def get_next_time(self) -> float:
+        if self._next_sample is None:
+            return None
+
+        return self._next_sample[0] + self._time_offset
+
+    def reset(self):
+        self.close()
+
+        self._file = open(self._filename, newline = "")
+        self._reader = csv.reader(self._file)
+        self._next_sample = self._read_sample(skip_header = True)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_sample(
+            self,
+            skip_header: bool = False) -> tuple[float, float]:
+        """ Read the next (time, value) sample from the file
+
+        :param bool skip_header: True if an unparseable first row should be skipped
+        :return Next sample, None at the end of the file
+        :rtype tuple[float, float]
+        """
+        for row in self._reader:
+            if len(row) < 2:
+                continue
+
+            try:
+                return (float(row[0]), float(row[1]))
+            except ValueError:
+                if not skip_header:
+                    raise
+                skip_header = False
+
+        return None
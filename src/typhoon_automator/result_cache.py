@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import shutil
+
+from pathlib import Path
+
+from .convert import get_sidecar_filename
+
+
+class ResultCache(object):
+    """ Scenario result cache
+
+    Remembers the output files of successful scenario runs, keyed by the compiled model hash, the scenario ID and
+    the scenario seed.  Output files are not copied into the cache, a cached result is only valid while the output
+    files it refers to still exist.  An output counts as existing if either its CSV file or its converted file
+    (with the converted file's sidecar) exists, so results stay valid when CSV files are deleted after conversion.
+    """
+
+    SUFFIX: str = ".json"
+
+    def __init__(
+            self,
+            directory: str):
+        """ Create a result cache
+
+        :param str directory: Cache directory, created if it does not exist
+        """
+        if not directory:
+            raise ValueError("Result cache directory cannot be empty")
+
+        self._directory = Path(directory)
+        self._directory.mkdir(parents = True, exist_ok = True)
+
+    def get_key(
+            model_hash: str,
+            scenario_id: str,
+            seed: int = None) -> str:
+        """ Get the cache key of a scenario result
+
+        :param str model_hash: Hash of the compiled model
+        :param str scenario_id: Stable ID of the scenario parameters
+        :param int seed: Random seed of the scenario, None if the scenario is not random
+        :return Cache key
+        :rtype str
+        """
+        return hashlib.sha256(f"{model_hash}\0{scenario_id}\0{seed!r}".encode("utf-8")).hexdigest()
+
+    def lookup(
+            self,
+            key: str) -> dict:
+        """ Look up the outputs of a cached result
+
+        :param str key: Cache key
+        :return Dictionary of the lists of existing output files (CSV, converted and sidecar) by output type, None
+        if there is no valid cached result
+        :rtype dict
+        """
+        try:
+            with open(self._get_path(key), encoding = "utf-8") as record_file:
+                record = json.load(record_file)
+            outputs = record["outputs"]
+            converted = record.get("converted", {})
+        except (OSError, ValueError, KeyError, AttributeError):
+            return None
+
+        # Result is invalid once any of its outputs is gone in both forms
+        files = {}
+        for output_type in set(outputs.keys()) | set(converted.keys()):
+            existing = []
+
+            filename = outputs.get(output_type)
+            if filename and Path(filename).exists():
+                existing.append(filename)
+
+            filename = converted.get(output_type)
+            if filename:
+                sidecar_filename = get_sidecar_filename(filename)
+                if Path(filename).exists() and Path(sidecar_filename).exists():
+                    existing.extend([filename, sidecar_filename])
+
+            if not existing:
+                return None
+            files[output_type] = existing
+
+        return files
+
+    def store(
+            self,
+            key: str,
+            outputs: dict,
+            converted: dict = None):
+        """ Store the outputs of a successful scenario run
+
+        CSV output files which do not exist are not stored.  Converted files are stored before they are written,
+        since conversion runs in the background.
+
+        :param str key: Cache key
+        :param dict outputs: Dictionary of output filenames by output type
+        :param dict converted: Dictionary of converted output filenames by output type, None if outputs are not
+        converted
+        """
+        record = {
+            "outputs": {
+                output_type: str(Path(filename).resolve())
+                for output_type, filename in outputs.items() if filename and Path(filename).exists()}}
+
+        if converted:
+            record["converted"] = {
+                output_type: str(Path(filename).resolve())
+                for output_type, filename in converted.items() if output_type in record["outputs"]}
+
+        path = self._get_path(key)
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding = "utf-8") as record_file:
+            json.dump(record, record_file)
+
+        os.replace(temp_path, path)
+
+    def invalidate(
+            self,
+            key: str = None):
+        """ Remove a cached result
+
+        :param str key: Cache key, None to remove all cached results
+        """
+        if key is not None:
+            self._get_path(key).unlink(missing_ok = True)
+            return
+
+        for path in self._directory.glob(f"*{ResultCache.SUFFIX}"):
+            path.unlink(missing_ok = True)
+
+    def link_outputs(
+            cached_outputs: dict,
+            outputs: dict) -> dict:
+        """ Link cached output files to new output filenames
+
+        Each cached file is linked to the new output filename of its type, with the cached file's suffix.  Files
+        are hard linked where possible, otherwise symbolically linked or copied.
+
+        :param dict cached_outputs: Dictionary of lists of cached output files by output type, from lookup
+        :param dict outputs: Dictionary of new output filenames by output type
+        :return Dictionary of the lists of new output files which were linked by output type
+        :rtype dict
+        """
+        linked = {}
+        for output_type, sources in cached_outputs.items():
+            filename = outputs.get(output_type)
+            if not filename:
+                continue
+
+            for source in sources:
+                destination_path = Path(filename).with_suffix(Path(source).suffix)
+                destination = str(destination_path)
+                linked.setdefault(output_type, []).append(destination)
+
+                destination_path.parent.mkdir(parents = True, exist_ok = True)
+                if destination_path.exists() and os.path.samefile(source, destination):
+                    continue
+
+                destination_path.unlink(missing_ok = True)
+                try:
+                    os.link(source, destination)
+                except OSError:
+                    try:
+                        os.symlink(source, destination)
+                    except OSError:
+                        shutil.copyfile(source, destination)
+
+        return linked
+
+    def _get_path(
+            self,
+            key: str) -> Path:
+        """ Get the path of the record file for a key """
+        return self._directory / f"{key}{ResultCache.SUFFIX}"
@@ -0,0 +1,521 @@
+import json
+import math
+import mmap
+
+from pathlib import Path
+from typing import Any
+from typing import Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from .convert import FORMAT_NPZ
+from .convert import FORMAT_PARQUET
+from .convert import get_npz_entry_name
+from .convert import get_sidecar_filename
+from .convert import parse_header
+
+
+class ResultsReader(object):
+    """ Scenario output reader
+
+    Reads a data logging or capture output one chunk at a time, limited to selected signals and a simulation time
+    window, so that outputs larger than memory can be processed.  Chunks are (time, channels) tuples of a time array
+    and a dictionary of sample arrays by signal name.
+
+    Use ResultsReader.open to create the reader matching the format of an output file.
+    """
+
+    def __init__(
+            self,
+            filename: str):
+        """ Create an output reader
+
+        :param str filename: Output file
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required to read results")
+
+        if not filename:
+            raise ValueError("Results filename cannot be empty")
+
+        if not Path(filename).exists():
+            raise FileNotFoundError(f"Results file not found: {filename}")
+
+        self._filename = str(filename)
+        self._time_name: str = None
+        self._signals: list[str] = []
+        self._units: dict[str, str] = {}
+
+    def open(
+            filename: str,
+            prefer_converted: bool = True):
+        """ Open an output file
+
+        CSV files are read directly unless a converted file with a sidecar exists next to them and prefer_converted
+        is set.  A converted file is also used when the CSV file was deleted after conversion.
+
+        :param str filename: Output file (CSV, NPZ or Parquet)
+        :param bool prefer_converted: True to read the converted file of a CSV file when there is one
+        :return Output reader
+        :rtype ResultsReader
+        """
+        path = Path(filename)
+        if path.suffix.lower() == ".csv":
+            converted = ResultsReader._find_converted(path)
+            if (converted is not None) and (prefer_converted or not path.exists()):
+                path = converted
+            else:
+                return CsvResultsReader(str(path))
+
+        suffix = path.suffix.lower()
+        if suffix == f".{FORMAT_NPZ}":
+            return NpzResultsReader(str(path))
+        elif suffix == f".{FORMAT_PARQUET}":
+            return ParquetResultsReader(str(path))
+
+        raise ValueError(f"Unsupported results file format ({filename})")
+
+    def _find_converted(path: Path) -> Path:
+        """ Find the converted file of a CSV file from its sidecar
+
+        :param Path path: CSV file
+        :return Converted file, None if the CSV file has not been converted
+        :rtype Path
+        """
+        sidecar_path = Path(get_sidecar_filename(str(path)))
+        if not sidecar_path.exists():
+            return None
+
+        try:
+            with open(sidecar_path, encoding = "utf-8") as sidecar_file:
+                sidecar = json.load(sidecar_file)
+            converted = sidecar_path.with_name(sidecar["file"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        return converted if converted.exists() else None
+
+    def get_filename(self) -> str:
+        """ Get the output filename
+
+        :rtype str
+        """
+        return self._filename
+
+    def get_signal_names(self) -> list[str]:
+        """ Get the names of the signals in the output, excluding the time column
+
+        :rtype list[str]
+        """
+        return list(self._signals)
+
+    def get_units(self) -> dict[str, str]:
+        """ Get the units of the signals which have one
+
+        :return Dictionary of units by signal name
+        :rtype dict
+        """
+        return self._units.copy()
+
+    def get_time_range(self) -> tuple[float, float]:
+        """ Get the simulation time range of the output
+
+        :return (first, last) sample time, None if the output is empty
+        :rtype tuple[float, float]
+        """
+        raise NotImplementedError()
+
+    def iter_chunks(
+            self,
+            signals: list[str] = None,
+            start_time: float = None,
+            stop_time: float = None,
+            chunk_rows: int = 65536) -> Iterator[tuple[Any, dict[str, Any]]]:
+        """ Iterate over the output in chunks
+
+        :param list[str] signals: Signals to read, None for all signals
+        :param float start_time: First simulation time to read, None to read from the start
+        :param float stop_time: Last simulation time to read, None to read to the end
+        :param int chunk_rows: Maximum number of rows per chunk, converted files are read in the chunks they were
+        written in
+        :return Iterator of (time, channels) tuples
+        """
+        raise NotImplementedError()
+
+    def read(
+            self,
+            signals: list[str] = None,
+            start_time: float = None,
+            stop_time: float = None) -> tuple[Any, dict[str, Any]]:
+        """ Read selected signals over a simulation time window
+
+        :param list[str] signals: Signals to read, None for all signals
+        :param float start_time: First simulation time to read, None to read from the start
+        :param float stop_time: Last simulation time to read, None to read to the end
+        :return (time, channels) tuple of a time array and a dictionary of sample arrays by signal name
+        :rtype tuple
+        """
+        signals = self._select_signals(signals)
+
+        times = []
+        columns = {name: [] for name in signals}
+        for time, channels in self.iter_chunks(signals, start_time, stop_time):
+            times.append(time)
+            for name in signals:
+                columns[name].append(channels[name])
+
+        if not times:
+            return (np.empty(0), {name: np.empty(0) for name in signals})
+
+        return (np.concatenate(times), {name: np.concatenate(chunks) for name, chunks in columns.items()})
+
+    def close(self):
+        """ Close the output file """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _set_columns(
+            self,
+            time_name: str,
+            signals: list[str],
+            units: dict[str, str]):
+        """ Set the time column name, signal names and units of the output """
+        self._time_name = time_name
+        self._signals = list(signals)
+        self._units = dict(units)
+
+    def _select_signals(
+            self,
+            signals: list[str]) -> list[str]:
+        """ Check a signal selection
+
+        :param list[str] signals: Signals to read, None for all signals
+        :return Selected signals
+        :rtype list[str]
+        :raises ValueError: A signal is not in the output
+        """
+        if signals is None:
+            return list(self._signals)
+
+        for name in signals:
+            if name not in self._signals:
+                raise ValueError(f"Signal {name} is not in {self._filename}")
+
+        return list(signals)
+
+    def _get_window(
+            start_time: float,
+            stop_time: float) -> tuple[float, float]:
+        """ Get a simulation time window with open ends replaced by infinities """
+        start_time = -math.inf if start_time is None else float(start_time)
+        stop_time = math.inf if stop_time is None else float(stop_time)
+        if stop_time < start_time:
+            raise ValueError(f"Invalid time window ({start_time}, {stop_time})")
+
+        return (start_time, stop_time)
+
+    def _trim_chunk(
+            time: Any,
+            columns: dict[str, Any],
+            start_time: float,
+            stop_time: float) -> tuple[Any, dict[str, Any]]:
+        """ Trim a chunk to a simulation time window """
+        mask = (time >= start_time) & (time <= stop_time)
+        if mask.all():
+            return (time, columns)
+
+        return (time[mask], {name: samples[mask] for name, samples in columns.items()})
+
+
+class CsvResultsReader(ResultsReader):
+    """ CSV output reader
+
+    The file is memory mapped.  As the time column increases monotonically, the start of a time window is found by
+    a binary search over line starts, so only the rows of the window are read and parsed.
+    """
+
+    def __init__(
+            self,
+            filename: str):
+        super().__init__(filename)
+
+        self._file = open(self._filename, "rb")
+        self._map: mmap.mmap = None
+        self._data_start = 0
+        self._size = 0
+
+        header = self._file.readline().decode("utf-8").strip()
+        self._data_start = self._file.tell()
+        self._size = Path(self._filename).stat().st_size
+
+        names, units = parse_header(header)
+        if not names or not names[0]:
+            self._file.close()
+            raise ValueError(f"Results file has no header ({filename})")
+
+        self._set_columns(names[0], names[1:], units)
+
+        # Empty files cannot be mapped
+        if self._size > self._data_start:
+            self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+
+    def get_time_range(self) -> tuple[float, float]:
+        if self._map is None:
+            return None
+
+        first = self._get_time(self._data_start)
+        if math.isinf(first):
+            return None
+
+        # Find the start of the last non-empty line
+        end = self._size
+        while (end > self._data_start) and (self._map[end - 1:end] in (b"\n", b"\r")):
+            end -= 1
+
+        last_start = self._map.rfind(b"\n", self._data_start, end) + 1
+        last_start = max(last_start, self._data_start)
+        return (first, self._get_time(last_start))
+
+    def iter_chunks(
+            self,
+            signals: list[str] = None,
+            start_time: float = None,
+            stop_time: float = None,
+            chunk_rows: int = 65536) -> Iterator[tuple[Any, dict[str, Any]]]:
+        if chunk_rows < 1:
+            raise ValueError(f"Invalid chunk size ({chunk_rows})")
+
+        signals = self._select_signals(signals)
+        start_time, stop_time = ResultsReader._get_window(start_time, stop_time)
+        if self._map is None:
+            return
+
+        columns = [0] + [self._signals.index(name) + 1 for name in signals]
+
+        offset = self._data_start
+        if start_time > -math.inf:
+            offset = self._find_time(start_time)
+
+        while offset < self._size:
+            end = self._find_line_offset(offset, chunk_rows)
+            lines = self._map[offset:end].decode("utf-8").splitlines()
+            offset = end
+
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                continue
+
+            data = np.loadtxt(lines, delimiter = ",", dtype = np.float64, usecols = columns, ndmin = 2)
+            time = data[:, 0]
+            chunk = ResultsReader._trim_chunk(
+                time,
+                {name: data[:, index + 1] for index, name in enumerate(signals)},
+                start_time,
+                stop_time)
+
+            if len(chunk[0]):
+                yield chunk
+
+            if time[-1] > stop_time:
+                return
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        self._file.close()
+
+    def _find_time(
+            self,
+            sim_time: float) -> int:
+        """ Find the offset of the first line at or after a simulation time
+
+        :param float sim_time: Simulation time
+        :return Offset of the line, the file size if all lines are before the time
+        :rtype int
+        """
+        # Lines before low are before the time, lines from high onwards are not
+        low = self._data_start
+        high = self._size
+        while low < high:
+            start = self._get_line_start((low + high) // 2)
+            if start >= high:
+                start = low
+
+            if self._get_time(start) < sim_time:
+                low = self._get_line_start(start + 1)
+            else:
+                high = start
+
+        return low
+
+    def _get_line_start(
+            self,
+            offset: int) -> int:
+        """ Get the offset of the first line starting at or after an offset """
+        if (offset <= self._data_start) or (self._map[offset - 1:offset] == b"\n"):
+            return max(offset, self._data_start)
+
+        newline = self._map.find(b"\n", offset)
+        return self._size if newline < 0 else newline + 1
+
+    def _find_line_offset(
+            self,
+            offset: int,
+            lines: int) -> int:
+        """ Get the offset after a number of lines """
+        for _ in range(lines):
+            newline = self._map.find(b"\n", offset)
+            if newline < 0:
+                return self._size
+            offset = newline + 1
+
+        return offset
+
+    def _get_time(
+            self,
+            offset: int) -> float:
+        """ Parse the time of the line at an offset, infinity for a blank line """
+        line_end = self._map.find(b"\n", offset)
+        line_end = self._size if line_end < 0 else line_end
+
+        end = self._map.find(b",", offset, line_end)
+        end = line_end if end < 0 else end
+
+        field = self._map[offset:end].strip()
+        return float(field) if field else math.inf
+
+
+class NpzResultsReader(ResultsReader):
+    """ NPZ output reader
+
+    Reads converted NPZ archives, which store each column chunk as a separate entry.  The chunk time ranges in the
+    sidecar select the chunks of a time window, and only the entries of the selected signals are decompressed.
+    """
+
+    def __init__(
+            self,
+            filename: str):
+        super().__init__(filename)
+
+        self._sidecar = _read_sidecar(self._filename)
+        self._set_columns(self._sidecar["time"], self._sidecar["signals"], self._sidecar.get("units", {}))
+        self._archive = np.load(self._filename)
+
+    def get_time_range(self) -> tuple[float, float]:
+        time_range = self._sidecar.get("time_range")
+        return tuple(time_range) if time_range else None
+
+    def iter_chunks(
+            self,
+            signals: list[str] = None,
+            start_time: float = None,
+            stop_time: float = None,
+            chunk_rows: int = 65536) -> Iterator[tuple[Any, dict[str, Any]]]:
+        signals = self._select_signals(signals)
+        start_time, stop_time = ResultsReader._get_window(start_time, stop_time)
+
+        for chunk in _get_chunks(self._sidecar, start_time, stop_time):
+            time = self._archive[get_npz_entry_name(0, chunk)]
+            columns = {
+                name: self._archive[get_npz_entry_name(self._signals.index(name) + 1, chunk)] for name in signals}
+
+            time, columns = ResultsReader._trim_chunk(time, columns, start_time, stop_time)
+            if len(time):
+                yield (time, columns)
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+
+class ParquetResultsReader(ResultsReader):
+    """ Parquet output reader
+
+    Reads converted Parquet files, which store each chunk as a row group.  The chunk time ranges in the sidecar
+    select the row groups of a time window, and only the columns of the selected signals are read.
+    """
+
+    def __init__(
+            self,
+            filename: str):
+        if pyarrow is None:
+            raise RuntimeError("pyarrow is required to read Parquet results")
+
+        super().__init__(filename)
+
+        self._sidecar = _read_sidecar(self._filename)
+        self._set_columns(self._sidecar["time"], self._sidecar["signals"], self._sidecar.get("units", {}))
+        self._parquet = pyarrow.parquet.ParquetFile(self._filename, memory_map = True)
+
+    def get_time_range(self) -> tuple[float, float]:
+        time_range = self._sidecar.get("time_range")
+        return tuple(time_range) if time_range else None
+
+    def iter_chunks(
+            self,
+            signals: list[str] = None,
+            start_time: float = None,
+            stop_time: float = None,
+            chunk_rows: int = 65536) -> Iterator[tuple[Any, dict[str, Any]]]:
+        signals = self._select_signals(signals)
+        start_time, stop_time = ResultsReader._get_window(start_time, stop_time)
+
+        for chunk in _get_chunks(self._sidecar, start_time, stop_time):
+            table = self._parquet.read_row_group(chunk, columns = [self._time_name] + signals)
+            time = table.column(self._time_name).to_numpy()
+            columns = {name: table.column(name).to_numpy() for name in signals}
+
+            time, columns = ResultsReader._trim_chunk(time, columns, start_time, stop_time)
+            if len(time):
+                yield (time, columns)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+
+def _read_sidecar(filename: str) -> dict:
+    """ Read the sidecar of a converted file
+
+    :param str filename: Converted file
+    :return Sidecar dictionary
+    :rtype dict
+    :raises FileNotFoundError: The converted file has no sidecar
+    """
+    sidecar_filename = get_sidecar_filename(filename)
+    if not Path(sidecar_filename).exists():
+        raise FileNotFoundError(f"Results sidecar not found: {sidecar_filename}")
+
+    with open(sidecar_filename, encoding = "utf-8") as sidecar_file:
+        return json.load(sidecar_file)
+
+
+def _get_chunks(
+        sidecar: dict,
+        start_time: float,
+        stop_time: float) -> Iterator[int]:
+    """ Get the indices of the chunks of a converted file which overlap a time window """
+    for index, chunk in enumerate(sidecar.get("chunks", [])):
+        first, last = chunk["time_range"]
+        if (last >= start_time) and (first <= stop_time):
+            yield index
+        elif first > stop_time:
+            return
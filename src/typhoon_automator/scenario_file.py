@@ -0,0 +1,404 @@
+import hashlib
+import json
+import os
+
+from pathlib import Path
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+
+from .events import ScadaWriteEvent
+from .kpi import KpiDefinition
+from .playback import ScadaProfile
+
+
+class DeclarativeScenario(object):
+    """ Declarative simulation scenario
+
+    A scenario described entirely by data: the scenario duration, data logging signals, an optional capture
+    window, timed SCADA input writes, SCADA input waveform files and KPIs.  Declarative scenarios can be read from
+    and written to scenario files.
+    """
+
+    def __init__(
+            self,
+            duration: float,
+            data_logging_signals: list[str] = None,
+            capture: dict = None,
+            scada_writes: Iterable[tuple[float, str, Any]] = None,
+            waveforms: Iterable[tuple[str, str, float]] = None,
+            warm_up: tuple[str, float] = None,
+            kpis: Iterable[Any] = None):
+        """ Create a declarative scenario
+
+        :param float duration: Scenario duration (in seconds)
+        :param list[str] data_logging_signals: Signals to log with the data logger
+        :param dict capture: Capture window with 'start_time', 'duration' and optionally 'decimation',
+        'analog_signals' and 'digital_signals' keys, None for no capture
+        :param scada_writes: Iterable of (sim_time, SCADA input name, value) tuples, writes at or before time zero
+        are made before the simulation starts
+        :param waveforms: Iterable of (SCADA input name, filename, time offset) tuples of profiles to play back
+        :param tuple warm_up: (prefix ID, duration) of a warm-up period shared with other scenarios, None for no
+        warm-up
+        :param kpis: Iterable of KpiDefinition objects or KPI definition dictionaries to compute from the outputs
+        """
+        if duration <= 0.0:
+            raise ValueError(f"Invalid scenario duration ({duration})")
+
+        self._duration = float(duration)
+        self._data_logging_signals: list[str] = list(data_logging_signals or [])
+
+        self._capture: dict = None
+        if capture is not None:
+            self._capture = {
+                "start_time": float(capture["start_time"]),
+                "duration": float(capture["duration"]),
+                "decimation": int(capture.get("decimation", 1)),
+                "analog_signals": list(capture.get("analog_signals", [])),
+                "digital_signals": list(capture.get("digital_signals", []))}
+
+        self._scada_writes: list[tuple[float, str, Any]] = sorted(
+            ((float(sim_time), name, value) for sim_time, name, value in (scada_writes or [])),
+            key = lambda write: write[0])
+
+        self._waveforms: list[tuple[str, str, float]] = [
+            (scada_name, str(filename), float(time_offset)) for scada_name, filename, time_offset in (waveforms or [])]
+
+        self._warm_up: tuple[str, float] = None
+        if warm_up is not None:
+            prefix_id, warm_up_duration = warm_up
+            if float(warm_up_duration) >= self._duration:
+                raise ValueError(f"Warm-up duration ({warm_up_duration}) must be shorter than the scenario duration")
+            self._warm_up = (str(prefix_id), float(warm_up_duration))
+
+        self._kpis: list[KpiDefinition] = [
+            kpi if isinstance(kpi, KpiDefinition) else KpiDefinition.from_dict(kpi) for kpi in (kpis or [])]
+
+    def get_duration(self) -> float:
+        """ Get the scenario duration
+
+        :return Scenario duration (in seconds)
+        :rtype float
+        """
+        return self._duration
+
+    def get_warm_up(self) -> tuple[str, float]:
+        """ Get the warm-up period of the scenario
+
+        :return (prefix ID, duration) tuple, None if the scenario has no warm-up
+        :rtype tuple[str, float]
+        """
+        return self._warm_up
+
+    def get_kpis(self) -> list[KpiDefinition]:
+        """ Get the KPIs of the scenario
+
+        :rtype list[KpiDefinition]
+        """
+        return list(self._kpis)
+
+    def get_event_times(self) -> dict[str, float]:
+        """ Get the event times KPI windows can refer to
+
+        Events are named after the SCADA input of each timed write, at the time of the first write after the
+        scenario start, and 'capture' at the capture start time
+
+        :return Dictionary of event simulation times by event name
+        :rtype dict
+        """
+        event_times = {}
+        for sim_time, scada_name, _ in self._scada_writes:
+            if sim_time > 0.0:
+                event_times.setdefault(scada_name, sim_time)
+
+        if self._capture is not None:
+            event_times["capture"] = self._capture["start_time"]
+
+        return event_times
+
+    def get_scenario_id(self) -> str:
+        """ Get the stable ID of the scenario
+
+        The ID is derived from the scenario definition, except its KPIs which do not change the simulation, and the
+        size and modification time of its waveform files
+
+        :return Hex digest of the scenario
+        :rtype str
+        """
+        waveform_files = []
+        for _, filename, _ in self._waveforms:
+            stat = Path(filename).stat()
+            waveform_files.append([stat.st_size, stat.st_mtime_ns])
+
+        definition = self.to_dict()
+        definition.pop("kpis", None)
+
+        encoded = json.dumps([definition, waveform_files], sort_keys = True)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get_setup_key(self) -> tuple:
+        """ Get the setup of the scenario for planning the scenario order
+
+        :return (data logging signals, capture channels, warm-up prefix ID, initial SCADA values) tuple
+        :rtype tuple
+        """
+        capture = None
+        if self._capture is not None:
+            capture = (
+                tuple(self._capture["analog_signals"]),
+                tuple(self._capture["digital_signals"]),
+                self._capture["decimation"])
+
+        warm_up_id = None
+        if self._warm_up is not None:
+            warm_up_id = self._warm_up[0]
+
+        initial_values = tuple((name, value) for sim_time, name, value in self._scada_writes if sim_time <= 0.0)
+
+        return (tuple(self._data_logging_signals), capture, warm_up_id, initial_values)
+
+    def set_up_scenario(
+            self,
+            simulation):
+        """ Set up the scenario
+
+        :param Simulation simulation: Simulation to set up
+        """
+        simulation.set_data_logging_signals(self._data_logging_signals)
+
+        if self._capture is not None:
+            simulation.set_capture_signals(
+                analog_signals = self._capture["analog_signals"],
+                digital_signals = self._capture["digital_signals"])
+
+            simulation.schedule_capture(
+                start_time = self._capture["start_time"],
+                duration = self._capture["duration"],
+                decimation = self._capture["decimation"])
+
+        for scada_name, filename, time_offset in self._waveforms:
+            simulation.add_scada_profile(ScadaProfile.from_file(
+                scada_name = scada_name,
+                filename = filename,
+                time_offset = time_offset))
+
+        simulation.set_scenario_duration(self._duration)
+
+        # Make initial writes now, schedule the rest
+        for sim_time, scada_name, value in self._scada_writes:
+            if sim_time <= 0.0:
+                simulation.set_scada_value(name = scada_name, value = value)
+            else:
+                simulation.schedule_event(sim_time, ScadaWriteEvent(scada_name, value))
+
+    def tear_down_scenario(
+            self,
+            simulation):
+        """ Tear down the scenario
+
+        :param Simulation simulation: Simulation to tear down
+        """
+        pass
+
+    def to_dict(
+            self,
+            base_path: str = None) -> dict:
+        """ Convert the scenario to a dictionary of JSON types
+
+        :param str base_path: Directory waveform filenames are written relative to, None to write them unchanged
+        :return Scenario dictionary
+        :rtype dict
+        """
+        data = {
+            "duration": self._duration,
+            "data_logging_signals": list(self._data_logging_signals)}
+
+        if self._capture is not None:
+            data["capture"] = dict(self._capture)
+
+        if self._scada_writes:
+            data["scada_writes"] = [
+                {"time": sim_time, "name": name, "value": value} for sim_time, name, value in self._scada_writes]
+
+        if self._waveforms:
+            data["waveforms"] = [
+                {"name": scada_name, "file": DeclarativeScenario._relative_filename(filename, base_path), "time_offset": time_offset}
+                for scada_name, filename, time_offset in self._waveforms]
+
+        if self._warm_up is not None:
+            data["warm_up"] = {"prefix_id": self._warm_up[0], "duration": self._warm_up[1]}
+
+        if self._kpis:
+            data["kpis"] = [kpi.to_dict() for kpi in self._kpis]
+
+        return data
+
+    def from_dict(
+            data: dict,
+            base_path: str = None):
+        """ Create a scenario from a dictionary
+
+        :param dict data: Scenario dictionary, as returned by to_dict
+        :param str base_path: Directory relative waveform filenames are resolved against, None to leave them unchanged
+        :return Scenario
+        :rtype DeclarativeScenario
+        :raises ValueError: The dictionary does not describe a valid scenario
+        """
+        try:
+            waveforms = []
+            for waveform in data.get("waveforms", []):
+                filename = waveform["file"]
+                if base_path is not None:
+                    filename = str(Path(base_path) / filename)
+                waveforms.append((waveform["name"], filename, waveform.get("time_offset", 0.0)))
+
+            warm_up = data.get("warm_up")
+            if warm_up is not None:
+                warm_up = (warm_up["prefix_id"], warm_up["duration"])
+
+            return DeclarativeScenario(
+                duration = data["duration"],
+                data_logging_signals = data.get("data_logging_signals"),
+                capture = data.get("capture"),
+                scada_writes = [(write["time"], write["name"], write["value"]) for write in data.get("scada_writes", [])],
+                waveforms = waveforms,
+                warm_up = warm_up,
+                kpis = data.get("kpis"))
+
+        except (KeyError, TypeError) as ex:
+            raise ValueError(f"Invalid scenario definition ({ex!r})") from ex
+
+    def _relative_filename(
+            filename: str,
+            base_path: str) -> str:
+        """ Make a filename relative to a directory where possible """
+        if base_path is None:
+            return filename
+
+        try:
+            return os.path.relpath(filename, base_path)
+        except ValueError:
+            # Different drives on Windows
+            return os.path.abspath(filename)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DeclarativeScenario):
+            return NotImplemented
+
+        return self.to_dict() == other.to_dict()
+
+
+class ScenarioFile(object):
+    """ Scenario file
+
+    Scenario files are JSON Lines files with one scenario object per line.  Each object has a 'name' key and the
+    keys of DeclarativeScenario.to_dict.  Blank lines and lines starting with '#' are ignored.
+
+    Iterating over a scenario file reads it one line at a time, so large campaign files are never held in memory.
+    """
+
+    def __init__(
+            self,
+            filename: str):
+        """ Open a scenario file
+
+        :param str filename: Scenario file
+        """
+        if not filename:
+            raise ValueError("Scenario filename cannot be empty")
+
+        if not Path(filename).exists():
+            raise FileNotFoundError(f"Scenario file not found: {filename}")
+
+        self._filename = filename
+
+    def get_filename(self) -> str:
+        """ Get the scenario filename
+
+        :rtype str
+        """
+        return self._filename
+
+    def __iter__(self) -> Iterator[tuple[str, DeclarativeScenario]]:
+        """ Read the scenarios in the file
+
+        :return Iterator of (name, scenario) tuples
+        :raises ValueError: A line does not contain a valid scenario
+        """
+        base_path = str(Path(self._filename).parent)
+
+        with open(self._filename, encoding = "utf-8") as scenario_file:
+            for line_number, line in enumerate(scenario_file, start = 1):
+                stripped = line.strip()
+                if (not stripped) or stripped.startswith("#"):
+                    continue
+
+                try:
+                    data = json.loads(stripped)
+                    if not isinstance(data, dict):
+                        raise ValueError("Scenario is not a JSON object")
+
+                    name = data.pop("name")
+                    if not name:
+                        raise ValueError("Scenario name cannot be empty")
+
+                    scenario = DeclarativeScenario.from_dict(data, base_path)
+
+                except (KeyError, ValueError) as ex:
+                    raise ValueError(f"{self._filename}, line {line_number}: {ex}") from ex
+
+                yield (name, scenario)
+
+    def write(
+            filename: str,
+            scenarios: Iterable[tuple[str, Any]]) -> int:
+        """ Write scenarios to a scenario file
+
+        The scenarios are written to a temporary file which replaces the scenario file once complete, so a file can
+        be rewritten from its own contents.  Scenarios must have a to_dict method.
+
+        :param str filename: Scenario file
+        :param scenarios: Iterable of (name, scenario) tuples
+        :return Number of scenarios written
+        :rtype int
+        :raises ValueError: A scenario cannot be written
+        """
+        if not filename:
+            raise ValueError("Scenario filename cannot be empty")
+
+        path = Path(filename)
+        path.parent.mkdir(parents = True, exist_ok = True)
+        base_path = str(path.parent)
+
+        temp_path = path.with_name(f".{path.name}.tmp")
+        count = 0
+        try:
+            with open(temp_path, "w", encoding = "utf-8") as scenario_file:
+                for name, scenario in scenarios:
+                    if not hasattr(scenario, "to_dict"):
+                        raise ValueError(f"Scenario {name} cannot be written, it does not have a to_dict method")
+
+                    # Only declarative scenarios take the base path of relative filenames
+                    try:
+                        definition = scenario.to_dict(base_path)
+                    except TypeError:
+                        try:
+                            definition = scenario.to_dict()
+                        except TypeError as ex:
+                            raise ValueError(f"Scenario {name} cannot be written ({ex})") from ex
+
+                    if not isinstance(definition, dict):
+                        raise ValueError(f"Scenario {name} cannot be written, to_dict did not return a dictionary")
+
+                    data = {"name": name}
+                    data.update(definition)
+                    scenario_file.write(json.dumps(data))
+                    scenario_file.write("\n")
+                    count += 1
+
+            os.replace(temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok = True)
+            raise
+
+        return count
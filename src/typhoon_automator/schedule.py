@@ -1,87 +1,361 @@
+import heapq
+import itertools
+
 from typing import Any
+from typing import Iterable
+
+
+class EventHandle(object):
+  """ Handle to a scheduled event
+
+  Returned when an event is added to an EventSchedule and used to cancel the event before it is invoked
+  """
+
+  __slots__ = ("_schedule", "_entry")
+
+  def __init__(
+      self,
+      schedule,
+      entry: list):
+    self._schedule: EventSchedule = schedule
+    self._entry = entry                   # [time, sequence, event(, recurrence)] heap entry
+
+  def cancel(self) -> bool:
+    """ Cancel the event
+
+    The event is marked as cancelled and skipped when it reaches the front of the schedule
+
+    :return True if the event was cancelled, false if it was already invoked, cancelled or cleared
+    :rtype bool
+    """
+    return self._schedule._cancel_entry(self._entry)
+
+  def is_active(self) -> bool:
+    """ Check if the event is still waiting to be invoked
+
+    :return True if the event is scheduled, false if it was invoked, cancelled or cleared
+    :rtype bool
+    """
+    return self._entry[2] is not None
+
+  def get_time(self) -> float:
+    """ Get the simulation time the event is scheduled for
+
+    For recurring events this is the time of the next occurrence
+
+    :return Scheduled simulation time
+    :rtype float
+    """
+    return self._entry[0]
+
+
+class _Recurrence(object):
+  """ Recurrence state of a periodic event
+
+  Occurrence times are computed from the start time and occurrence index so that rounding errors do not
+  accumulate over long runs
+  """
+
+  __slots__ = ("start_time", "period", "index", "count", "end_time")
+
+  def __init__(
+      self,
+      start_time: float,
+      period: float,
+      count: int,
+      end_time: float):
+    self.start_time = start_time
+    self.period = period
+    self.index = 0                        # Index of the occurrence currently scheduled
+    self.count = count                    # Total number of occurrences, None for no limit
+    self.end_time = end_time              # Latest simulation time of an occurrence, None for no limit
+
+  def advance(self) -> float:
+    """ Advance to the next occurrence
+
+    :return Simulation time of the next occurrence, None if there are no more occurrences
+    :rtype float
+    """
+    index = self.index + 1
+    if (self.count is not None) and (index >= self.count):
+      return None
+
+    sim_time = self.start_time + (index * self.period)
+    if (self.end_time is not None) and (sim_time > self.end_time):
+      return None
+
+    self.index = index
+    return sim_time
+
 
 class EventSchedule(object):
   """ Simulation event schedule
-  
-  Maintains a list of simulation events ordered by their schedule time
+
+  Maintains a priority queue of simulation events ordered by their schedule time.  Events scheduled
+  for the same time are kept in the order they were added.
+
+  Cancelled events are left in the queue and skipped when they reach the front.  The queue is compacted
+  when cancelled events make up a large share of it.
   """
-  
+
+  _REMOVED = None                         # Event slot value of cancelled, invoked or cleared entries
+  COMPACT_MIN_DEAD: int = 1024            # Minimum number of cancelled entries before compacting
+
   def __init__(self):
-    self._event_list = []         # List of (time, event) tuples
-    
+    self._event_heap = []                 # Heap of [time, sequence, event(, recurrence)] entries
+    self._sequence = itertools.count()    # Insertion counter, keeps equal times in insertion order
+    self._live_count = 0                  # Number of entries waiting to be invoked
+    self._dead_count = 0                  # Number of cancelled entries still in the heap
+
   def add_event(
       self,
       sim_time: float,
-      event: Any):
+      event: Any) -> EventHandle:
     """ Add an event to the simulation schedule
-    
+
     Event objects must have an 'invoke' method and a 'message' attribute
-    
+
     :param float sim_time: Simulation time at which to invoke the event
     :param event: Event to be invoked
+    :return Handle which can be used to cancel the event
+    :rtype EventHandle
     """
-    if event is None:
-      raise ValueError("Event cannot be None")
-    
-    # Check event attributes
-    if not hasattr(event, "invoke"):
-      raise ValueError("Event does not have an invoke method")
-      
-    if not callable(event.invoke):
-      raise ValueError("Event invoke attribute is not callable")
-      
-    if not hasattr(event, "message"):
-      raise ValueError("Event does not have a log message")
-    
-    # Add (time, event) tuple to list and keep list sorted by time
-    self._event_list.append((sim_time, event))
-    self._event_list.sort(key = lambda e: e[0])
-    
+    EventSchedule._check_event(event)
+
+    # Push [time, sequence, event] entry onto the heap
+    entry = [sim_time, next(self._sequence), event]
+    heapq.heappush(self._event_heap, entry)
+    self._live_count += 1
+
+    return EventHandle(self, entry)
+
+  def add_recurring_event(
+      self,
+      start_time: float,
+      period: float,
+      event: Any,
+      count: int = None,
+      end_time: float = None) -> EventHandle:
+    """ Add a periodic event to the simulation schedule
+
+    The event occupies a single schedule entry which is re-armed for the next occurrence each time it is
+    popped.  Occurrences continue until the count or end time is reached, or the event is cancelled.
+
+    :param float start_time: Simulation time of the first occurrence
+    :param float period: Simulation time between occurrences
+    :param event: Event to be invoked at each occurrence
+    :param int count: Number of occurrences, None for no limit
+    :param float end_time: Latest simulation time of an occurrence, None for no limit
+    :return Handle which can be used to cancel all remaining occurrences
+    :rtype EventHandle
+    """
+    EventSchedule._check_event(event)
+
+    if period <= 0.0:
+      raise ValueError(f"Invalid event period ({period})")
+
+    if (count is not None) and (count < 1):
+      raise ValueError(f"Invalid event count ({count})")
+
+    if (end_time is not None) and (end_time < start_time):
+      raise ValueError(f"Invalid event end time ({end_time})")
+
+    # Push [time, sequence, event, recurrence] entry onto the heap
+    recurrence = _Recurrence(start_time, period, count, end_time)
+    entry = [start_time, next(self._sequence), event, recurrence]
+    heapq.heappush(self._event_heap, entry)
+    self._live_count += 1
+
+    return EventHandle(self, entry)
+
+  def add_events(
+      self,
+      events: Iterable[tuple[float, Any]]):
+    """ Add multiple events to the simulation schedule
+
+    The heap is rebuilt once after all events are added, which is faster than adding the events
+    individually when scheduling a large number of events.  No handles are created for these events.
+
+    :param events: Iterable of (sim_time, event) tuples
+    """
+    if events is None:
+      raise ValueError("Events cannot be None")
+
+    # Check all events before modifying the schedule
+    entries = []
+    for sim_time, event in events:
+      EventSchedule._check_event(event)
+      entries.append([sim_time, next(self._sequence), event])
+
+    self._event_heap.extend(entries)
+    heapq.heapify(self._event_heap)
+    self._live_count += len(entries)
+
   def clear_schedule(self):
     """ Clear the event schedule """
-    self._event_list = []
-    
+    # Mark entries as removed so outstanding handles can no longer cancel them
+    for entry in self._event_heap:
+      entry[2] = EventSchedule._REMOVED
+
+    self._event_heap = []
+    self._live_count = 0
+    self._dead_count = 0
+
   def get_event_count(self) -> int:
-    """ Get the number of scheduled events
-    
-    :return Number of scheduled events
+    """ Get the number of live events, the scheduled events waiting to be invoked
+
+    Cancelled events are not counted, even while they remain in the schedule (see get_dead_event_count)
+
+    :return Number of live events
+    :rtype int
+    """
+    return self._live_count
+
+  def get_dead_event_count(self) -> int:
+    """ Get the number of cancelled events which have not yet been removed from the schedule
+
+    :return Number of dead events
     :rtype int
     """
-    return len(self._event_list)
-  
+    return self._dead_count
+
   def has_next_event(self) -> bool:
     """ Check if there is a next event
-    
+
     :return True if there is a next event, false if schedule is empty
     :rtype bool
     """
-    return (len(self._event_list) > 0)
-  
+    self._discard_dead_head()
+    return (len(self._event_heap) > 0)
+
   def get_next_event_time(self) -> float:
     """ Get the time of the next scheduled event
-    
+
     :return Simulation time of next scheduled event
     :rtype float
     :raises IndexError: There is no next event
     """
     if not self.has_next_event():
       raise IndexError("Event list is empty")
-    
-    # Return time of first tuple in list
-    event = self._event_list[0]
-    return event[0]
-  
+
+    # Return time of entry at the top of the heap
+    return self._event_heap[0][0]
+
   def pop_next_event(self) -> Any:
     """ Get the next scheduled event
-    
+
     The event will be removed from the schedule
-    
+
     :return Next scheduled event
     :raises IndexError: There is no next event
     """
     if not self.has_next_event():
       raise IndexError("Event list is empty")
-    
-    # Pop first tuple from list and return event
-    event = self._event_list.pop(0)
-    return event[1]
+
+    # Pop entry from top of heap and return event
+    entry = heapq.heappop(self._event_heap)
+    return self._consume_entry(entry)
+
+  def pop_due(
+      self,
+      sim_time: float) -> list[tuple[float, Any]]:
+    """ Get all events scheduled at or before a simulation time
+
+    The events will be removed from the schedule and returned in the order they are to be invoked
+
+    :param float sim_time: Simulation time up to and including which events are due
+    :return List of (scheduled time, event) tuples, empty if no events are due
+    :rtype list[tuple[float, Any]]
+    """
+    due_events = []
+    heap = self._event_heap
+    while heap and (heap[0][0] <= sim_time):
+      entry = heapq.heappop(heap)
+      if entry[2] is EventSchedule._REMOVED:
+        self._dead_count -= 1
+        continue
+
+      scheduled_time = entry[0]
+      due_events.append((scheduled_time, self._consume_entry(entry)))
+
+    return due_events
+
+  def _consume_entry(
+      self,
+      entry: list) -> Any:
+    """ Take the event out of a live entry which has been popped from the heap
+
+    Recurring entries with occurrences remaining are pushed back onto the heap at their next occurrence
+    time instead of being removed
+
+    :param list entry: Popped heap entry
+    :return Event of the entry
+    """
+    event = entry[2]
+
+    # Re-arm recurring entry
+    if len(entry) > 3:
+      next_time = entry[3].advance()
+      if next_time is not None:
+        entry[0] = next_time
+        entry[1] = next(self._sequence)
+        heapq.heappush(self._event_heap, entry)
+        return event
+
+    entry[2] = EventSchedule._REMOVED
+    self._live_count -= 1
+    return event
+
+  def _cancel_entry(
+      self,
+      entry: list) -> bool:
+    """ Mark a heap entry as cancelled
+
+    :param list entry: Heap entry to cancel
+    :return True if the entry was cancelled, false if it was not live
+    :rtype bool
+    """
+    if entry[2] is EventSchedule._REMOVED:
+      return False
+
+    entry[2] = EventSchedule._REMOVED
+    self._live_count -= 1
+    self._dead_count += 1
+
+    # Compact once cancelled entries outnumber live entries
+    if (self._dead_count >= EventSchedule.COMPACT_MIN_DEAD) and (self._dead_count > self._live_count):
+      self._compact()
+
+    return True
+
+  def _compact(self):
+    """ Remove all cancelled entries from the heap """
+    self._event_heap = [entry for entry in self._event_heap if entry[2] is not EventSchedule._REMOVED]
+    heapq.heapify(self._event_heap)
+    self._dead_count = 0
+
+  def _discard_dead_head(self):
+    """ Pop cancelled entries from the top of the heap """
+    heap = self._event_heap
+    while heap and (heap[0][2] is EventSchedule._REMOVED):
+      heapq.heappop(heap)
+      self._dead_count -= 1
+
+  def _check_event(event: Any):
+    """ Check that an object satisfies the event contract
+
+    :param event: Event to check
+    :raises ValueError: The event is invalid
+    """
+    if event is None:
+      raise ValueError("Event cannot be None")
+
+    # Check event attributes
+    if not hasattr(event, "invoke"):
+      raise ValueError("Event does not have an invoke method")
+
+    if not callable(event.invoke):
+      raise ValueError("Event invoke attribute is not callable")
+
+    if not hasattr(event, "message"):
+      raise ValueError("Event does not have a log message")
@@ -1,14 +1,27 @@
-import typhoon.api.hil as hil
+import os
+import shutil
 import time
 import logging
 
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from datetime import timedelta
 
+from pathlib import Path
 from typing import Any
 
+from .backend import HilBackend
+from .capture import CaptureResult
+from .flush import FileSettleFlush
+from .flush import FlushStrategy
+from .instrumentation import DispatchRecorder
 from .model import ModelManager
+from .playback import ScadaProfile
+from .schedule import EventHandle
 from .schedule import EventSchedule
+from .wait import AdaptiveWait
+from .wait import WaitStrategy
 
 
 class Simulation(object):
@@ -19,10 +32,15 @@ class Simulation(object):
 
     DATA_LOGGER_NAME: str = "TyphoonAutomator"
 
+    CAPTURE_CSV_HIL: str = "hil"                  # Capture CSV file written by the HIL API
+    CAPTURE_CSV_BACKGROUND: str = "background"    # Capture CSV file written from the capture result in the background
+    CAPTURE_CSV_NONE: str = "none"                # No capture CSV file
+
     def __init__(
             self,
             automator,
-            model: ModelManager):
+            model: ModelManager,
+            backend: HilBackend):
         from .automator import TyphoonAutomator
         from .automator import Utility
 
@@ -31,27 +49,57 @@ class Simulation(object):
 
         if model is None:
             raise ValueError("Model cannot be None")
+
+        if backend is None:
+            raise ValueError("Backend cannot be None")
             
         self._automator: TyphoonAutomator = automator
         self._utility = Utility
         self._model = model
+        self._hil = backend.get_hil()
         
         self._schedule = EventSchedule()
+        self._scada_profiles: list[ScadaProfile] = []
 
         self._stop_signal = False
+        self._sim_time_offset = 0.0                 # Offset of warm started simulation time to scenario time
+
+        self._warm_start_filename: str = None       # Warm-up snapshot of the next run
+        self._warm_start_duration: float = 0.0      # Simulation time of the warm-up period
+        self._warm_start_create = False             # True if the warm-up snapshot must be created
+        self._deferred_captures: list[dict] = []    # Captures to schedule once the warm start offset is known
         self._start_time: datetime = None
         self._stop_time: datetime = None
 
         self._scenario_duration: float = 0.0
 
         self._update_interval = 30.0
+        self._wait_strategy: WaitStrategy = AdaptiveWait()
+
+        self._dispatch_recorder = DispatchRecorder()
+        self._dispatch_log_filename: str = None
 
         self._data_logging_signals: list[str] = []
         self._data_logging_filename: str = None
+        self._data_logger_started = False
+        self._data_logger_signals: tuple = None     # Signals of the data logger added to the HIL, None if none
+        self._data_logger_file: str = None          # File the added data logger writes to
+        self._reconfiguration_stats = {"data_logger_added": 0, "data_logger_reused": 0}
+        self._data_logger_reuse: bool = False       # True to keep the data logger added between runs
+
+        self._flush_strategy: FlushStrategy = FileSettleFlush()
+        self._last_flush_duration: float = None
 
         self._analog_capture_signals: list[str] = []
         self._digital_capture_signals: list[str] = []
         self._capture_filename: str = None
+        self._capture_csv: str = Simulation.CAPTURE_CSV_HIL
+        self._capture_buffer: list = None           # Data buffer of the scheduled capture, filled by the HIL API
+        self._capture_decimation: int = 1
+        self._capture_result: CaptureResult = None
+
+        self._output_writer: ThreadPoolExecutor = None  # Background writer of output files
+        self._output_writes: list[Future] = []
 
     def initialize(
             self,
@@ -60,8 +108,13 @@ class Simulation(object):
             raise ValueError("Scenario cannot be None")
 
         try:
-            # Reset scenario duration
+            # Reset scenario duration, schedule and profiles
             self._scenario_duration = 0.0
+            self._schedule.clear_schedule()
+            self.clear_scada_profiles()
+            self._deferred_captures = []
+            self._capture_buffer = None
+            self._capture_result = None
 
             # Set up scenario
             self._automator.log("Initializing scenario")
@@ -71,6 +124,12 @@ class Simulation(object):
             if self._scenario_duration <= 0.0:
                 raise ValueError(f"Invalid scenario duration ({self._scenario_duration})")
 
+            # The stop event must fall after a warm-up period, events within it are skipped on a warm start
+            if self._warm_start_filename and (self._scenario_duration <= self._warm_start_duration):
+                raise ValueError(
+                    f"Scenario duration ({self._scenario_duration}) must be longer than the warm-up period "
+                    f"({self._warm_start_duration})")
+
             # Schedule stop event
             stop_event = self._utility.create_callback_event(
                 message = "Setting stop signal", 
@@ -113,15 +172,63 @@ class Simulation(object):
 
     def run(self):
         """ Run the simulation until the stop signal is set
+
+        If a warm start is configured, the model state is restored from the warm start snapshot (running the
+        warm-up period and saving the snapshot first if requested) and the scenario continues from the end of
+        the warm-up period.
         """
         self.clear_stop_signal()
+        self._sim_time_offset = 0.0
+
+        if self._warm_start_filename:
+            if self._warm_start_create:
+                self._run_warm_up()
+
+            self._model.load_model_state(self._warm_start_filename)
+
         self.start_data_logger()
         self.start_simulation()
         self._automator.log(f"Scenario started at {self._start_time.strftime('%H:%M:%S, %m/%d/%Y')}")
 
-        last_update_time = datetime.now()
+        if self._warm_start_filename:
+            self._resume_after_warm_up()
+
+        self._wait_strategy.start()
+        self._dispatch_recorder.reset()
 
         # Main simulation loop
+        self._run_loop()
+
+        self._wait_strategy.stop()
+        self._log_wait_statistics()
+        self._log_dispatch_summary()
+
+        # Simulation loop is finished, stop simulation and wait for the data logger to flush before stopping it
+        if self._flush_strategy.BEFORE_STOP:
+            self._wait_for_data_logger_flush()
+            self.stop_simulation()
+        else:
+            self.stop_simulation()
+            self._wait_for_data_logger_flush()
+
+        self.stop_data_logger()
+
+        if self._capture_csv == Simulation.CAPTURE_CSV_BACKGROUND:
+            self._write_capture_csv()
+        self._automator.log(f"Scenario stopped at {self._stop_time.strftime('%H:%M:%S, %m/%d/%Y')}")
+
+        elapsed_time = self._stop_time - self._start_time
+        self._automator.log(f"Elapsed wall time: {elapsed_time.total_seconds()} seconds")
+
+    def _run_loop(
+            self,
+            until_time: float = None):
+        """ Dispatch events and profile samples until the stop signal is set
+
+        :param float until_time: Simulation time at which to return, None to run until the stop signal
+        """
+        last_update_time = datetime.now()
+
         while not self.get_stop_signal():
             # TODO: Check simulation health, etc.
             # See utils.py in the Typhoon examples (probably {Typhoon install dir}/examples/tests/utilities_lib)
@@ -137,56 +244,288 @@ class Simulation(object):
             
             # Get current simulation time
             simulation_time = self.get_simulation_time()
+            sample_wall_time = time.perf_counter()
+
+            # Do not dispatch past the requested time
+            reached_until_time = (until_time is not None) and (simulation_time >= until_time)
+            if reached_until_time:
+                simulation_time = until_time
 
             # Output simulation time at requested intervals
             if (datetime.now() - last_update_time) >= timedelta(seconds = self._update_interval):
                 last_update_time = datetime.now()
-                self._automator.log(f"Sim time {simulation_time}, {event_count} events in schedule")
+                dead_count = self._schedule.get_dead_event_count()
+                self._automator.log(f"Sim time {simulation_time}, {event_count} events in schedule ({dead_count} cancelled)")
                     
             # Invoke all events scheduled up to and including the current simulation time
-            while (self._schedule.has_next_event()):
-                if self._schedule.get_next_event_time() > simulation_time:
-                    # Next event is scheduled for the future, no more events to invoke right now
-                    break
-
-                # Pop next event from schedule and invoke the event
-                event = self._schedule.pop_next_event()
-                self.invoke_event(event)
-
-        # TODO: This is sloppy fix to allow the data logger to finish logging
-        # TODO: See the stop_data_logger function for info on the bug which prompts this
-        logger_delay = 3
-        self._automator.log(f"Delaying {logger_delay} seconds for data logging flush", level = logging.WARNING)
-        time.sleep(logger_delay)
-
-        # Simulation loop is finished, stop simulation
+            # The simulation time sampled for this tick is used for all events in the batch
+            due_events = self._schedule.pop_due(simulation_time)
+            if due_events:
+                simulation_step = self._model.simtime_to_simstep(simulation_time)
+                queue_depth = self._schedule.get_event_count() + len(due_events)
+
+                for scheduled_time, event in due_events:
+                    self._wait_strategy.record_dispatch(scheduled_time, simulation_time)
+
+                    callback_start = time.perf_counter()
+                    self.invoke_event(event, sim_time = simulation_time)
+                    callback_duration = time.perf_counter() - callback_start
+
+                    self._dispatch_recorder.record(
+                        scheduled_time,
+                        simulation_time,
+                        simulation_step,
+                        callback_duration,
+                        queue_depth)
+                    queue_depth -= 1
+
+            # Write the latest due value of each SCADA profile
+            for profile in self._scada_profiles:
+                value = profile.update(simulation_time)
+                if value is not None:
+                    self.set_scada_value(name = profile.get_scada_name(), value = value)
+
+            if reached_until_time:
+                break
+
+            # Wait for the next dispatch tick
+            if not self.get_stop_signal():
+                next_time = self._get_next_due_time()
+                if (until_time is not None) and ((next_time is None) or (next_time > until_time)):
+                    next_time = until_time
+
+                self._wait_strategy.wait(simulation_time, sample_wall_time, next_time)
+
+    def set_warm_start(
+            self,
+            filename: str,
+            duration: float,
+            create: bool = False):
+        """ Configure the next run to start from a warm-up snapshot
+
+        Must be called before the scenario is initialized, and the scenario duration must be longer than the warm-up
+        period.  Events and profile samples due during the warm-up period are not invoked after the snapshot is
+        restored, as their effect is part of the snapshot.
+        Captures are scheduled once the simulation has been started from the snapshot.
+
+        :param str filename: Model state snapshot file
+        :param float duration: Simulation time of the warm-up period
+        :param bool create: True if the warm-up period should be simulated and saved to the file first
+        """
+        if not filename:
+            raise ValueError("Filename cannot be empty")
+
+        if duration <= 0.0:
+            raise ValueError(f"Invalid warm-up duration ({duration})")
+
+        self._warm_start_filename = filename
+        self._warm_start_duration = duration
+        self._warm_start_create = create
+
+    def clear_warm_start(self):
+        """ Run the next scenario from the beginning
+        """
+        self._warm_start_filename = None
+        self._warm_start_duration = 0.0
+        self._warm_start_create = False
+
+    def _run_warm_up(self):
+        """ Simulate the warm-up period and save the model state to the warm start file
+        """
+        self._automator.log(f"Running {self._warm_start_duration} second warm-up to create snapshot {self._warm_start_filename}")
+
+        self.start_simulation()
+        self._wait_strategy.start()
+        self._run_loop(until_time = self._warm_start_duration)
+        self._wait_strategy.stop()
         self.stop_simulation()
-        self.stop_data_logger()
-        self._automator.log(f"Scenario stopped at {self._stop_time.strftime('%H:%M:%S, %m/%d/%Y')}")
 
-        elapsed_time = self._stop_time - self._start_time
-        self._automator.log(f"Elapsed wall time: {elapsed_time.total_seconds()} seconds")
+        self._model.save_model_state(self._warm_start_filename)
+
+    def _resume_after_warm_up(self):
+        """ Align the scenario timeline with a simulation started from a warm-up snapshot
+        """
+        # If the restored simulation time does not include the warm-up period, offset it
+        restored_time = self._hil.get_sim_time()
+        if restored_time < self._warm_start_duration - self._model.get_model_timestep():
+            self._sim_time_offset = self._warm_start_duration
+        self._automator.log(f"Warm start at sim time {self._warm_start_duration}, offset {self._sim_time_offset}")
+
+        # Drop events and profile samples already applied by the snapshot
+        skipped = self._schedule.pop_due(self._warm_start_duration)
+        if skipped:
+            self._automator.log(f"Skipped {len(skipped)} events scheduled during the warm-up period")
+
+        for profile in self._scada_profiles:
+            profile.update(self._warm_start_duration)
+
+        # Schedule captures deferred until the simulation time offset was known
+        for capture in self._deferred_captures:
+            capture["executeAt"] = capture["executeAt"] - self._sim_time_offset
+            self._start_capture(capture)
+        self._deferred_captures = []
+
+    def set_wait_strategy(
+            self,
+            strategy: WaitStrategy):
+        """ Set the strategy used to wait between dispatch ticks of the simulation loop
+
+        :param WaitStrategy strategy: Wait strategy, e.g. SpinWait, FixedIntervalWait or AdaptiveWait
+        """
+        if strategy is None:
+            raise ValueError("Wait strategy cannot be None")
+
+        self._wait_strategy = strategy
+
+    def get_wait_statistics(self) -> dict:
+        """ Get the wait strategy statistics of the last run
+
+        :return Dictionary of CPU usage and dispatch error statistics
+        :rtype dict
+        """
+        return self._wait_strategy.get_statistics()
+
+    def _get_next_due_time(self) -> float:
+        """ Get the simulation time at which the next event or profile sample is due
+
+        :return Simulation time of next due event or sample, None if nothing is due
+        :rtype float
+        """
+        next_time = None
+        if self._schedule.has_next_event():
+            next_time = self._schedule.get_next_event_time()
+
+        for profile in self._scada_profiles:
+            profile_time = profile.get_next_time()
+            if (profile_time is not None) and ((next_time is None) or (profile_time < next_time)):
+                next_time = profile_time
+
+        return next_time
+
+    def set_dispatch_log_filename(
+            self,
+            filename: str):
+        """ Set the file to which dispatch records are written after each run
+
+        :param str filename: Dispatch record filename, '.csv' for CSV or any other extension for raw float64 records
+        """
+        self._dispatch_log_filename = filename
+
+    def get_dispatch_recorder(self) -> DispatchRecorder:
+        """ Get the recorder holding the dispatch records of the last run
+
+        :return Dispatch recorder
+        :rtype DispatchRecorder
+        """
+        return self._dispatch_recorder
+
+    def get_dispatch_summary(self) -> dict:
+        """ Get the dispatch lateness and callback duration summary of the last run
+
+        :return Dictionary of dispatch statistics
+        :rtype dict
+        """
+        return self._dispatch_recorder.get_summary()
+
+    def _log_dispatch_summary(self):
+        """ Log the dispatch summary of the last run and write the dispatch records
+        """
+        summary = self._dispatch_recorder.get_summary()
+        self._automator.log(
+            f"Dispatched {summary['count']} events, lateness p50 {summary['lateness_p50']:.6f} "
+            f"p99 {summary['lateness_p99']:.6f} max {summary['lateness_max']:.6f}")
+
+        if self._dispatch_log_filename:
+            try:
+                self._dispatch_recorder.write(self._dispatch_log_filename)
+            except BaseException as ex:
+                self._automator.log("Failed to write dispatch records", level = logging.ERROR)
+                self._automator.log_exception(ex)
+
+    def _log_wait_statistics(self):
+        """ Log the wait strategy statistics of the last run
+        """
+        stats = self._wait_strategy.get_statistics()
+        self._automator.log(
+            f"Wait strategy {stats['strategy']}: CPU {stats['cpu_usage']:.1f}%, {stats['ticks']} ticks, "
+            f"dispatch error mean {stats['dispatch_error_mean']:.6f} max {stats['dispatch_error_max']:.6f}")
 
     def schedule_event(
             self,
             sim_time: float,
-            event: Any):
+            event: Any) -> EventHandle:
         """ Schedule an event to be invoked at a given simulation time
 
         :param float simulation_time: Simulation time at which to schedule the event
         :param SimulationEvent event: Simulation event to be invoked at the given time
+        :return Handle which can be used to cancel the event
+        :rtype EventHandle
         """
         return self._schedule.add_event(sim_time, event)
 
+    def schedule_recurring_event(
+            self,
+            start_time: float,
+            period: float,
+            event: Any,
+            count: int = None,
+            end_time: float = None) -> EventHandle:
+        """ Schedule an event to be invoked periodically
+
+        The event is kept as a single schedule entry regardless of how many times it is invoked
+
+        :param float start_time: Simulation time of the first invocation
+        :param float period: Simulation time between invocations
+        :param SimulationEvent event: Simulation event to be invoked at each occurrence
+        :param int count: Number of invocations, None for no limit
+        :param float end_time: Latest simulation time of an invocation, None for no limit
+        :return Handle which can be used to cancel the remaining invocations
+        :rtype EventHandle
+        """
+        return self._schedule.add_recurring_event(
+            start_time = start_time,
+            period = period,
+            event = event,
+            count = count,
+            end_time = end_time)
+
+    def add_scada_profile(
+            self,
+            profile: ScadaProfile):
+        """ Add a SCADA input profile to be played back while the simulation runs
+
+        The profile is polled once per dispatch tick and the latest due value is written to its SCADA input
+
+        :param ScadaProfile profile: Profile to play back
+        """
+        if profile is None:
+            raise ValueError("Profile cannot be None")
+
+        profile.reset()
+        self._scada_profiles.append(profile)
+
+    def clear_scada_profiles(self):
+        """ Remove all SCADA input profiles
+        """
+        for profile in self._scada_profiles:
+            profile.close()
+
+        self._scada_profiles = []
+
     def invoke_event(
             self,
-            event: Any):
+            event: Any,
+            sim_time: float = None):
         """ Invoke an event
 
         :param SimulationEvent event: Event to be invoked
+        :param float sim_time: Simulation time to log with the event, queried from the HIL if None
         """
         try:
-            event_time = round(self.get_simulation_time(), 6)
+            if sim_time is None:
+                sim_time = self.get_simulation_time()
+
+            event_time = round(sim_time, 6)
             self._automator.log(f"Event at {event_time}: {event.message}")
             event.invoke(self)
       
@@ -215,7 +554,8 @@ class Simulation(object):
         if self.is_simulation_running():
           raise RuntimeError("Simulation is already running")
     
-        hil.start_simulation()
+        self._hil.start_simulation()
+        self._model.clear_scada_values()
 
         self._start_time = datetime.now()
 
@@ -225,7 +565,7 @@ class Simulation(object):
         # Stop simulation
         if self.is_simulation_running():
             self._automator.log("Stopping simulation")
-            hil.stop_simulation()
+            self._hil.stop_simulation()
 
             # Log message if schedule is not empty when stopping
             event_count = self._schedule.get_event_count()
@@ -243,15 +583,18 @@ class Simulation(object):
         :return True if simulation is running, false otherwise
         :rtype bool
         """
-        return hil.is_simulation_running()
+        return self._hil.is_simulation_running()
 
     def get_simulation_time(self) -> float:
         """ Get the current simulation time
 
+        When warm started from a snapshot which does not restore the simulation time, the time is offset by
+        the warm-up period so that it matches the scenario timeline
+
         :return Simulation time
         :rtype float
         """
-        return hil.get_sim_time()
+        return self._hil.get_sim_time() + self._sim_time_offset
 
     def get_simulation_step(self) -> int:
         """ Get the current simulation step
@@ -259,7 +602,11 @@ class Simulation(object):
         :return Simulation step
         :rtype int
         """
-        return hil.get_sim_step()
+        step = self._hil.get_sim_step()
+        if self._sim_time_offset:
+            step += self._model.simtime_to_simstep(self._sim_time_offset)
+
+        return step
 
     def schedule_capture(
             self,
@@ -307,7 +654,9 @@ class Simulation(object):
         # Initialize capture info
         num_analog_channels = len(self._analog_capture_signals)
         capture_digital = len(self._digital_capture_signals) > 0
-        capture_buffer = []
+        self._capture_buffer = []
+        self._capture_decimation = decimation
+        self._capture_result = None
 
         num_samples = stop_step - start_step
         if (num_samples & 1) != 0:              # Per Typhoon's documentation, number of samples must be even
@@ -329,16 +678,91 @@ class Simulation(object):
 
         # Schedule capture
         self._automator.log(f"Scheduling capture from {round(start_time, 6)} to {round(start_time + duration, 6)}, file {self._capture_filename}")
-        if not hil.start_capture(
-                cpSettings = capture_settings,
-                trSettings = trigger_settings,
-                chSettings = channel_settings,
-                dataBuffer = capture_buffer,
-                fileName = self._capture_filename,
-                executeAt = start_time,
-                timeout = None):
+        capture = {
+            "cpSettings": capture_settings,
+            "trSettings": trigger_settings,
+            "chSettings": channel_settings,
+            "dataBuffer": self._capture_buffer,
+            "fileName": self._capture_filename if (self._capture_csv == Simulation.CAPTURE_CSV_HIL) else "",
+            "executeAt": start_time,
+            "timeout": None}
+
+        # Captures of warm started runs are scheduled once the simulation time offset is known
+        if self._warm_start_filename:
+            self._deferred_captures.append(capture)
+        else:
+            self._start_capture(capture)
+
+    def _start_capture(
+            self,
+            capture: dict):
+        """ Start a capture
+
+        :param dict capture: Keyword arguments of the start_capture API call
+        :raises RuntimeError: The capture could not be scheduled
+        """
+        if not self._hil.start_capture(**capture):
             raise RuntimeError("Failed to schedule capture")
 
+    def get_capture_result(self) -> CaptureResult:
+        """ Get the result of the capture of the last run
+
+        :return Capture result, None if no capture has completed
+        :rtype CaptureResult
+        """
+        if (self._capture_result is None) and self._capture_buffer:
+            self._capture_result = CaptureResult.from_buffer(
+                buffer = self._capture_buffer,
+                decimation = self._capture_decimation,
+                timestep = self._model.get_model_timestep(),
+                time_offset = self._sim_time_offset)
+
+        return self._capture_result
+
+    def set_capture_csv(
+            self,
+            mode: str):
+        """ Set how the capture CSV file is written
+
+        :param str mode: CAPTURE_CSV_HIL to let the HIL API write it, CAPTURE_CSV_BACKGROUND to write it from the
+        capture result on a background thread while the next scenario runs, or CAPTURE_CSV_NONE for no file
+        """
+        if mode not in (Simulation.CAPTURE_CSV_HIL, Simulation.CAPTURE_CSV_BACKGROUND, Simulation.CAPTURE_CSV_NONE):
+            raise ValueError(f"Invalid capture CSV mode ({mode})")
+
+        self._capture_csv = mode
+
+    def _write_capture_csv(self):
+        """ Write the capture CSV file from the capture result on the background writer
+        """
+        result = self.get_capture_result()
+        if result is None:
+            return
+
+        if self._output_writer is None:
+            self._output_writer = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "OutputWriter")
+
+        self._output_writes = [write for write in self._output_writes if not write.done()]
+        self._output_writes.append(self._output_writer.submit(result.write_csv, self._capture_filename))
+
+    def get_output_writes(self) -> list[Future]:
+        """ Get the background writes of output files which have not completed
+
+        :return List of futures of the pending writes
+        :rtype list[Future]
+        """
+        return [write for write in self._output_writes if not write.done()]
+
+    def wait_for_output_writes(self):
+        """ Wait for background writes of output files to complete
+
+        :raises Exception: A background write failed
+        """
+        writes = self._output_writes
+        self._output_writes = []
+        for write in writes:
+            write.result()
+
     def stop_capture(
             self,
             timeout: float = 0.0):
@@ -363,7 +787,7 @@ class Simulation(object):
         # Stop capture
         if self.is_capture_in_progress():
             self._automator.log("Stopping capture")
-            if not hil.stop_capture():
+            if not self._hil.stop_capture():
                 self._automator.log("Failed to stop capture", level = logging.ERROR)
         else:
             self._automator.log("Stop capture called but capture was not in progress", level = logging.WARNING)
@@ -374,10 +798,14 @@ class Simulation(object):
         :return True if capture is in progress, false otherwise
         :rtype bool
         """
-        return hil.capture_in_progress()
+        return self._hil.capture_in_progress()
 
     def start_data_logger(self):
         """ Start the data logger
+
+        By default the data logger is added for each run, writing directly to the data logging filename, and
+        removed when it is stopped.  With data logger reuse enabled (see set_data_logger_reuse), it stays added
+        between runs and writes to a staging file which is moved to the data logging filename when it is stopped.
         """
         if not self._data_logging_filename:
             self._automator.log("No data logging filename, not starting", level = logging.WARNING)
@@ -388,36 +816,171 @@ class Simulation(object):
             return
 
         self._automator.log(f"Starting data logger, file {self._data_logging_filename}")
-    
-        if not hil.add_data_logger(
-                name = Simulation.DATA_LOGGER_NAME,
-                data_file = self._data_logging_filename,
-                signals = self._data_logging_signals,
-                use_suffix = False):
-            raise RuntimeError("Failed to add data logger")
-        
-        if not hil.start_data_logger(name = Simulation.DATA_LOGGER_NAME):
+
+        signals = tuple(self._data_logging_signals)
+        data_file = self._data_logging_filename
+        if self._data_logger_reuse:
+            data_file = str(Path(self._data_logging_filename).parent / f".{Simulation.DATA_LOGGER_NAME}.csv")
+
+        if self._data_logger_reuse and (signals == self._data_logger_signals) and (data_file == self._data_logger_file):
+            self._reconfiguration_stats["data_logger_reused"] += 1
+        else:
+            self.release_data_logger()
+
+            if not self._hil.add_data_logger(
+                    name = Simulation.DATA_LOGGER_NAME,
+                    data_file = data_file,
+                    signals = self._data_logging_signals,
+                    use_suffix = False):
+                raise RuntimeError("Failed to add data logger")
+
+            self._data_logger_signals = signals
+            self._data_logger_file = data_file
+            self._reconfiguration_stats["data_logger_added"] += 1
+
+        if not self._hil.start_data_logger(name = Simulation.DATA_LOGGER_NAME):
             raise RuntimeError("Failed to start data logger")
 
+        self._data_logger_started = True
+
+    def set_data_logger_reuse(
+            self,
+            enabled: bool):
+        """ Enable or disable keeping the data logger added between runs
+
+        Reuse avoids adding and removing the data logger for every scenario.  It relies on the HIL reopening the
+        logger's file each time the logger is started, and on the staging file being renamed while the logger is
+        still added.  This has only been exercised with the fake backend, not on HIL hardware or on Windows.
+
+        :param bool enabled: True to keep the data logger added between runs, false to add it for each run
+        """
+        if not enabled:
+            self.release_data_logger()
+
+        self._data_logger_reuse = enabled
+
+    def release_data_logger(self):
+        """ Remove the data logger from the HIL if it is added
+        """
+        if self._data_logger_signals is None:
+            return
+
+        self._data_logger_signals = None
+        self._data_logger_file = None
+        if not self._hil.remove_data_logger(name = Simulation.DATA_LOGGER_NAME):
+            self._automator.log("Failed to remove data logger", level = logging.ERROR)
+
+    def get_data_logger_file(self) -> str:
+        """ Get the file the data logger is writing to
+
+        :return Data logger staging filename, None if no data logger is added
+        :rtype str
+        """
+        return self._data_logger_file
+
+    def get_reconfiguration_statistics(self) -> dict:
+        """ Get the number of times the data logger was added or reused and SCADA writes were made or skipped
+
+        :return Dictionary of 'data_logger_added', 'data_logger_reused', 'scada_writes' and 'scada_writes_skipped'
+        :rtype dict
+        """
+        stats = self._reconfiguration_stats.copy()
+        stats["scada_writes"], stats["scada_writes_skipped"] = self._model.get_scada_write_counts()
+        return stats
+
+    def set_flush_strategy(
+            self,
+            strategy: FlushStrategy):
+        """ Set the strategy used to wait for the data logger to flush at the end of a scenario
+
+        FixedDelayFlush waits before the simulation is stopped, like the original fixed delay.  FileSettleFlush
+        waits after the simulation is stopped, once the data logger can no longer receive new samples.
+
+        :param FlushStrategy strategy: Flush strategy, e.g. FileSettleFlush or FixedDelayFlush
+        """
+        if strategy is None:
+            raise ValueError("Flush strategy cannot be None")
+
+        self._flush_strategy = strategy
+
+    def get_last_flush_duration(self) -> float:
+        """ Get the wall time spent waiting for the data logger to flush in the last run
+
+        :return Flush wait time in seconds, None if no data logger was running
+        :rtype float
+        """
+        return self._last_flush_duration
+
+    def _wait_for_data_logger_flush(self):
+        """ Wait for the data logger to flush using the flush strategy
+        """
+        self._last_flush_duration = None
+        if not self._data_logger_started:
+            return
+
+        duration, complete = self._flush_strategy.wait_for_flush(self)
+        self._last_flush_duration = duration
+
+        # Strategies log their own warnings when the flush does not complete
+        if complete:
+            self._automator.log(f"Data logger flushed in {duration:.3f} seconds ({self._flush_strategy.NAME})")
+
     def stop_data_logger(self):
         """ Stop the data logger
+
+        With data logger reuse, the logger's staging file is moved to the data logging filename, otherwise the
+        logger is removed
         """
-        # TODO: Open a Typhoon support ticket for this
-        # Error message is always "get_data_logger_status() missing 1 required positional argument: 'name'"
-        #status = hil.get_data_logger_status(name = Simulation.DATA_LOGGER_NAME)
+        started = self._data_logger_started
+        self._data_logger_started = False
 
-        # TODO: Instead of this, use the data logger status to determine if logging needs to be stopped
         if not self._data_logging_filename:
             self._automator.log("No data logging filename, not stopping", level = logging.WARNING)
             return
 
+        if not started:
+            return
+
         self._automator.log("Stopping data logger")
 
-        if not hil.stop_data_logger(name = Simulation.DATA_LOGGER_NAME):
+        if not self._hil.stop_data_logger(name = Simulation.DATA_LOGGER_NAME):
             self._automator.log("Failed to stop data logger", level = logging.ERROR)
-        
-        if not hil.remove_data_logger(name = Simulation.DATA_LOGGER_NAME):
-            self._automator.log("Failed to remove data logger", level = logging.ERROR)
+
+        if not self._data_logger_reuse:
+            self.release_data_logger()
+            return
+
+        try:
+            try:
+                os.replace(self._data_logger_file, self._data_logging_filename)
+            except OSError:
+                shutil.move(self._data_logger_file, self._data_logging_filename)
+        except FileNotFoundError:
+            self._automator.log("Data logger did not write a file", level = logging.WARNING)
+
+    def abort(self):
+        """ Clean up after a run which failed part way through
+
+        Stops the simulation and data logger if they are still running so that another scenario can be run
+        """
+        if self.is_simulation_running():
+            self.stop_simulation()
+
+        if self._data_logger_started:
+            self.stop_data_logger()
+
+        self.release_data_logger()
+
+    def log(
+            self,
+            message: str,
+            level: int = logging.INFO):
+        """ Write a message to the automation log
+
+        :param str message: Message to log
+        :param int level: Logging level of the message
+        """
+        self._automator.log(message, level = level)
 
     def set_stop_signal(self):
         """ Set the simulation stop signal
@@ -445,6 +1008,14 @@ class Simulation(object):
         
         self._scenario_duration = duration
 
+    def get_scenario_duration(self) -> float:
+        """ Get the scenario duration
+
+        :return Scenario duration (in seconds)
+        :rtype float
+        """
+        return self._scenario_duration
+
     def save_model_state(
             self,
             filename: str):
@@ -505,6 +1076,9 @@ class Simulation(object):
 
         self._data_logging_filename = filename
 
+    def get_data_logging_filename(self) -> str:
+        return self._data_logging_filename
+
     def set_capture_signals(
             self,
             analog_signals: list[str],
@@ -526,6 +1100,14 @@ class Simulation(object):
 
         self._capture_filename = filename
 
+    def get_model_hash(self) -> str:
+        """ Get the hash of the compiled model being simulated
+
+        :return Hex digest of the compiled model file
+        :rtype str
+        """
+        return self._model.get_compiled_model_hash()
+
     def set_scada_value(
             self,
             name: str,
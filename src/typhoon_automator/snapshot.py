@@ -0,0 +1,168 @@
+import hashlib
+import os
+import tempfile
+
+from pathlib import Path
+
+
+class SnapshotCache(object):
+    """ Model state snapshot cache
+
+    Stores model state files saved after a scenario's warm-up period, keyed by the compiled model hash and the
+    warm-up prefix ID.  The least recently used snapshots are evicted when the cache exceeds its size limit.
+    File modification times record use, so the cache may be shared between processes.
+    """
+
+    SUFFIX: str = ".state"
+
+    def __init__(
+            self,
+            directory: str,
+            max_size: int = 1 << 30):
+        """ Create a snapshot cache
+
+        :param str directory: Cache directory, created if it does not exist
+        :param int max_size: Maximum total size (in bytes) of cached snapshots
+        """
+        if not directory:
+            raise ValueError("Snapshot cache directory cannot be empty")
+
+        if max_size <= 0:
+            raise ValueError(f"Invalid snapshot cache size ({max_size})")
+
+        self._directory = Path(directory)
+        self._directory.mkdir(parents = True, exist_ok = True)
+        self._max_size = max_size
+
+    def get_key(
+            model_hash: str,
+            prefix_id: str) -> str:
+        """ Get the cache key of a warm-up prefix
+
+        :param str model_hash: Hash of the compiled model
+        :param str prefix_id: Warm-up prefix ID declared by the scenario
+        :return Cache key
+        :rtype str
+        """
+        return hashlib.sha256(f"{model_hash}\0{prefix_id}".encode("utf-8")).hexdigest()
+
+    def get_path(
+            self,
+            key: str) -> str:
+        """ Get the path of the snapshot file for a key, whether or not it exists
+
+        :param str key: Cache key
+        :return Snapshot filename
+        :rtype str
+        """
+        return str(self._directory / f"{key}{SnapshotCache.SUFFIX}")
+
+    def lookup(
+            self,
+            key: str) -> str:
+        """ Look up a snapshot, marking it as recently used
+
+        :param str key: Cache key
+        :return Snapshot filename, None if the snapshot is not cached
+        :rtype str
+        """
+        path = self.get_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def create_staging_path(
+            self,
+            key: str) -> str:
+        """ Create a temporary file in the cache directory to save a new snapshot to
+
+        The file is only visible to lookups once it is committed
+
+        :param str key: Cache key
+        :return Staging filename
+        :rtype str
+        """
+        handle, filename = tempfile.mkstemp(
+            prefix = f".staging-{key}-",
+            suffix = SnapshotCache.SUFFIX,
+            dir = self._directory)
+        os.close(handle)
+        return filename
+
+    def commit(
+            self,
+            key: str,
+            staging_filename: str):
+        """ Move a snapshot saved to a staging file to the key's path and evict snapshots over the size limit
+
+        :param str key: Cache key
+        :param str staging_filename: Staging file the snapshot was saved to, from create_staging_path
+        """
+        try:
+            if Path(staging_filename).stat().st_size <= 0:
+                raise FileNotFoundError(f"Snapshot was not saved ({staging_filename})")
+
+            os.replace(staging_filename, self.get_path(key))
+        except BaseException:
+            self.discard(staging_filename)
+            raise
+
+        self.evict(keep = key)
+
+    def discard(
+            self,
+            staging_filename: str):
+        """ Remove a staging file whose snapshot will not be committed
+
+        :param str staging_filename: Staging file, from create_staging_path
+        """
+        Path(staging_filename).unlink(missing_ok = True)
+
+    def evict(
+            self,
+            keep: str = None):
+        """ Remove the least recently used snapshots until the cache is within its size limit
+
+        :param str keep: Key of a snapshot which must not be evicted
+        """
+        keep_path = self.get_path(keep) if keep else None
+
+        entries = []
+        total_size = 0
+        for path in self._get_snapshot_paths():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime_ns, str(path), stat.st_size))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, path, size in entries:
+            if total_size <= self._max_size:
+                break
+
+            if path == keep_path:
+                continue
+
+            try:
+                os.remove(path)
+                total_size -= size
+            except FileNotFoundError:
+                pass
+
+    def get_size(self) -> int:
+        """ Get the total size of cached snapshots
+
+        :return Size in bytes
+        :rtype int
+        """
+        return sum(path.stat().st_size for path in self._get_snapshot_paths())
+
+    def _get_snapshot_paths(self) -> list[Path]:
+        """ Get the paths of committed snapshots, excluding staging files """
+        return [path for path in self._directory.glob(f"*{SnapshotCache.SUFFIX}") if not path.name.startswith(".")]
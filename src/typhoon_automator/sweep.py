@@ -0,0 +1,376 @@
+import functools
+import hashlib
+import itertools
+import json
+import random
+import types
+
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+
+
+class ParameterSweep(object):
+    """ Parameter sweep base class
+
+    Generates scenarios on demand by calling a factory with each parameter set of the sweep.  Sweeps are iterables
+    of (name, scenario) tuples which can be added to an automator or parallel runner with add_scenarios, and can be
+    iterated any number of times with the same result.
+
+    Scenario names are the sweep prefix followed by a stable ID derived from the parameter values, so the same
+    parameters always produce the same name regardless of the sweep they were generated by.  Parameter sets which
+    repeat within a sweep get a sequence suffix, starting at _2 for the second occurrence.
+
+    Generated scenarios are wrapped in a SweepScenario, which gives them a scenario ID derived from the prefix, the
+    factory and the parameter values so their results can be cached and cataloged.  The factory is identified by its
+    qualified name and the hash of its code, so editing the factory invalidates cached results.  Values captured in
+    closures are not part of the ID, pass them as parameters or use functools.partial instead.
+    """
+
+    ID_LENGTH: int = 16                 # Number of hex digits of parameter IDs
+
+    def __init__(
+            self,
+            factory: Callable[[dict], Any],
+            prefix: str = "Sweep"):
+        """ Create a parameter sweep
+
+        :param factory: Function taking a dictionary of parameter values and returning a scenario
+        :param str prefix: Prefix of scenario names
+        """
+        if not callable(factory):
+            raise ValueError("Scenario factory is not callable")
+
+        if not prefix:
+            raise ValueError("Prefix cannot be empty")
+
+        self._factory = factory
+        self._factory_id = _get_factory_id(factory)
+        self._prefix = prefix
+
+    def get_parameter_id(parameters: dict) -> str:
+        """ Get the stable ID of a parameter set
+
+        :param dict parameters: Parameter values by name
+        :return Hex digest of the parameter names and values
+        :rtype str
+        """
+        encoded = json.dumps(parameters, sort_keys = True, default = repr)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:ParameterSweep.ID_LENGTH]
+
+    def get_scenario_name(
+            self,
+            parameters: dict) -> str:
+        """ Get the name of the scenario generated for a parameter set
+
+        :param dict parameters: Parameter values by name
+        :return Scenario name
+        :rtype str
+        """
+        return f"{self._prefix}_{ParameterSweep.get_parameter_id(parameters)}"
+
+    def get_scenario_id(
+            self,
+            parameters: dict) -> str:
+        """ Get the stable ID of the scenario generated for a parameter set
+
+        :param dict parameters: Parameter values by name
+        :return Hex digest of the prefix, the factory ID and the parameter names and values
+        :rtype str
+        """
+        encoded = json.dumps([self._prefix, self._factory_id, parameters], sort_keys = True, default = repr)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def iterate_parameters(self) -> Iterator[dict]:
+        """ Iterate over the parameter sets of the sweep
+
+        :return Iterator of dictionaries of parameter values by name
+        """
+        raise NotImplementedError()
+
+    def __iter__(self) -> Iterator[tuple[str, Any]]:
+        """ Generate the scenarios of the sweep
+
+        :return Iterator of (name, scenario) tuples
+        """
+        occurrences = {}
+        for parameters in self.iterate_parameters():
+            name = self.get_scenario_name(parameters)
+            count = occurrences.get(name, 0) + 1
+            occurrences[name] = count
+            if count > 1:
+                name = f"{name}_{count}"
+
+            scenario_id = self.get_scenario_id(parameters)
+            yield (name, SweepScenario(self._factory(parameters), scenario_id, parameters))
+
+
+class SweepScenario(object):
+    """ Scenario generated by a parameter sweep
+
+    Wraps the scenario returned by the sweep factory, forwarding all other attributes to it, and provides the
+    scenario ID and parameters of the sweep when the scenario does not define its own
+    """
+
+    def __init__(
+            self,
+            scenario: Any,
+            scenario_id: str,
+            parameters: dict):
+        """ Wrap a generated scenario
+
+        :param scenario: Scenario returned by the sweep factory
+        :param str scenario_id: Scenario ID derived from the sweep parameters
+        :param dict parameters: Parameter values by name
+        """
+        self._scenario = scenario
+        self._scenario_id = scenario_id
+        self._parameters = dict(parameters)
+
+    def get_scenario(self) -> Any:
+        """ Get the wrapped scenario
+
+        :return Scenario returned by the sweep factory
+        """
+        return self._scenario
+
+    def get_scenario_id(self) -> str:
+        """ Get the stable ID of the scenario
+
+        :return The wrapped scenario's own ID if it has one, otherwise the ID derived from the sweep parameters
+        :rtype str
+        """
+        if hasattr(self._scenario, "get_scenario_id"):
+            return self._scenario.get_scenario_id()
+        return self._scenario_id
+
+    def get_parameters(self) -> dict:
+        """ Get the scenario parameters
+
+        :return The wrapped scenario's own parameters if it has them, otherwise the sweep parameter values
+        :rtype dict
+        """
+        if hasattr(self._scenario, "get_parameters"):
+            return self._scenario.get_parameters()
+        return dict(self._parameters)
+
+    def __getattr__(
+            self,
+            name: str) -> Any:
+        # Only called for attributes not found on the wrapper, guard against lookups before __init__ (unpickling)
+        if name.startswith("__") or ("_scenario" not in self.__dict__):
+            raise AttributeError(name)
+        return getattr(self._scenario, name)
+
+
+class CartesianSweep(ParameterSweep):
+    """ Cartesian product parameter sweep
+
+    Generates a scenario for every combination of the parameter values.  The last parameter varies fastest.
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[dict], Any],
+            parameters: dict[str, Iterable[Any]],
+            prefix: str = "Sweep"):
+        """ Create a cartesian product sweep
+
+        :param factory: Function taking a dictionary of parameter values and returning a scenario
+        :param dict parameters: Values of each parameter by name
+        :param str prefix: Prefix of scenario names
+        """
+        super().__init__(factory, prefix)
+
+        if not parameters:
+            raise ValueError("Parameters cannot be empty")
+
+        self._names = list(parameters.keys())
+        self._values = [list(values) for values in parameters.values()]
+
+        for name, values in zip(self._names, self._values):
+            if not values:
+                raise ValueError(f"Parameter {name} has no values")
+
+    def iterate_parameters(self) -> Iterator[dict]:
+        for combination in itertools.product(*self._values):
+            yield dict(zip(self._names, combination))
+
+    def __len__(self) -> int:
+        count = 1
+        for values in self._values:
+            count *= len(values)
+        return count
+
+
+class LatinHypercubeSweep(ParameterSweep):
+    """ Latin hypercube parameter sweep
+
+    Divides the range of each parameter into as many equal strata as there are samples and generates samples such
+    that each stratum of each parameter is sampled exactly once.  Samples are reproducible for a given seed.
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[dict], Any],
+            ranges: dict[str, tuple[float, float]],
+            samples: int,
+            seed: int = 0,
+            prefix: str = "Sweep"):
+        """ Create a Latin hypercube sweep
+
+        :param factory: Function taking a dictionary of parameter values and returning a scenario
+        :param dict ranges: (low, high) range of each parameter by name
+        :param int samples: Number of samples
+        :param int seed: Random seed
+        :param str prefix: Prefix of scenario names
+        """
+        super().__init__(factory, prefix)
+
+        if not ranges:
+            raise ValueError("Parameter ranges cannot be empty")
+
+        if samples < 1:
+            raise ValueError(f"Invalid number of samples ({samples})")
+
+        self._ranges = {name: _check_range(name, value_range) for name, value_range in ranges.items()}
+        self._samples = samples
+        self._seed = seed
+
+    def iterate_parameters(self) -> Iterator[dict]:
+        rng = random.Random(self._seed)
+
+        # Stratum of each sample for each parameter
+        strata = {}
+        for name in self._ranges.keys():
+            permutation = list(range(self._samples))
+            rng.shuffle(permutation)
+            strata[name] = permutation
+
+        for index in range(self._samples):
+            parameters = {}
+            for name, (low, high) in self._ranges.items():
+                position = (strata[name][index] + rng.random()) / self._samples
+                parameters[name] = low + (position * (high - low))
+            yield parameters
+
+    def __len__(self) -> int:
+        return self._samples
+
+
+class RandomSweep(ParameterSweep):
+    """ Random parameter sweep
+
+    Draws each parameter independently for each sample.  Samples are reproducible for a given seed.
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[dict], Any],
+            distributions: dict[str, Any],
+            samples: int,
+            seed: int = 0,
+            prefix: str = "Sweep"):
+        """ Create a random sweep
+
+        :param factory: Function taking a dictionary of parameter values and returning a scenario
+        :param dict distributions: Distribution of each parameter by name, either a (low, high) tuple for a uniform
+        distribution or a function taking a random.Random and returning a value
+        :param int samples: Number of samples
+        :param int seed: Random seed
+        :param str prefix: Prefix of scenario names
+        """
+        super().__init__(factory, prefix)
+
+        if not distributions:
+            raise ValueError("Parameter distributions cannot be empty")
+
+        if samples < 1:
+            raise ValueError(f"Invalid number of samples ({samples})")
+
+        self._distributions = {}
+        for name, distribution in distributions.items():
+            if not callable(distribution):
+                distribution = _check_range(name, distribution)
+            self._distributions[name] = distribution
+
+        self._samples = samples
+        self._seed = seed
+
+    def iterate_parameters(self) -> Iterator[dict]:
+        rng = random.Random(self._seed)
+
+        for _ in range(self._samples):
+            parameters = {}
+            for name, distribution in self._distributions.items():
+                if callable(distribution):
+                    parameters[name] = distribution(rng)
+                else:
+                    parameters[name] = rng.uniform(*distribution)
+            yield parameters
+
+    def __len__(self) -> int:
+        return self._samples
+
+
+def _get_factory_id(factory: Callable) -> str:
+    """ Get the ID of a scenario factory from its qualified name, its code and the arguments bound by partial
+
+    :return Hex digest identifying the factory
+    :rtype str
+    """
+    digest = hashlib.sha256()
+
+    while isinstance(factory, functools.partial):
+        digest.update(json.dumps([factory.args, factory.keywords], sort_keys = True, default = repr).encode("utf-8"))
+        factory = factory.func
+
+    # Classes are identified by their constructor, callable objects by their __call__ method
+    if isinstance(factory, type):
+        target, function = factory, factory.__init__
+    elif isinstance(factory, (types.FunctionType, types.MethodType, types.BuiltinFunctionType)):
+        target, function = factory, factory
+    else:
+        target, function = type(factory), type(factory).__call__
+
+    digest.update(f"{getattr(target, '__module__', '')}.{getattr(target, '__qualname__', '')}".encode("utf-8"))
+
+    code = getattr(getattr(function, "__func__", function), "__code__", None)
+    if code is not None:
+        _update_code_digest(digest, code)
+
+    return digest.hexdigest()
+
+
+def _update_code_digest(
+        digest,
+        code: types.CodeType):
+    """ Add the bytecode, names and constants of a code object and its nested code objects to a digest """
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode("utf-8"))
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            _update_code_digest(digest, constant)
+        elif isinstance(constant, frozenset):
+            # Set constants are ordered by string hashes, which change between processes
+            digest.update(repr(sorted(repr(item) for item in constant)).encode("utf-8"))
+        else:
+            digest.update(repr(constant).encode("utf-8"))
+
+
+def _check_range(
+        name: str,
+        value_range: tuple[float, float]) -> tuple[float, float]:
+    """ Check a (low, high) parameter range """
+    try:
+        low, high = value_range
+        low = float(low)
+        high = float(high)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid range for parameter {name} ({value_range!r})")
+
+    if high < low:
+        raise ValueError(f"Invalid range for parameter {name} ({value_range!r})")
+
+    return (low, high)
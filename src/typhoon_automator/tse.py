@@ -0,0 +1,180 @@
+import re
+import shlex
+
+
+class SchematicInfo(object):
+    """ Schematic information read from a Typhoon '.tse' file
+
+    Holds the model name, the properties of the model configuration block and the components of the
+    schematic.  Component names of nested subsystems are joined with '.'.
+    """
+
+    SCADA_INPUT_TYPES: tuple[str] = ("src_scada_input",)
+    PROBE_TYPES: tuple[str] = ("gen_probe",)
+    MEASUREMENT_TYPES: tuple[str] = ("core/Current Measurement", "core/Voltage Measurement")
+
+    def __init__(self):
+        self.version: str = None
+        self.model_name: str = None
+        self.configuration: dict[str, str] = {}
+        self.components: list[tuple[str, str]] = []     # (type, name) of each component
+
+    def get_property(
+            self,
+            name: str) -> str:
+        """ Get a model configuration property
+
+        :param str name: Property name, e.g. 'simulation_time_step'
+        :return Property value with any quotes removed
+        :rtype str
+        :raises KeyError: The property is not in the configuration block
+        """
+        return self.configuration[name]
+
+    def get_component_names(self) -> list[str]:
+        """ Get the names of all components
+
+        :return Component names
+        :rtype list[str]
+        """
+        return [name for _, name in self.components]
+
+    def get_scada_input_names(self) -> list[str]:
+        """ Get the names of the SCADA inputs
+
+        :return SCADA input names
+        :rtype list[str]
+        """
+        return [name for component_type, name in self.components if component_type in SchematicInfo.SCADA_INPUT_TYPES]
+
+    def get_signal_names(self) -> list[str]:
+        """ Get the names of the probe and measurement signals
+
+        :return Signal names
+        :rtype list[str]
+        """
+        signal_types = SchematicInfo.PROBE_TYPES + SchematicInfo.MEASUREMENT_TYPES
+        return [name for component_type, name in self.components if component_type in signal_types]
+
+
+_PROPERTY_PATTERN = re.compile(r"^(\w+)\s*=\s*(.*)$")
+_TOKEN_PATTERN = re.compile(r'"[^"]*"|\S+')
+
+
+def read_schematic_info(
+        filename: str,
+        header_only: bool = False) -> SchematicInfo:
+    """ Read schematic information from a '.tse' file
+
+    The file is read line by line without loading the schematic.  Property blocks ('[...]'), the 'default'
+    block and code sections are skipped.
+
+    :param str filename: Schematic file
+    :param bool header_only: True to stop reading after the configuration block
+    :return Schematic information
+    :rtype SchematicInfo
+    """
+    info = SchematicInfo()
+
+    # Stack of open '{' blocks, each entry is the component name or None for non-component blocks
+    blocks: list[str] = []
+    skip_depth = None           # Block depth at which a skipped block was opened
+    in_configuration = False
+    in_code = False
+    in_bracket = False
+
+    with open(filename, encoding = "utf-8") as schematic_file:
+        for line in schematic_file:
+            stripped = line.strip()
+            if (not stripped) or stripped.startswith("//"):
+                continue
+
+            # Skip code sections, which may contain any characters
+            if in_code:
+                in_code = (stripped != "ENDCODE")
+                continue
+            if stripped.startswith("CODE "):
+                in_code = True
+                continue
+
+            # Skip component graphics property blocks
+            if in_bracket:
+                in_bracket = (stripped != "]")
+                continue
+            if stripped == "[":
+                in_bracket = True
+                continue
+
+            if stripped == "}":
+                if in_configuration:
+                    in_configuration = False
+                    if header_only:
+                        break
+
+                blocks.pop()
+                if (skip_depth is not None) and (len(blocks) < skip_depth):
+                    skip_depth = None
+                continue
+
+            if in_configuration:
+                match = _PROPERTY_PATTERN.match(stripped)
+                if match:
+                    info.configuration[match.group(1)] = _unquote(match.group(2))
+                continue
+
+            if not stripped.endswith("{"):
+                if (info.version is None) and stripped.startswith("version"):
+                    match = _PROPERTY_PATTERN.match(stripped)
+                    if match:
+                        info.version = match.group(2)
+                continue
+
+            # Opening a block
+            if skip_depth is not None:
+                blocks.append(None)
+                continue
+
+            tokens = _split_tokens(stripped[:-1])
+            if not tokens:
+                skip_depth = len(blocks) + 1
+                blocks.append(None)
+            elif (tokens[0] == "model") and (len(tokens) > 1):
+                info.model_name = tokens[1]
+                blocks.append(None)
+            elif tokens == ["configuration"]:
+                in_configuration = True
+                blocks.append(None)
+            elif (tokens[0] == "component") and (len(tokens) > 2):
+                component_type, name = tokens[1], tokens[2]
+
+                # The root subsystem does not add a level to component names
+                parents = [block for block in blocks if block]
+                if (not parents) and (component_type == "Subsystem") and (not info.components):
+                    blocks.append("")
+                    continue
+
+                full_name = ".".join(parents + [name])
+                info.components.append((component_type, full_name))
+                blocks.append(full_name)
+            else:
+                skip_depth = len(blocks) + 1
+                blocks.append(None)
+
+    return info
+
+
+def _unquote(value: str) -> str:
+    """ Remove surrounding quotes from a property value """
+    value = value.strip()
+    if (len(value) >= 2) and (value[0] == value[-1] == '"'):
+        return value[1:-1]
+
+    return value
+
+
+def _split_tokens(text: str) -> list[str]:
+    """ Split a block header into tokens, tolerating unbalanced quotes in property text """
+    try:
+        return shlex.split(text)
+    except ValueError:
+        return [_unquote(token) for token in _TOKEN_PATTERN.findall(text)]
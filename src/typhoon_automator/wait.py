@@ -0,0 +1,220 @@
+import time
+
+
+class WaitStrategy(object):
+    """ Simulation loop wait strategy
+
+    Decides how the simulation loop waits between dispatch ticks, and keeps statistics on CPU usage and
+    dispatch error (simulation time between an event's scheduled time and the tick which invoked it).
+    """
+
+    NAME: str = "base"
+
+    def __init__(self):
+        self._start_wall: float = 0.0
+        self._start_cpu: float = 0.0
+        self._stop_wall: float = 0.0
+        self._stop_cpu: float = 0.0
+
+        self._dispatch_count = 0
+        self._dispatch_error_sum = 0.0
+        self._dispatch_error_max = 0.0
+        self._tick_count = 0
+
+    def start(self):
+        """ Reset statistics at the start of a simulation run """
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._stop_wall = self._start_wall
+        self._stop_cpu = self._start_cpu
+
+        self._dispatch_count = 0
+        self._dispatch_error_sum = 0.0
+        self._dispatch_error_max = 0.0
+        self._tick_count = 0
+
+    def stop(self):
+        """ Record the end of a simulation run """
+        self._stop_wall = time.perf_counter()
+        self._stop_cpu = time.process_time()
+
+    def record_dispatch(
+            self,
+            scheduled_time: float,
+            sim_time: float):
+        """ Record the dispatch of a scheduled event
+
+        :param float scheduled_time: Simulation time the event was scheduled for
+        :param float sim_time: Simulation time of the tick which invoked the event
+        """
+        error = sim_time - scheduled_time
+        self._dispatch_count += 1
+        self._dispatch_error_sum += error
+        if error > self._dispatch_error_max:
+            self._dispatch_error_max = error
+
+    def wait(
+            self,
+            sim_time: float,
+            sample_wall_time: float,
+            next_time: float):
+        """ Wait before the next dispatch tick
+
+        :param float sim_time: Simulation time sampled for the current tick
+        :param float sample_wall_time: Wall time (time.perf_counter) at which sim_time was sampled
+        :param float next_time: Simulation time of the next scheduled event, None if nothing is scheduled
+        """
+        self._tick_count += 1
+
+    def get_statistics(self) -> dict:
+        """ Get statistics of the last simulation run
+
+        CPU usage is the process CPU time as a percentage of one core over the wall time of the run
+
+        :return Dictionary of statistics
+        :rtype dict
+        """
+        wall_time = self._stop_wall - self._start_wall
+        cpu_time = self._stop_cpu - self._start_cpu
+
+        return {
+            "strategy": self.NAME,
+            "wall_time": wall_time,
+            "cpu_time": cpu_time,
+            "cpu_usage": (100.0 * cpu_time / wall_time) if wall_time > 0.0 else 0.0,
+            "ticks": self._tick_count,
+            "dispatch_count": self._dispatch_count,
+            "dispatch_error_mean": (self._dispatch_error_sum / self._dispatch_count) if self._dispatch_count > 0 else 0.0,
+            "dispatch_error_max": self._dispatch_error_max,
+        }
+
+
+class SpinWait(WaitStrategy):
+    """ Spin wait strategy
+
+    Polls the simulation as fast as possible.  Lowest dispatch error, but keeps one core fully busy.
+    """
+
+    NAME: str = "spin"
+
+
+class FixedIntervalWait(WaitStrategy):
+    """ Fixed interval wait strategy
+
+    Sleeps for a fixed wall time between dispatch ticks
+    """
+
+    NAME: str = "fixed"
+
+    def __init__(
+            self,
+            interval: float = 0.001):
+        super().__init__()
+
+        if interval <= 0.0:
+            raise ValueError(f"Invalid wait interval ({interval})")
+
+        self._interval = interval
+
+    def wait(
+            self,
+            sim_time: float,
+            sample_wall_time: float,
+            next_time: float):
+        super().wait(sim_time, sample_wall_time, next_time)
+        time.sleep(self._interval)
+
+
+class AdaptiveWait(WaitStrategy):
+    """ Adaptive wait strategy
+
+    Estimates the rate of simulation time to wall time and sleeps until shortly before the next event is due,
+    then polls without sleeping so the event is dispatched accurately.  Sleeps are limited so that the
+    simulation state is still checked regularly.
+    """
+
+    NAME: str = "adaptive"
+
+    def __init__(
+            self,
+            margin: float = 0.002,
+            max_sleep: float = 0.05,
+            smoothing: float = 0.2):
+        """ Create an adaptive wait strategy
+
+        :param float margin: Wall time before the next event at which to stop sleeping and start polling
+        :param float max_sleep: Maximum wall time of a single sleep
+        :param float smoothing: Smoothing factor of the rate estimate (0 to 1, higher follows changes faster)
+        """
+        super().__init__()
+
+        if margin < 0.0:
+            raise ValueError(f"Invalid wait margin ({margin})")
+
+        if max_sleep <= 0.0:
+            raise ValueError(f"Invalid maximum sleep ({max_sleep})")
+
+        if not (0.0 < smoothing <= 1.0):
+            raise ValueError(f"Invalid smoothing factor ({smoothing})")
+
+        self._margin = margin
+        self._max_sleep = max_sleep
+        self._smoothing = smoothing
+
+        self._rate: float = None            # Estimated simulation seconds per wall second
+        self._last_sim_time: float = None
+        self._last_wall_time: float = None
+
+    def start(self):
+        super().start()
+        self._rate = None
+        self._last_sim_time = None
+        self._last_wall_time = None
+
+    def get_rate(self) -> float:
+        """ Get the estimated rate of simulation time to wall time
+
+        :return Simulation seconds per wall second, None if not yet estimated
+        :rtype float
+        """
+        return self._rate
+
+    def wait(
+            self,
+            sim_time: float,
+            sample_wall_time: float,
+            next_time: float):
+        super().wait(sim_time, sample_wall_time, next_time)
+        self._update_rate(sim_time, sample_wall_time)
+
+        if (next_time is None) or (self._rate is None):
+            return
+
+        # Sleep until the margin before the next event, accounting for time spent since sim time was sampled
+        wall_until_due = (next_time - sim_time) / self._rate
+        sleep_time = wall_until_due - (time.perf_counter() - sample_wall_time) - self._margin
+        if sleep_time > 0.0:
+            time.sleep(min(sleep_time, self._max_sleep))
+
+    def _update_rate(
+            self,
+            sim_time: float,
+            wall_time: float):
+        """ Update the rate estimate from a new (simulation time, wall time) sample
+        """
+        if self._last_wall_time is not None:
+            wall_delta = wall_time - self._last_wall_time
+            sim_delta = sim_time - self._last_sim_time
+
+            # Ignore samples too close together to give a useful estimate
+            if (wall_delta > 1e-4) and (sim_delta > 0.0):
+                rate = sim_delta / wall_delta
+                if self._rate is None:
+                    self._rate = rate
+                else:
+                    self._rate += self._smoothing * (rate - self._rate)
+            else:
+                return
+
+        self._last_sim_time = sim_time
+        self._last_wall_time = wall_time